@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AssessmentsConfig(AppConfig):
     name = 'assessments'
+
+    def ready(self):
+        # Registers the cache invalidation signal handlers
+        from . import statistics_service  # noqa: F401
@@ -0,0 +1,101 @@
+"""
+Assessment statistics service.
+
+All statistics for a scope (all assessments for MoH admins, own assessments
+for everyone else) come from one GROUP BY over (pathway, status, CHW); totals
+and splits are rolled up in Python. Results are cached per scope and dropped
+when an assessment in that scope is saved or deleted; reassigning an
+assessment to another CHW drops both CHWs' scopes.
+
+Signals only reach the process that made the change. With the default
+per-process LocMem cache the other workers keep their copy until
+STATISTICS_CACHE_SECONDS runs out, so that timeout is kept short; configure a
+shared cache (CACHES) to make invalidation immediate everywhere.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from .models import Assessment
+
+PATHWAYS = ['SC_ITP', 'OTP', 'TSFP', 'None']
+CACHE_PREFIX = 'cmam-statistics'
+
+
+def scope_for(user):
+    """Cache scope of a user: 'all' for MoH admins, 'chw:<username>' otherwise."""
+    if user.role == 'MOH_ADMIN':
+        return 'all'
+    return f'chw:{user.username}'
+
+
+def scoped_assessments(scope):
+    if scope == 'all':
+        return Assessment.objects.all()
+    return Assessment.objects.filter(chw_username=scope.split(':', 1)[1])
+
+
+def compute_statistics(queryset):
+    """Totals, pathway/status splits and per-CHW counts from a single grouped query."""
+    groups = queryset.order_by().values('recommended_pathway', 'clinical_status', 'chw_username').annotate(
+        count=Count('id')
+    )
+
+    total = 0
+    by_pathway = dict.fromkeys(PATHWAYS, 0)
+    by_status = {}
+    by_chw = {}
+    for group in groups:
+        count = group['count']
+        total += count
+        if group['recommended_pathway'] in by_pathway:
+            by_pathway[group['recommended_pathway']] += count
+        status = group['clinical_status'] or 'Unknown'
+        by_status[status] = by_status.get(status, 0) + count
+        by_chw[group['chw_username']] = by_chw.get(group['chw_username'], 0) + count
+
+    return {
+        'total_assessments': total,
+        'by_pathway': by_pathway,
+        'by_status': by_status,
+        'by_chw': dict(sorted(by_chw.items(), key=lambda item: -item[1])),
+    }
+
+
+def _cache_key(scope):
+    return f'{CACHE_PREFIX}:{scope}'
+
+
+def get_statistics(user):
+    """Cached statistics for the user's scope."""
+    scope = scope_for(user)
+    stats = cache.get(_cache_key(scope))
+    if stats is None:
+        stats = compute_statistics(scoped_assessments(scope))
+        cache.set(_cache_key(scope), stats, getattr(settings, 'STATISTICS_CACHE_SECONDS', 300))
+    return stats
+
+
+def invalidate(*chw_usernames):
+    cache.delete_many([_cache_key('all'), *{_cache_key(f'chw:{username}') for username in chw_usernames}])
+
+
+@receiver(post_init, sender=Assessment)
+def _remember_chw(sender, instance, **kwargs):
+    # The CHW the row was loaded with, so a reassignment can clear the old CHW's scope too
+    if 'chw_username' in instance.__dict__:
+        instance._loaded_chw_username = instance.chw_username
+
+
+@receiver(post_save, sender=Assessment)
+def _assessment_saved(sender, instance, **kwargs):
+    previous = getattr(instance, '_loaded_chw_username', instance.chw_username)
+    invalidate(instance.chw_username, previous)
+    instance._loaded_chw_username = instance.chw_username
+
+
+@receiver(post_delete, sender=Assessment)
+def _assessment_deleted(sender, instance, **kwargs):
+    invalidate(instance.chw_username)
@@ -1,3 +1,54 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+from users.models import CHWUser
+from .models import Assessment
+from .statistics_service import get_statistics
 
-# Create your tests here.
+
+class StatisticsCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.chw = CHWUser.objects.create_user(username='chw1', password='x', role='CHW')
+        self.other_chw = CHWUser.objects.create_user(username='chw2', password='x', role='CHW')
+        self.admin = CHWUser.objects.create_user(username='moh', password='x', role='MOH_ADMIN')
+        self.assessment = self.assess(self.chw)
+
+    def assess(self, chw, pathway='OTP'):
+        return Assessment.objects.create(child_id='C1', sex='F', age_months=20, muac_mm=112, appetite='good',
+                                         recommended_pathway=pathway, chw_username=chw.username)
+
+    def total(self, user):
+        return get_statistics(user)['total_assessments']
+
+    def test_statistics_endpoint_is_scoped(self):
+        self.assess(self.other_chw)
+        client = APIClient()
+        client.force_authenticate(user=self.chw)
+        self.assertEqual(client.get('/api/statistics/').data['total_assessments'], 1)
+        client.force_authenticate(user=self.admin)
+        self.assertEqual(client.get('/api/statistics/').data['total_assessments'], 2)
+
+    def test_cached_until_scope_changes(self):
+        self.assertEqual(self.total(self.chw), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.total(self.chw), 1)
+
+        self.assess(self.chw, pathway='TSFP')
+        self.assertEqual(self.total(self.chw), 2)
+        self.assertEqual(get_statistics(self.chw)['by_pathway']['TSFP'], 1)
+
+    def test_reassignment_clears_both_chws(self):
+        self.assertEqual((self.total(self.chw), self.total(self.other_chw)), (1, 0))
+
+        assessment = Assessment.objects.get(pk=self.assessment.pk)
+        assessment.chw_username = self.other_chw.username
+        assessment.save()
+
+        self.assertEqual((self.total(self.chw), self.total(self.other_chw)), (0, 1))
+
+    def test_delete_clears_scope(self):
+        self.assertEqual((self.total(self.chw), self.total(self.admin)), (1, 1))
+        self.assessment.delete()
+        self.assertEqual((self.total(self.chw), self.total(self.admin)), (0, 0))
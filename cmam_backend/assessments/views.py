@@ -1,3 +1,4 @@
+import logging
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
@@ -5,6 +6,9 @@ from rest_framework.permissions import IsAuthenticated
 from .models import Assessment
 from .serializers import AssessmentSerializer, AssessmentCreateSerializer
 from .quality_service import get_quality_service
+from .statistics_service import get_statistics
+
+logger = logging.getLogger('cmam.assessments')
 
 class AssessmentViewSet(viewsets.ModelViewSet):
     queryset = Assessment.objects.all()
@@ -25,12 +29,9 @@ class AssessmentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     def bulk_create(self, request):
         """Bulk upload assessments from mobile app."""
-        import json
-        print("=== BULK CREATE DEBUG ===")
-        print(f"Request data type: {type(request.data)}")
-        print(f"Request data: {json.dumps(request.data, indent=2, default=str)}")
-        
         assessments_data = request.data if isinstance(request.data, list) else [request.data]
+        logger.debug('Bulk create of %d assessments', len(assessments_data),
+                     extra={'payload_type': type(request.data).__name__})
         
         serializer = AssessmentCreateSerializer(data=assessments_data, many=True)
         if serializer.is_valid():
@@ -41,7 +42,7 @@ class AssessmentViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_201_CREATED)
         
         # Return detailed error information
-        print(f"Validation errors: {serializer.errors}")
+        logger.warning('Bulk create rejected', extra={'records': len(assessments_data), 'errors': serializer.errors})
         return Response({
             'error': 'Validation failed',
             'details': serializer.errors
@@ -54,34 +55,19 @@ def health_check(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def statistics(request):
-    # Filter by user role
-    if request.user.role == 'MOH_ADMIN':
-        queryset = Assessment.objects.all()
-    else:
-        queryset = Assessment.objects.filter(chw_username=request.user.username)
-    
-    total = queryset.count()
-    by_pathway = {}
-    for pathway in ['SC_ITP', 'OTP', 'TSFP', 'None']:
-        count = queryset.filter(recommended_pathway=pathway).count()
-        by_pathway[pathway] = count
-    
+    # Scoped by role and cached; see statistics_service
+    stats = get_statistics(request.user)
     return Response({
-        'total_assessments': total,
-        'by_pathway': by_pathway,
+        'total_assessments': stats['total_assessments'],
+        'by_pathway': stats['by_pathway'],
+        'by_status': stats['by_status'],
     })
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def chw_assessment_counts(request):
-    """Get assessment counts per CHW."""
-    from django.db.models import Count
-    
-    counts = Assessment.objects.values('chw_username').annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    return Response({chw['chw_username']: chw['count'] for chw in counts})
+    """Get assessment counts per CHW (own count only for non-admins)."""
+    return Response(get_statistics(request.user)['by_chw'])
 
 @api_view(['POST'])
 def check_quality(request):
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -25,6 +26,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'cmam_project.structured_logging.RequestIdMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -102,3 +104,27 @@ AUTH_USER_MODEL = 'users.CHWUser'
 # CORS
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
+
+# Statistics cache (assessments.statistics_service), per role scope; entries are
+# also dropped whenever an assessment in the scope changes, but only in the worker
+# that changed it while CACHES is the per-process default, hence the short timeout
+STATISTICS_CACHE_SECONDS = 30
+
+# Doctor directory for referrals (users.doctor_directory): dropped when a doctor
+# changes, in the worker that changed it; other workers refresh after this long
+DOCTOR_DIRECTORY_CACHE_SECONDS = 60
+
+# Structured logging (cmam_project.structured_logging): cmam.* loggers write JSON lines
+# through a queue and a listener thread, tagged with the request's X-Request-ID. Records
+# below ERROR from the loggers in LOG_SAMPLE_RATES are kept at that rate.
+LOG_SAMPLE_RATES = {}
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'json': {'()': 'cmam_project.structured_logging.queue_handler'},
+    },
+    'loggers': {
+        'cmam': {'handlers': ['json'], 'level': os.environ.get('LOG_LEVEL', 'INFO'), 'propagate': False},
+    },
+}
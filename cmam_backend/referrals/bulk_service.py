@@ -0,0 +1,89 @@
+"""
+Set-based referral ingestion for mobile sync.
+
+Resolves assessments (by id or child_id), doctors (by username) in one query
+each and inserts the whole batch with a single bulk INSERT. Facilities are
+plain names on users in this backend, so they are copied from the submitting
+CHW without a lookup.
+"""
+from django.db.models import Q
+from assessments.models import Assessment
+from users.models import CHWUser
+from .models import Referral
+
+
+def _resolve_assessments(rows, user):
+    """Map explicit ids and child_ids to assessment ids with one query."""
+    ids = {row['assessment_id'] for row in rows if row.get('assessment_id')}
+    child_ids = {row['child_id'] for row in rows if not row.get('assessment_id')}
+
+    found = Assessment.objects.filter(Q(id__in=ids) | Q(child_id__in=child_ids))
+    if user.role != 'MOH_ADMIN':
+        # A CHW can only refer children they assessed, whether named by id or by child_id
+        found = found.filter(chw_username=user.username)
+
+    found = found.order_by('assessment_date').values_list('id', 'child_id')
+    known_ids = set()
+    latest_by_child = {}
+    for assessment_id, child_id in found:
+        known_ids.add(assessment_id)
+        latest_by_child[child_id] = assessment_id  # ordered ascending, so the last one wins
+    return known_ids, latest_by_child
+
+
+def _resolve_doctors(rows):
+    usernames = {row['doctor_username'] for row in rows if row.get('doctor_username')}
+    if not usernames:
+        return {}
+    return dict(
+        CHWUser.objects.filter(role='DOCTOR', is_active=True, username__in=usernames).values_list('username', 'id')
+    )
+
+
+def bulk_create_referrals(user, rows):
+    """
+    Create referrals from validated rows.
+
+    Returns (created, errors). The batch is all-or-nothing: if any row cannot be
+    resolved nothing is inserted, so the app can safely retry the whole batch.
+    """
+    known_ids, latest_by_child = _resolve_assessments(rows, user)
+    doctors = _resolve_doctors(rows)
+
+    referrals = []
+    errors = []
+    for index, row in enumerate(rows):
+        assessment_id = row.get('assessment_id')
+        if assessment_id and assessment_id not in known_ids:
+            errors.append({'index': index, 'assessment_id': [f'Assessment {assessment_id} not found']})
+            continue
+        if not assessment_id:
+            assessment_id = latest_by_child.get(row['child_id'])
+            if assessment_id is None:
+                errors.append({'index': index, 'child_id': [f"No assessment found for child {row['child_id']}"]})
+                continue
+
+        doctor_username = row.get('doctor_username')
+        if doctor_username and doctor_username not in doctors:
+            errors.append({'index': index, 'doctor_username': [f'Active doctor {doctor_username} not found']})
+            continue
+
+        referrals.append(Referral(
+            assessment_id=assessment_id,
+            child_id=row['child_id'],
+            pathway=row['pathway'],
+            status=row.get('status', 'pending'),
+            notes=row.get('notes'),
+            chw_user=user,
+            chw_username=row.get('chw_username') or user.username,
+            chw_name=row.get('chw_name') or user.get_full_name(),
+            chw_facility=row.get('chw_facility') or user.facility,
+            chw_state=row.get('chw_state') or user.state,
+            doctor_user_id=doctors.get(doctor_username),
+        ))
+
+    if errors:
+        return [], errors
+
+    Referral.objects.bulk_create(referrals)
+    return referrals, []
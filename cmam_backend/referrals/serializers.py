@@ -23,13 +23,15 @@ class ReferralSerializer(serializers.ModelSerializer):
 
 class ReferralCreateSerializer(serializers.ModelSerializer):
     assessment_id = serializers.IntegerField(required=False, allow_null=True)
+    doctor_username = serializers.CharField(required=False, allow_blank=True)
     
     class Meta:
         model = Referral
         fields = ['assessment_id', 'child_id', 'pathway', 'status', 'notes', 
-                  'chw_username', 'chw_name', 'chw_facility', 'chw_state']
+                  'chw_username', 'chw_name', 'chw_facility', 'chw_state', 'doctor_username']
     
     def create(self, validated_data):
+        validated_data.pop('doctor_username', None)
         assessment_id = validated_data.pop('assessment_id', None)
         if assessment_id:
             from assessments.models import Assessment
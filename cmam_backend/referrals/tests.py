@@ -0,0 +1,64 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from assessments.models import Assessment
+from users.models import CHWUser
+from .models import Referral
+
+
+class BulkCreateReferralTests(TestCase):
+    url = '/api/referrals/bulk_create/'
+
+    def setUp(self):
+        self.chw = CHWUser.objects.create_user(username='chw1', password='x', role='CHW', facility='Juba PHCC')
+        self.other_chw = CHWUser.objects.create_user(username='chw2', password='x', role='CHW')
+        self.doctor = CHWUser.objects.create_user(username='doc1', password='x', role='DOCTOR')
+        self.own = self.assess('C1', self.chw)
+        self.foreign = self.assess('C2', self.other_chw)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.chw)
+
+    def assess(self, child_id, chw):
+        return Assessment.objects.create(child_id=child_id, sex='F', age_months=20, muac_mm=112,
+                                         appetite='good', chw_username=chw.username)
+
+    def test_creates_batch_by_id_and_child_id(self):
+        response = self.client.post(self.url, [
+            {'assessment_id': self.own.id, 'child_id': 'C1', 'pathway': 'OTP', 'doctor_username': 'doc1'},
+            {'child_id': 'C1', 'pathway': 'SC'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['count'], 2)
+        referral = Referral.objects.get(pathway='OTP')
+        self.assertEqual((referral.assessment_id, referral.doctor_user, referral.chw_facility),
+                         (self.own.id, self.doctor, 'Juba PHCC'))
+        self.assertEqual(Referral.objects.get(pathway='SC').assessment_id, self.own.id)
+
+    def test_other_chws_assessment_id_is_rejected(self):
+        response = self.client.post(self.url, [
+            {'assessment_id': self.own.id, 'child_id': 'C1', 'pathway': 'OTP'},
+            {'assessment_id': self.foreign.id, 'child_id': 'C2', 'pathway': 'OTP'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['details'][0]['index'], 1)
+        self.assertFalse(Referral.objects.exists())
+
+    def test_other_chws_child_id_is_rejected(self):
+        response = self.client.post(self.url, [{'child_id': 'C2', 'pathway': 'OTP'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('child_id', response.data['details'][0])
+
+    def test_admin_may_refer_any_assessment(self):
+        self.client.force_authenticate(user=CHWUser.objects.create_user(username='moh', password='x', role='MOH_ADMIN'))
+        response = self.client.post(self.url, [
+            {'assessment_id': self.foreign.id, 'child_id': 'C2', 'pathway': 'OTP'},
+            {'child_id': 'C1', 'pathway': 'OTP'},
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_unknown_doctor_is_rejected(self):
+        response = self.client.post(self.url, [{'child_id': 'C1', 'pathway': 'OTP', 'doctor_username': 'nobody'}],
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('doctor_username', response.data['details'][0])
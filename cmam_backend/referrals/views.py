@@ -4,19 +4,21 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Referral
 from .serializers import ReferralSerializer, ReferralCreateSerializer, ReferralUpdateSerializer
-from users.models import CHWUser
-from users.serializers import CHWUserSerializer
+from .bulk_service import bulk_create_referrals
+from users.doctor_directory import directory_response
 
 class ReferralViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
         user = self.request.user
+        # get_assessment_data reads the assessment for every row
+        queryset = Referral.objects.select_related('assessment')
         if user.role == 'DOCTOR':
-            return Referral.objects.filter(chw_state=user.state)
+            return queryset.filter(chw_state=user.state)
         elif user.role == 'CHW':
-            return Referral.objects.filter(chw_user=user)
-        return Referral.objects.all()
+            return queryset.filter(chw_user=user)
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'create' or self.action == 'bulk_create':
@@ -30,40 +32,31 @@ class ReferralViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def active_doctors(self, request):
-        """Get list of active doctors for referrals"""
-        doctors = CHWUser.objects.filter(
-            role='DOCTOR',
-            is_active=True
-        ).order_by('first_name', 'last_name')
-        
-        serializer = CHWUserSerializer(doctors, many=True)
-        return Response(serializer.data)
+        """Get list of active doctors for referrals (cached directory, see users.doctor_directory)"""
+        return directory_response(request)
     
     @action(detail=False, methods=['post'])
     def bulk_create(self, request):
+        """Set-based referral sync; responds with an index -> id mapping instead of full objects."""
         referrals_data = request.data if isinstance(request.data, list) else [request.data]
         serializer = ReferralCreateSerializer(data=referrals_data, many=True)
         
-        if serializer.is_valid():
-            referrals = []
-            for data in serializer.validated_data:
-                data['chw_user'] = request.user
-                if not data.get('chw_username'):
-                    data['chw_username'] = request.user.username
-                if not data.get('chw_name'):
-                    data['chw_name'] = request.user.get_full_name()
-                if not data.get('chw_facility'):
-                    data['chw_facility'] = request.user.facility
-                if not data.get('chw_state'):
-                    data['chw_state'] = request.user.state
-                referrals.append(Referral(**data))
-            
-            Referral.objects.bulk_create(referrals)
-            return Response(
-                ReferralSerializer(referrals, many=True).data,
-                status=status.HTTP_201_CREATED
-            )
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        referrals, errors = bulk_create_referrals(request.user, serializer.validated_data)
+        if errors:
+            return Response({'error': 'Unresolved references', 'details': errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'count': len(referrals),
+            'referrals': [
+                {'index': index, 'id': referral.id, 'child_id': referral.child_id,
+                 'assessment_id': referral.assessment_id}
+                for index, referral in enumerate(referrals)
+            ],
+        }, status=status.HTTP_201_CREATED)
     
     @action(detail=True, methods=['patch'])
     def update_status(self, request, pk=None):
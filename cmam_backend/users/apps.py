@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class UsersConfig(AppConfig):
     name = 'users'
+
+    def ready(self):
+        # Registers the directory invalidation signal handlers
+        from . import doctor_directory  # noqa: F401
@@ -0,0 +1,108 @@
+"""
+Doctor directory behind the referral doctor pickers
+(/api/auth/chw-users/doctors/ and the referrals active_doctors action).
+
+Active doctors are serialized once, in first/last name order as the pickers
+always listed them, and cached for DOCTOR_DIRECTORY_CACHE_SECONDS. Saving or
+deleting a doctor clears the entry after commit, but only in this process:
+with the default per-process cache other workers pick the change up when
+their copy times out, so the timeout is the longest a worker can serve a
+stale directory.
+
+Query parameters:
+  ?grouped=true          doctors grouped by state, then facility (sorted by name)
+  ?ordering=proximity    the caller's facility first, then their state
+
+Each variant has its own ETag; If-None-Match gets a 304.
+"""
+import hashlib
+import json
+from itertools import groupby
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from .models import CHWUser
+
+CACHE_KEY = 'cmam-doctor-directory'
+UNASSIGNED = 'Unassigned'
+
+
+def _location(row):
+    return row['state'] or UNASSIGNED, row['facility'] or UNASSIGNED
+
+
+def group_by_location(rows):
+    """[{'state', 'facilities': [{'facility', 'doctors'}]}], states and facilities sorted by name."""
+    by_location = sorted(rows, key=_location)  # stable: name order within a facility
+    return [
+        {
+            'state': state,
+            'facilities': [
+                {'facility': facility, 'doctors': list(doctors)}
+                for facility, doctors in groupby(state_rows, key=lambda row: _location(row)[1])
+            ],
+        }
+        for state, state_rows in groupby(by_location, key=lambda row: _location(row)[0])
+    ]
+
+
+def build_directory():
+    from .serializers import CHWUserSerializer
+
+    doctors = CHWUser.objects.filter(role='DOCTOR', is_active=True).order_by('first_name', 'last_name', 'id')
+    rows = [dict(row) for row in CHWUserSerializer(doctors, many=True).data]
+    digest = hashlib.md5(json.dumps(rows, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    return {'version': digest, 'doctors': rows, 'groups': group_by_location(rows)}
+
+
+def get_directory():
+    directory = cache.get(CACHE_KEY)
+    if directory is None:
+        directory = build_directory()
+        cache.set(CACHE_KEY, directory, getattr(settings, 'DOCTOR_DIRECTORY_CACHE_SECONDS', 60))
+    return directory
+
+
+@receiver(post_save, sender=CHWUser)
+@receiver(post_delete, sender=CHWUser)
+def _doctor_changed(sender, instance, **kwargs):
+    # A former doctor (role changed away) is only recognisable by still being listed
+    directory = cache.get(CACHE_KEY)
+    was_listed = directory is not None and instance.pk in {row['id'] for row in directory['doctors']}
+    if instance.role == 'DOCTOR' or was_listed:
+        transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+
+def nearest_first(doctors, user):
+    """Same facility, then same state, then the rest; name order kept within each."""
+    def distance(row):
+        if user.facility and row['facility'] == user.facility:
+            return 0
+        return 1 if user.state and row['state'] == user.state else 2
+    return sorted(doctors, key=distance)
+
+
+def directory_response(request):
+    directory = get_directory()
+    if request.query_params.get('grouped') in ('1', 'true'):
+        variant, data = 'grouped', directory['groups']
+    elif request.query_params.get('ordering') == 'proximity':
+        user = request.user
+        variant, data = f'near:{user.facility}:{user.state}', nearest_first(directory['doctors'], user)
+    else:
+        variant, data = 'list', directory['doctors']
+
+    etag = quote_etag(f"{directory['version']}-{hashlib.md5(variant.encode('utf-8')).hexdigest()[:8]}")
+    if etag in [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    # Revalidate every time; the ETag makes that cheap
+    response['Cache-Control'] = 'private, no-cache'
+    return response
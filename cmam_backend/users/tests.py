@@ -1,3 +1,69 @@
-from django.test import TestCase
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from .doctor_directory import get_directory
+from .models import CHWUser
 
-# Create your tests here.
+
+class DoctorDirectoryTests(TestCase):
+    url = '/api/auth/chw-users/doctors/'
+
+    def setUp(self):
+        cache.clear()
+        self.doctor('zara', 'Zara', 'Lado', 'Jonglei', 'Bor Hospital')
+        self.doctor('akol', 'Akol', 'Deng', 'Central Equatoria', 'Juba PHCC')
+        self.doctor('mary', 'Mary', 'Ajak', 'Jonglei', 'Pibor PHCC')
+        self.chw = CHWUser.objects.create_user(username='chw1', password='x', role='CHW',
+                                               state='Jonglei', facility='Pibor PHCC')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.chw)
+
+    def doctor(self, username, first, last, state, facility, **extra):
+        return CHWUser.objects.create_user(username=username, password='x', role='DOCTOR', first_name=first,
+                                           last_name=last, state=state, facility=facility, **extra)
+
+    def usernames(self, response):
+        return [row['username'] for row in response.data]
+
+    def test_listed_by_name(self):
+        self.assertEqual(self.usernames(self.client.get(self.url)), ['akol', 'mary', 'zara'])
+
+    def test_grouped_by_state_and_facility(self):
+        groups = self.client.get(self.url, {'grouped': 'true'}).data
+        self.assertEqual([group['state'] for group in groups], ['Central Equatoria', 'Jonglei'])
+        self.assertEqual([facility['facility'] for facility in groups[1]['facilities']], ['Bor Hospital', 'Pibor PHCC'])
+
+    def test_proximity_ordering(self):
+        response = self.client.get(self.url, {'ordering': 'proximity'})
+        self.assertEqual(self.usernames(response), ['mary', 'zara', 'akol'])
+
+    def test_etag_revalidation(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertNotEqual(self.client.get(self.url, {'grouped': 'true'})['ETag'], etag)
+
+    def test_doctor_changes_clear_the_cache(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doctor('ben', 'Ben', 'Kuol', 'Jonglei', 'Bor Hospital')
+        self.assertIn('ben', self.usernames(self.client.get(self.url)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CHWUser.objects.get(username='ben').delete()
+        self.assertNotIn('ben', self.usernames(self.client.get(self.url)))
+
+    def test_demoted_doctor_leaves_the_directory(self):
+        self.client.get(self.url)
+        zara = CHWUser.objects.get(username='zara')
+        zara.role = 'CHW'
+        with self.captureOnCommitCallbacks(execute=True):
+            zara.save()
+        self.assertNotIn('zara', self.usernames(self.client.get(self.url)))
+
+    @override_settings(DOCTOR_DIRECTORY_CACHE_SECONDS=15)
+    def test_cache_entry_has_a_timeout(self):
+        # Other workers' copies are never invalidated, so they must expire
+        with mock.patch.object(cache, 'set') as cache_set:
+            get_directory()
+        self.assertEqual(cache_set.call_args.args[2], 15)
@@ -6,6 +6,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from .models import CHWUser
 from .serializers import CHWUserSerializer, CHWUserCreateSerializer, LoginSerializer
+from .doctor_directory import directory_response
 
 User = get_user_model()
 
@@ -77,7 +78,5 @@ class CHWUserViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def doctors(self, request):
-        """Get list of doctors with their titles for referrals"""
-        doctors = CHWUser.objects.filter(role='DOCTOR', is_active=True)
-        serializer = CHWUserSerializer(doctors, many=True)
-        return Response(serializer.data)
+        """Get list of doctors with their titles for referrals (cached directory, see doctor_directory)"""
+        return directory_response(request)
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class AccountsConfig(AppConfig):
     name = 'accounts'
+
+    def ready(self):
+        # Registers the signal handlers that drop cached user status on save/delete
+        # and keep the token blacklist filter current
+        from . import authentication, token_revocation  # noqa: F401
@@ -1,17 +1,65 @@
-from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+import time
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.response import Response
-from .serializers import UserSerializer
+from .authentication import add_user_claims, login_payload
+from .token_revocation import is_blacklisted, record_refresh
+from .models import User
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        # Claims let ClaimsJWTAuthentication skip the user lookup on every request
+        return add_user_claims(super().get_token(user), user)
+
     def validate(self, attrs):
+        # Password check runs in a bounded hashing slot (accounts.hashers)
         data = super().validate(attrs)
         # Add user info to response
-        user_serializer = UserSerializer(self.user)
-        data['user'] = user_serializer.data
+        data['user'] = login_payload(self.user)
         return data
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token whose claims are re-read from the database before access tokens are minted."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.token is None:
+            return
+        user = User.objects.filter(pk=self.payload.get(api_settings.USER_ID_CLAIM), is_active=True).first()
+        if user is None:
+            raise InvalidToken('User not found or inactive')
+        add_user_claims(self, user)
+
+    def check_blacklist(self):
+        # Bloom filter first; the blacklist table is only queried on a filter hit
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = CustomTokenRefreshSerializer
+
+    def post(self, request, *args, **kwargs):
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = super().post(request, *args, **kwargs)
+            ok = response.status_code == 200
+            return response
+        finally:
+            record_refresh((time.perf_counter() - start) * 1000, ok)
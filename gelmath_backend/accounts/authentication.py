@@ -0,0 +1,123 @@
+"""
+Stateless JWT authentication from role/facility claims.
+
+Access tokens carry username, role, facility_id and state claims (added at
+login and refreshed from the database on token refresh). ClaimsJWTAuthentication
+builds request.user from them instead of loading the users row on every
+request; the object is a real User instance with only those fields loaded, so
+ORM filters and FK assignment work and any other field is fetched on first
+access.
+
+Revocation is covered by a small per-user status snapshot (is_active and the
+claim fields) cached for JWT_USER_STATUS_SECONDS and dropped whenever the user
+row is saved or deleted: deactivated or deleted users are rejected, and tokens
+whose claims no longer match (role or facility changed) must be refreshed.
+Tokens issued before claims existed fall back to the row lookup.
+
+The user payload returned with login tokens is cached per user for
+LOGIN_PAYLOAD_SECONDS and dropped with the status snapshot, and when the
+user's facility changes.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from gelmath_api.metrics import record_cache
+from .models import Facility, User
+
+CLAIM_FIELDS = ('role', 'facility_id', 'state')
+STATUS_PREFIX = 'auth-user-status'
+PAYLOAD_PREFIX = 'login-payload'
+
+
+def add_user_claims(token, user):
+    token['username'] = user.username
+    for field in CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    return token
+
+
+def _status_key(user_id):
+    return f'{STATUS_PREFIX}:{user_id}'
+
+
+def _payload_key(user_id):
+    return f'{PAYLOAD_PREFIX}:{user_id}'
+
+
+def user_status(user_id):
+    """{'is_active', 'role', 'facility_id', 'state'} for a user, or None if the user is gone. Cached."""
+    key = _status_key(user_id)
+    status = cache.get(key)
+    record_cache('jwt_user_status', status is not None)
+    if status is None:
+        row = User.objects.filter(pk=user_id).values('is_active', *CLAIM_FIELDS).first()
+        # Cache deleted users too, so a stream of requests with their token stays cheap
+        status = row or {'is_active': False, 'deleted': True}
+        cache.set(key, status, getattr(settings, 'JWT_USER_STATUS_SECONDS', 60))
+    return None if status.get('deleted') else status
+
+
+def login_payload(user):
+    """UserSerializer data for the login response, cached per user."""
+    from .serializers import UserSerializer
+
+    key = _payload_key(user.pk)
+    payload = cache.get(key)
+    record_cache('login_payload', payload is not None)
+    if payload is None:
+        payload = dict(UserSerializer(user).data)
+        cache.set(key, payload, getattr(settings, 'LOGIN_PAYLOAD_SECONDS', 3600))
+    return payload
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _user_changed(sender, instance, **kwargs):
+    cache.delete_many([_status_key(instance.pk), _payload_key(instance.pk)])
+
+
+@receiver(post_save, sender=Facility)
+def _facility_changed(sender, instance, created, **kwargs):
+    # Payloads carry facility_name
+    if not created:
+        cache.delete_many([_payload_key(pk) for pk in instance.users.values_list('pk', flat=True)])
+
+
+def claims_user(validated_token):
+    """A User instance with id, username, is_active and the claim fields loaded; the rest deferred."""
+    values = {
+        'id': validated_token[api_settings.USER_ID_CLAIM],
+        'username': validated_token['username'],
+        'is_active': True,
+        **{field: validated_token[field] for field in CLAIM_FIELDS},
+    }
+    # from_db() takes loaded values in concrete field order
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(DEFAULT_DB_ALIAS, names, [values[name] for name in names])
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in ('username', *CLAIM_FIELDS)):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        status = user_status(user_id)
+        if status is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not status['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if any(validated_token[field] != status[field] for field in CLAIM_FIELDS):
+            raise AuthenticationFailed(_('Token claims are out of date, refresh the token'), code='stale_claims')
+        return claims_user(validated_token)
@@ -0,0 +1,117 @@
+"""
+Password hashing policy.
+
+PASSWORD_HASH_ALGORITHM picks the hasher new passwords use (pbkdf2_sha256,
+scrypt or argon2 - the latter needs argon2-cffi); the others stay listed so
+existing hashes keep verifying. Cost parameters come from
+settings.PASSWORD_HASHING, so they can be tuned to the hardware with
+`manage.py benchmark_login`. Django rehashes a password on its next successful
+login whenever its algorithm or parameters differ from the policy.
+
+Hashing is CPU and (for scrypt/argon2) memory heavy, so at most
+LOGIN_HASH_CONCURRENCY hashes run at once per worker; the rest queue for up to
+LOGIN_HASH_QUEUE_SECONDS and then get 503 instead of piling onto the cores.
+A slot is held per password check: Django's verify() calls encode(), and the
+nested call runs in the slot its thread already holds.
+"""
+import threading
+from contextlib import contextmanager
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher,
+)
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+_lock = threading.Lock()
+_slots = None
+# Per-thread nesting depth of hashing_slot()
+_held = threading.local()
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many logins in progress, retry shortly.'
+    default_code = 'hashing_busy'
+
+
+def _semaphore():
+    global _slots
+    if _slots is None:
+        with _lock:
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(getattr(settings, 'LOGIN_HASH_CONCURRENCY', 2))
+    return _slots
+
+
+@contextmanager
+def hashing_slot():
+    """
+    Hold one of the worker's LOGIN_HASH_CONCURRENCY hashing slots; HashingBusy if
+    none frees up in time. Re-entrant: a thread already holding a slot keeps using it.
+    """
+    depth = getattr(_held, 'depth', 0)
+    if depth:
+        _held.depth = depth + 1
+        try:
+            yield
+        finally:
+            _held.depth = depth
+        return
+
+    slots = _semaphore()
+    if not slots.acquire(timeout=getattr(settings, 'LOGIN_HASH_QUEUE_SECONDS', 10)):
+        raise HashingBusy()
+    _held.depth = 1
+    try:
+        yield
+    finally:
+        _held.depth = 0
+        slots.release()
+
+
+def hasher_params(algorithm):
+    return getattr(settings, 'PASSWORD_HASHING', {}).get(algorithm, {})
+
+
+def _param(name, base):
+    return property(lambda self: hasher_params(self.algorithm).get(name, getattr(base, name)))
+
+
+class BoundedHashingMixin:
+    """Runs encode/verify inside a hashing slot."""
+
+    def encode(self, *args, **kwargs):
+        with hashing_slot():
+            return super().encode(*args, **kwargs)
+
+    def verify(self, *args, **kwargs):
+        with hashing_slot():
+            return super().verify(*args, **kwargs)
+
+
+class TunedPBKDF2PasswordHasher(BoundedHashingMixin, PBKDF2PasswordHasher):
+    iterations = _param('iterations', PBKDF2PasswordHasher)
+
+
+class TunedScryptPasswordHasher(BoundedHashingMixin, ScryptPasswordHasher):
+    work_factor = _param('work_factor', ScryptPasswordHasher)
+    block_size = _param('block_size', ScryptPasswordHasher)
+    parallelism = _param('parallelism', ScryptPasswordHasher)
+    maxmem = _param('maxmem', ScryptPasswordHasher)
+
+
+class TunedArgon2PasswordHasher(BoundedHashingMixin, Argon2PasswordHasher):
+    time_cost = _param('time_cost', Argon2PasswordHasher)
+    memory_cost = _param('memory_cost', Argon2PasswordHasher)
+    parallelism = _param('parallelism', Argon2PasswordHasher)
+
+
+# Cost parameter benchmark_login scales for each algorithm
+COST_PARAMS = {'pbkdf2_sha256': 'iterations', 'scrypt': 'work_factor', 'argon2': 'time_cost'}
+
+TUNED_HASHERS = {
+    'pbkdf2_sha256': TunedPBKDF2PasswordHasher,
+    'scrypt': TunedScryptPasswordHasher,
+    'argon2': TunedArgon2PasswordHasher,
+}
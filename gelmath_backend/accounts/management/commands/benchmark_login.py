@@ -0,0 +1,77 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher
+from django.core.management.base import BaseCommand, CommandError
+from accounts.hashers import COST_PARAMS, hasher_params
+
+BASE_HASHERS = {
+    'pbkdf2_sha256': PBKDF2PasswordHasher,
+    'scrypt': ScryptPasswordHasher,
+    'argon2': Argon2PasswordHasher,
+}
+
+
+def _csv(value, cast=str):
+    return [cast(item) for item in value.split(',') if item]
+
+
+def scaled_params(algorithm, scale):
+    """PASSWORD_HASHING parameters for `algorithm` with its cost parameter multiplied by `scale`."""
+    params = {**hasher_params(algorithm)}
+    name = COST_PARAMS[algorithm]
+    base = params.get(name, getattr(BASE_HASHERS[algorithm], name))
+    if algorithm == 'scrypt':
+        # N must stay a power of two, and OpenSSL needs ~128 * r * N bytes
+        params[name] = 1 << max(1, round(base * scale).bit_length() - 1)
+        block_size = params.get('block_size', ScryptPasswordHasher.block_size)
+        params['maxmem'] = max(params.get('maxmem', 0), 256 * block_size * params[name])
+    else:
+        params[name] = max(1, round(base * scale))
+    return params
+
+
+class Command(BaseCommand):
+    help = 'Measure password verifications (the CPU cost of a login) per second for each hasher setting'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--algorithms', default='pbkdf2_sha256,scrypt,argon2')
+        parser.add_argument('--scales', default='0.5,1,2',
+                            help='Multipliers for each algorithm\'s configured cost parameter')
+        parser.add_argument('--concurrency', default='1,2,4', help='Parallel logins to measure throughput at')
+        parser.add_argument('--logins', type=int, default=20, help='Verifications per measurement')
+
+    def handle(self, *args, **options):
+        algorithms = _csv(options['algorithms'])
+        unknown = set(algorithms) - set(BASE_HASHERS)
+        if unknown:
+            raise CommandError(f'Unknown algorithms: {", ".join(sorted(unknown))}')
+
+        self.stdout.write(f'{"algorithm":<14} {"parameters":<58} {"ms/login":>9}  logins/sec by concurrency')
+        for algorithm in algorithms:
+            for scale in _csv(options['scales'], float):
+                params = scaled_params(algorithm, scale)
+                # Unbounded hasher: the benchmark measures the hardware, not the login limiter
+                hasher = type('BenchmarkHasher', (BASE_HASHERS[algorithm],), params)()
+                try:
+                    encoded = hasher.encode('benchmark-password', hasher.salt())
+                except ValueError as exc:  # argon2-cffi missing
+                    self.stdout.write(f'{algorithm:<14} skipped: {exc}')
+                    break
+
+                start = time.perf_counter()
+                hasher.verify('benchmark-password', encoded)
+                single_ms = (time.perf_counter() - start) * 1000
+
+                rates = []
+                for workers in _csv(options['concurrency'], int):
+                    with ThreadPoolExecutor(max_workers=workers) as pool:
+                        start = time.perf_counter()
+                        list(pool.map(lambda _: hasher.verify('benchmark-password', encoded),
+                                      range(options['logins'])))
+                        elapsed = time.perf_counter() - start
+                    rates.append(f'{workers}: {options["logins"] / elapsed:6.1f}')
+
+                shown = ', '.join(f'{key}={value}' for key, value in params.items() if key != 'maxmem')
+                marker = '*' if scale == 1 else ' '
+                self.stdout.write(f'{algorithm:<13}{marker} {shown:<58} {single_ms:9.1f}  {"  ".join(rates)}')
+        self.stdout.write('* configured in PASSWORD_HASHING')
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from accounts.token_revocation import blacklist_stats, prune_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding and blacklisted refresh tokens in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'TOKEN_PRUNE_BATCH_SIZE', 5000))
+
+    def handle(self, *args, **options):
+        deleted = prune_expired(batch_size=options['batch_size'])
+        stats = blacklist_stats()
+        self.stdout.write(
+            f'Deleted {deleted} expired tokens; {stats["outstanding"]} outstanding, '
+            f'{stats["blacklisted"]} blacklisted remain'
+        )
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Doctor profile columns that were on the User model without a migration.
+    They first shipped in 0002_synctelemetry (generated alongside the sync
+    telemetry tables); databases that applied it under that name count this
+    migration as applied.
+    """
+
+    replaces = [('accounts', '0002_synctelemetry')]
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='doctor_description',
+            field=models.TextField(blank=True, help_text="Brief description of doctor's expertise"),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='doctor_specialization',
+            field=models.CharField(blank=True, help_text='e.g., Pediatrician, General Practitioner', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='doctor_title',
+            field=models.CharField(blank=True, help_text='e.g., Dr., Prof., Mr., Ms.', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='years_experience',
+            field=models.PositiveIntegerField(blank=True, help_text='Years of medical experience', null=True),
+        ),
+    ]
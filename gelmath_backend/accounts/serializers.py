@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from .models import User, Facility
+from gelmath_api.sparse_fields import SparseFieldsMixin
 
 
 class FacilitySerializer(serializers.ModelSerializer):
@@ -9,7 +10,7 @@ class FacilitySerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     facility_name = serializers.CharField(source='facility.name', read_only=True)
     facility_input = serializers.CharField(write_only=True, required=False, allow_blank=True, allow_null=True)
     
@@ -20,6 +21,7 @@ class UserSerializer(serializers.ModelSerializer):
                   'created_at', 'last_login', 'doctor_title', 'doctor_specialization', 
                   'doctor_description', 'years_experience']
         read_only_fields = ['id', 'created_at', 'last_login', 'facility']
+        summary_fields = ['id', 'username', 'first_name', 'last_name', 'role', 'facility_name', 'state', 'is_active']
     
     def update(self, instance, validated_data):
         facility_input = validated_data.pop('facility_input', None)
@@ -0,0 +1,96 @@
+"""
+STATELESS JWT AUTH TESTS
+Tests claim-based request.user, cached revocation checks and claim refresh
+"""
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.models import Facility
+from assessments.models import Assessment
+from assessments.testing import make_record
+
+User = get_user_model()
+
+
+class ClaimsAuthTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.facility = Facility.objects.create(name='Bor OTP', facility_type='OTP', state='Jonglei')
+        self.doctor = User.objects.create_user(username='claims_doc', password='test123', role='DOCTOR',
+                                               facility=self.facility, state='Jonglei', first_name='Deng')
+        self.chw = User.objects.create_user(username='claims_chw', password='test123', role='CHW',
+                                            facility=self.facility, state='Jonglei')
+        Assessment.objects.create(**make_record(1), chw=self.chw, facility=self.facility)
+
+    def login(self, username):
+        response = self.client.post('/api/auth/login/', {'username': username, 'password': 'test123'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return response.data
+
+    def test_tokens_carry_claims(self):
+        tokens = self.login('claims_doc')
+        token = AccessToken(tokens['access'])
+        self.assertEqual((token['role'], token['facility_id'], token['state']), ('DOCTOR', self.facility.id, 'Jonglei'))
+
+    def test_requests_skip_user_queries(self):
+        self.login('claims_doc')
+        self.client.get('/api/assessments/')  # warms the status cache
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/assessments/?with_count=false')
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_writes_use_claims_user(self):
+        self.login('claims_chw')
+        response = self.client.post('/api/assessments/', make_record(2), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Assessment.objects.get(child_id=make_record(2)['child_id']).chw, self.chw)
+
+    def test_me_returns_full_profile(self):
+        self.login('claims_doc')
+        response = self.client.get('/api/users/me/')
+        self.assertEqual(response.data['first_name'], 'Deng')
+        self.assertEqual(response.data['facility_name'], 'Bor OTP')
+
+    def test_deactivated_user_rejected_immediately(self):
+        self.login('claims_chw')
+        self.assertEqual(self.client.get('/api/assessments/').status_code, status.HTTP_200_OK)
+        self.chw.is_active = False
+        self.chw.save()
+        self.assertEqual(self.client.get('/api/assessments/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_rejected(self):
+        self.login('claims_chw')
+        self.chw.delete()
+        self.assertEqual(self.client.get('/api/assessments/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_changed_role_needs_token_refresh(self):
+        tokens = self.login('claims_chw')
+        self.chw.role = 'DOCTOR'
+        self.chw.save()
+        response = self.client.get('/api/assessments/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials()
+        refreshed = self.client.post('/api/auth/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(AccessToken(refreshed.data['access'])['role'], 'DOCTOR')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refreshed.data['access']}")
+        self.assertEqual(self.client.get('/api/treatments/').status_code, status.HTTP_200_OK)
+
+    def test_refresh_rejected_for_inactive_user(self):
+        tokens = self.login('claims_chw')
+        User.objects.filter(pk=self.chw.pk).update(is_active=False)
+        self.client.credentials()
+        response = self.client.post('/api/auth/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tokens_without_claims_still_accepted(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.doctor)}')
+        response = self.client.get('/api/assessments/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
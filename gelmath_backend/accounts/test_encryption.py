@@ -2,6 +2,7 @@
 ENCRYPTION TESTING - Data Protection & Cryptography
 Tests password hashing, token encryption, HTTPS enforcement, sensitive data protection
 """
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import check_password
@@ -246,6 +247,7 @@ class DataIntegrityTests(TestCase):
     """Test data integrity and tampering detection"""
     
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(username='integrity', password='test', role='CHW')
         self.client.force_authenticate(user=self.user)
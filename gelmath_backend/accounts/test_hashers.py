@@ -0,0 +1,101 @@
+"""
+PASSWORD HASHING POLICY TESTS
+Tests rehash-on-login, the bounded hashing slots and the cached login payload
+"""
+import threading
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from accounts import hashers
+from accounts.models import Facility
+
+User = get_user_model()
+
+SCRYPT_FIRST = [
+    'accounts.hashers.TunedScryptPasswordHasher',
+    'accounts.hashers.TunedPBKDF2PasswordHasher',
+]
+
+
+class HashingPolicyTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.facility = Facility.objects.create(name='Bor OTP', facility_type='OTP', state='Jonglei')
+        self.user = User.objects.create_user(username='hash_chw', password='test123', role='CHW',
+                                             facility=self.facility, state='Jonglei')
+
+    def login(self):
+        return self.client.post('/api/auth/login/', {'username': 'hash_chw', 'password': 'test123'})
+
+    def test_algorithm_change_rehashes_on_login(self):
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+        with override_settings(PASSWORD_HASHERS=SCRYPT_FIRST):
+            self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith('scrypt$16384$'))
+            self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+    def test_parameter_change_rehashes_on_login(self):
+        with override_settings(PASSWORD_HASHING={'pbkdf2_sha256': {'iterations': 120000}}):
+            self.login()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$120000$'))
+
+    def test_login_gets_503_when_hashing_slots_are_busy(self):
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        with mock.patch.object(hashers, '_slots', slots), override_settings(LOGIN_HASH_QUEUE_SECONDS=0):
+            response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        slots.release()
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+    @override_settings(PASSWORD_HASHING={'pbkdf2_sha256': {'iterations': 20000}}, LOGIN_HASH_QUEUE_SECONDS=2)
+    def test_verify_holds_one_slot(self):
+        """verify() calls encode(); the nested call must not wait for a second slot"""
+        hasher = hashers.TunedPBKDF2PasswordHasher()
+        encoded = hasher.encode('test123', hasher.salt())
+        for concurrency in (1, 2):
+            with self.subTest(concurrency=concurrency):
+                slots = threading.BoundedSemaphore(concurrency)
+                barrier = threading.Barrier(2)
+                results, errors = [], []
+
+                def check():
+                    barrier.wait()
+                    try:
+                        results.extend(hasher.verify('test123', encoded) for _ in range(3))
+                    except hashers.HashingBusy as exc:
+                        errors.append(exc)
+
+                with mock.patch.object(hashers, '_slots', slots):
+                    threads = [threading.Thread(target=check) for _ in range(2)]
+                    for thread in threads:
+                        thread.start()
+                    for thread in threads:
+                        thread.join()
+                self.assertEqual(errors, [])
+                self.assertEqual(results, [True] * 6)
+                # Every slot was given back
+                self.assertTrue(all(slots.acquire(blocking=False) for _ in range(concurrency)))
+
+    def test_login_payload_is_cached(self):
+        first = self.login()
+        self.assertEqual(first.data['user']['facility_name'], 'Bor OTP')
+        with self.assertNumQueries(2):  # user lookup in authenticate(), outstanding token insert
+            second = self.login()
+        self.assertEqual(second.data['user'], first.data['user'])
+
+    def test_login_payload_follows_user_and_facility_changes(self):
+        self.login()
+        self.facility.name = 'Bor Stabilisation Centre'
+        self.facility.save()
+        self.assertEqual(self.login().data['user']['facility_name'], 'Bor Stabilisation Centre')
+        self.user.first_name = 'Achol'
+        self.user.save()
+        self.assertEqual(self.login().data['user']['first_name'], 'Achol')
@@ -4,10 +4,12 @@ Tests response times, throughput, and load handling
 """
 import time
 import statistics
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth import get_user_model
-from assessments.models import Assessment
+from rest_framework.test import APIClient
+from assessments.models import Assessment, Referral, TreatmentRecord
 from accounts.models import Facility
+from gelmath_api.query_budget import QueryBudgetTestMixin
 
 User = get_user_model()
 
@@ -263,3 +265,69 @@ class LoadTestResults(TestCase):
         print("="*60 + "\n")
         
         self.assertTrue(True)
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """Query budgets per endpoint (QUERY_BUDGETS) - a new N+1 fails here"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='budget_admin', password='test123', role='MOH_ADMIN')
+        for i in range(10):
+            facility = Facility.objects.create(name=f'Budget Facility {i}', state='Jonglei')
+            chw = User.objects.create_user(username=f'budget_chw_{i}', password='test123', role='CHW', facility=facility)
+            doctor = User.objects.create_user(username=f'budget_doc_{i}', password='test123', role='DOCTOR', facility=facility)
+            for j in range(3):
+                assessment = Assessment.objects.create(
+                    child_id=f'BUDGET_{i}_{j}', sex='F', age_months=20, muac_mm=108, edema=0,
+                    appetite='good', danger_signs=0, clinical_status='SAM' if j == 0 else 'MAM',
+                    facility=facility, chw=chw,
+                )
+                Referral.objects.create(assessment=assessment, referred_by=chw, referred_to=doctor,
+                                        status='COMPLETED' if j == 0 else 'PENDING')
+                TreatmentRecord.objects.create(assessment=assessment, doctor=doctor, status='ADMITTED')
+        cls.chw = chw
+        cls.facility = facility
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list_endpoints_within_budget(self):
+        for url in ['/api/assessments/', '/api/treatments/', '/api/referrals/', '/api/users/']:
+            with self.subTest(url=url):
+                self.assertWithinQueryBudget(self.get(url))
+
+    def test_chw_list_within_budget(self):
+        self.client.force_authenticate(user=self.chw)
+        self.assertWithinQueryBudget(self.get('/api/assessments/'))
+
+    def test_analytics_within_budget(self):
+        for url in ['/api/analytics/national-summary/', '/api/analytics/chw-performance/',
+                    '/api/analytics/doctor-performance/', f'/api/analytics/facility/{self.facility.id}/']:
+            with self.subTest(url=url):
+                self.assertWithinQueryBudget(self.get(url))
+
+    def test_performance_rows_unchanged(self):
+        rows = {row['chw_name']: row for row in self.get('/api/analytics/chw-performance/').data}
+        self.assertEqual(rows['budget_chw_0']['total_assessments'], 3)
+        self.assertEqual((rows['budget_chw_0']['sam_cases'], rows['budget_chw_0']['mam_cases']), (1, 2))
+        rows = {row['doctor_name']: row for row in self.get('/api/analytics/doctor-performance/').data}
+        self.assertEqual((rows['budget_doc_0']['total_referrals'], rows['budget_doc_0']['completed_referrals']), (3, 1))
+
+    def test_server_timing_header(self):
+        response = self.get('/api/assessments/')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$')
+
+    @override_settings(QUERY_BUDGETS={'default': {'queries': 0}})
+    def test_over_budget_is_logged_and_fails_helper(self):
+        with self.assertLogs('gelmath.query_budget', level='WARNING') as logs:
+            response = self.get('/api/analytics/national-summary/')
+        self.assertIn('national_summary', logs.output[0])
+        with self.assertRaises(AssertionError):
+            self.assertWithinQueryBudget(response)
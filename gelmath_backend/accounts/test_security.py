@@ -2,6 +2,7 @@
 SECURITY TESTING - OWASP Top 10 & Common Vulnerabilities
 Tests authentication, authorization, injection, XSS, data exposure, etc.
 """
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
@@ -180,6 +181,7 @@ class InjectionSecurityTests(TestCase):
     """Test injection vulnerabilities (SQL, NoSQL, Command)"""
     
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(username='injtest', password='test', role='CHW')
         self.client.force_authenticate(user=self.user)
@@ -280,6 +282,7 @@ class InputValidationSecurityTests(TestCase):
     """Test input validation and sanitization"""
     
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(username='valtest', password='test', role='CHW')
         self.client.force_authenticate(user=self.user)
@@ -361,6 +364,7 @@ class MassAssignmentSecurityTests(TestCase):
     """Test mass assignment vulnerabilities"""
     
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.chw = User.objects.create_user(username='masstest', password='test', role='CHW')
         self.client.force_authenticate(user=self.chw)
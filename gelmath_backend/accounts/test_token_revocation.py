@@ -0,0 +1,131 @@
+"""
+TOKEN BLACKLIST TESTS
+Tests Bloom-filtered blacklist lookups on refresh, batched pruning and token metrics
+"""
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from accounts import token_revocation
+from accounts.token_revocation import BloomFilter, RevocationFilter, shared_cache
+
+User = get_user_model()
+
+
+class BloomFilterTests(TestCase):
+
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TokenRevocationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(token_revocation, 'revocation_filter', RevocationFilter())
+        self.filter = patcher.start()
+        self.addCleanup(patcher.stop)
+        # The test cache is LocMem; behave as with the production Redis cache unless a test says otherwise
+        shared = mock.patch.object(token_revocation, 'shared_cache', return_value=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+        self.client = APIClient()
+        self.chw = User.objects.create_user(username='rev_chw', password='test123', role='CHW')
+        self.admin = User.objects.create_user(username='rev_admin', password='test123', role='MOH_ADMIN')
+
+    def login(self, username='rev_chw'):
+        response = self.client.post('/api/auth/login/', {'username': username, 'password': 'test123'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def refresh(self, token):
+        return self.client.post('/api/auth/refresh/', {'refresh': token})
+
+    def test_rotated_token_is_rejected(self):
+        tokens = self.login()
+        first = self.refresh(tokens['refresh'])
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.refresh(first.data['refresh']).status_code, status.HTTP_200_OK)
+
+    def test_clean_tokens_skip_blacklist_query(self):
+        self.filter.sync()
+        self.assertFalse(token_revocation.is_blacklisted('never-issued'))
+        with self.assertNumQueries(0):
+            self.assertFalse(token_revocation.is_blacklisted('never-issued-either'))
+
+    def test_other_workers_pick_up_new_entries(self):
+        tokens = self.login()
+        self.filter.sync()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.refresh(tokens['refresh'])
+        jti = BlacklistedToken.objects.get().token.jti
+
+        # A worker whose filter was built before the refresh only loads what changed since
+        worker = RevocationFilter()
+        worker.bloom, worker.state = BloomFilter(100, 0.01), (0, 0)
+        worker.built_at, worker.synced_at = time.monotonic(), timezone.now() - timedelta(seconds=5)
+        self.assertTrue(worker.might_contain(jti))
+        self.assertEqual(worker.state, (0, 1))
+
+    def test_per_process_cache_fails_closed(self):
+        """Without a shared cache another worker's blacklisting is seen through the database"""
+        tokens = self.login()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.refresh(tokens['refresh'])
+        jti = BlacklistedToken.objects.get().token.jti
+
+        # A worker that never heard of the new entry: its filter is current as far as the cache says
+        worker = RevocationFilter()
+        worker.bloom, worker.state = BloomFilter(100, 0.01), worker._shared_state()
+        worker.built_at, worker.synced_at = time.monotonic(), timezone.now()
+        with mock.patch.object(token_revocation, 'revocation_filter', worker):
+            self.assertFalse(token_revocation.is_blacklisted(jti))
+            with mock.patch.object(token_revocation, 'shared_cache', return_value=False):
+                self.assertTrue(token_revocation.is_blacklisted(jti))
+                self.assertFalse(token_revocation.is_blacklisted('never-issued'))
+        # The unpatched check recognises the test settings' LocMem cache
+        self.assertFalse(shared_cache())
+
+    def test_prune_deletes_expired_tokens_in_batches(self):
+        tokens = self.login()
+        self.refresh(tokens['refresh'])
+        expired = timezone.now() - timedelta(days=1)
+        for i in range(5):
+            outstanding = OutstandingToken.objects.create(user=self.chw, jti=f'old-{i}', token='x', expires_at=expired)
+            BlacklistedToken.objects.create(token=outstanding)
+
+        out = StringIO()
+        call_command('prune_tokens', '--batch-size', '2', stdout=out)
+        self.assertIn('Deleted 5 expired tokens', out.getvalue())
+        self.assertEqual(OutstandingToken.objects.filter(expires_at__lte=timezone.now()).count(), 0)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+        self.assertEqual(cache.get(token_revocation.EPOCH_KEY), 1)
+
+    def test_token_stats(self):
+        tokens = self.login()
+        self.refresh(tokens['refresh'])
+        self.refresh(tokens['refresh'])
+
+        self.client.force_authenticate(user=self.chw)
+        self.assertEqual(self.client.get('/api/ops/token-stats/').status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=self.admin)
+        stats = self.client.get('/api/ops/token-stats/').data
+        self.assertEqual(stats['blacklisted'], 1)
+        self.assertEqual(stats['refresh']['count'], 2)
+        self.assertEqual(stats['refresh']['failed'], 1)
+        self.assertIsNotNone(stats['refresh']['p95_ms'])
+        self.assertTrue(stats['bloom_filter']['built'])
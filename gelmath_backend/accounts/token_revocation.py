@@ -0,0 +1,258 @@
+"""
+Refresh token blacklist: fast lookups, pruning and metrics.
+
+Every refresh rotates the refresh token and blacklists the old one, so the
+token_blacklist tables grow with every CHW login. Two things keep refresh
+cheap as they do:
+
+- Lookups go through a per-process Bloom filter of the jtis of unexpired
+  blacklisted tokens. A jti the filter has never seen is certainly not
+  blacklisted and needs no query; only filter hits (real or false positives,
+  about TOKEN_BLOOM_ERROR_RATE of clean tokens) are confirmed in the database.
+  New blacklist entries are added locally and bump a generation counter in
+  the shared cache; other workers see the bump on their next lookup and load
+  the recently blacklisted jtis. Filters are rebuilt from scratch every
+  TOKEN_BLOOM_REBUILD_SECONDS, after pruning, or when they outgrow
+  TOKEN_BLOOM_CAPACITY. With a per-process default cache (LocMem, as in the
+  base settings, or Dummy) the bump never reaches other workers, so the
+  filter is skipped and every lookup queries the blacklist.
+- `manage.py prune_tokens` deletes expired outstanding/blacklisted tokens in
+  batches, which also shrinks the filters on their next rebuild.
+
+Table sizes, filter state and refresh latency are reported by
+GET /api/ops/token-stats/.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from .views import IsMoHAdmin
+
+GENERATION_KEY = 'token-blacklist:generation'
+EPOCH_KEY = 'token-blacklist:epoch'
+REFRESH_STATS_PREFIX = 'token-refresh-stats'
+# Upper bounds (ms) of the refresh latency histogram
+LATENCY_BUCKETS = (10, 25, 50, 100, 250, 500, 1000)
+# Incremental loads look this far behind the last sync, for rows committed out of order
+SYNC_OVERLAP = timedelta(minutes=1)
+# Default cache backends other workers can't see
+PER_PROCESS_CACHES = (LocMemCache, DummyCache)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing of one blake2b digest)."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def shared_cache():
+    """Whether generation bumps in the default cache reach the other workers."""
+    return not isinstance(caches['default'], PER_PROCESS_CACHES)
+
+
+class RevocationFilter:
+    """Per-process Bloom filter of blacklisted jtis, kept in step through the cache generation counter."""
+
+    def __init__(self):
+        self.bloom = None
+        self.state = None
+        self.built_at = 0
+        self.synced_at = None
+        self.hits = 0
+        self.false_positives = 0
+        self.lock = threading.Lock()
+
+    def _shared_state(self):
+        values = cache.get_many([EPOCH_KEY, GENERATION_KEY])
+        return values.get(EPOCH_KEY, 0), values.get(GENERATION_KEY, 0)
+
+    def _rebuild(self):
+        now = timezone.now()
+        jtis = BlacklistedToken.objects.filter(token__expires_at__gt=now).values_list('token__jti', flat=True)
+        bloom = BloomFilter(_setting('TOKEN_BLOOM_CAPACITY', 200000), _setting('TOKEN_BLOOM_ERROR_RATE', 0.001))
+        for jti in jtis.iterator(chunk_size=5000):
+            bloom.add(jti)
+        self.bloom, self.built_at, self.synced_at = bloom, time.monotonic(), now
+
+    def _load_recent(self):
+        now = timezone.now()
+        recent = BlacklistedToken.objects.filter(blacklisted_at__gte=self.synced_at - SYNC_OVERLAP)
+        for jti in recent.values_list('token__jti', flat=True):
+            self.bloom.add(jti)
+        self.synced_at = now
+
+    def sync(self):
+        state = self._shared_state()
+        if state == self.state and not self._stale():
+            return
+        with self.lock:
+            if self.bloom is None or state[0] != self.state[0] or self._stale():
+                self._rebuild()
+            elif state != self.state:
+                self._load_recent()
+            self.state = state
+
+    def _stale(self):
+        return (self.bloom is not None
+                and (self.bloom.count > self.bloom.capacity
+                     or time.monotonic() - self.built_at > _setting('TOKEN_BLOOM_REBUILD_SECONDS', 3600)))
+
+    def add(self, jti):
+        if self.bloom is not None:
+            self.bloom.add(jti)
+
+    def might_contain(self, jti):
+        self.sync()
+        return jti in self.bloom
+
+    def stats(self):
+        if self.bloom is None:
+            return {'built': False}
+        return {
+            'built': True,
+            'items': self.bloom.count,
+            'capacity': self.bloom.capacity,
+            'size_bytes': len(self.bloom.bits),
+            'hashes': self.bloom.hashes,
+            'age_seconds': round(time.monotonic() - self.built_at),
+            'hits': self.hits,
+            'false_positives': self.false_positives,
+        }
+
+
+revocation_filter = RevocationFilter()
+
+
+def is_blacklisted(jti):
+    """True if the token with this jti is blacklisted; queries only on Bloom filter hits."""
+    if not shared_cache():
+        # This worker would never hear of tokens blacklisted by the others: fail closed
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+    if not revocation_filter.might_contain(jti):
+        return False
+    revocation_filter.hits += 1
+    blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+    if not blacklisted:
+        revocation_filter.false_positives += 1
+    return blacklisted
+
+
+def _incr(key, delta=1):
+    if not cache.add(key, delta, None):
+        try:
+            cache.incr(key, delta)
+        except ValueError:  # evicted between add() and incr()
+            cache.set(key, delta, None)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def _token_blacklisted(sender, instance, created, **kwargs):
+    if not created:
+        return
+    revocation_filter.add(instance.token.jti)
+    transaction.on_commit(lambda: _incr(GENERATION_KEY))
+
+
+def prune_expired(batch_size=5000, now=None):
+    """Delete expired outstanding tokens (and their blacklist entries) in batches; returns rows deleted."""
+    now = now or timezone.now()
+    deleted = 0
+    while True:
+        ids = list(OutstandingToken.objects.filter(expires_at__lte=now).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            deleted += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+    if deleted:
+        # Every worker rebuilds its filter without the pruned jtis
+        _incr(EPOCH_KEY)
+    return deleted
+
+
+def record_refresh(duration_ms, ok):
+    _incr(f'{REFRESH_STATS_PREFIX}:count')
+    if not ok:
+        _incr(f'{REFRESH_STATS_PREFIX}:failed')
+    _incr(f'{REFRESH_STATS_PREFIX}:total_ms', round(duration_ms))
+    bucket = next((bound for bound in LATENCY_BUCKETS if duration_ms <= bound), 'inf')
+    _incr(f'{REFRESH_STATS_PREFIX}:le:{bucket}')
+
+
+def _percentile(histogram, count, fraction):
+    """Upper bound of the histogram bucket holding the given fraction of refreshes."""
+    seen = 0
+    for bound, hits in histogram.items():
+        seen += hits
+        if seen >= count * fraction:
+            return bound
+    return None
+
+
+def refresh_stats():
+    bounds = [*LATENCY_BUCKETS, 'inf']
+    keys = [f'{REFRESH_STATS_PREFIX}:{name}' for name in ('count', 'failed', 'total_ms')]
+    keys += [f'{REFRESH_STATS_PREFIX}:le:{bound}' for bound in bounds]
+    values = cache.get_many(keys)
+    count = values.get(keys[0], 0)
+    histogram = {bound: values.get(f'{REFRESH_STATS_PREFIX}:le:{bound}', 0) for bound in bounds}
+    return {
+        'count': count,
+        'failed': values.get(keys[1], 0),
+        'avg_ms': round(values.get(keys[2], 0) / count, 1) if count else None,
+        'p50_ms': _percentile(histogram, count, 0.5) if count else None,
+        'p95_ms': _percentile(histogram, count, 0.95) if count else None,
+        'histogram_ms': {str(bound): hits for bound, hits in histogram.items()},
+    }
+
+
+def blacklist_stats():
+    now = timezone.now()
+    return {
+        'outstanding': OutstandingToken.objects.count(),
+        'blacklisted': BlacklistedToken.objects.count(),
+        'expired': OutstandingToken.objects.filter(expires_at__lte=now).count(),
+        'bloom_filter': {**revocation_filter.stats(), 'in_use': shared_cache()},
+        'refresh': refresh_stats(),
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsMoHAdmin])
+def token_stats(request):
+    """Token table sizes, this worker's Bloom filter and refresh latency"""
+    return Response(blacklist_stats())
@@ -5,6 +5,7 @@ from django.contrib.auth import update_session_auth_hash
 from .models import User, Facility
 from .serializers import (UserSerializer, UserCreateSerializer, 
                           ChangePasswordSerializer, FacilitySerializer)
+from gelmath_api.query_optimization import SerializerRelationsMixin
 
 
 class IsMoHAdmin(permissions.BasePermission):
@@ -12,7 +13,7 @@ class IsMoHAdmin(permissions.BasePermission):
         return request.user.is_authenticated and request.user.role == 'MOH_ADMIN'
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     
     def get_serializer_class(self):
@@ -27,15 +28,18 @@ class UserViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
+        queryset = self.optimize_queryset(User.objects.all())
         if user.role == 'MOH_ADMIN':
-            return User.objects.all()
+            return queryset
         elif user.role == 'DOCTOR':
-            return User.objects.filter(facility=user.facility)
-        return User.objects.filter(id=user.id)
+            return queryset.filter(facility_id=user.facility_id)
+        return queryset.filter(id=user.id)
     
     @action(detail=False, methods=['get'])
     def me(self, request):
-        serializer = self.get_serializer(request.user)
+        # request.user only has the token claims loaded
+        user = User.objects.select_related('facility').get(pk=request.user.pk)
+        serializer = self.get_serializer(user)
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
@@ -6,9 +6,10 @@ from django.utils import timezone
 from datetime import timedelta
 from assessments.models import Assessment
 from accounts.models import User, Facility
+from gelmath_api.db_routing import ReplicaReadsMixin
 
 
-class NationalSummaryView(APIView):
+class NationalSummaryView(ReplicaReadsMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
@@ -50,7 +51,7 @@ class NationalSummaryView(APIView):
         })
 
 
-class StateTrendsView(APIView):
+class StateTrendsView(ReplicaReadsMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
@@ -95,7 +96,7 @@ class StateTrendsView(APIView):
         return Response(result)
 
 
-class TimeSeriesView(APIView):
+class TimeSeriesView(ReplicaReadsMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
@@ -120,7 +121,7 @@ class TimeSeriesView(APIView):
         return Response(list(assessments))
 
 
-class FacilityStatsView(APIView):
+class FacilityStatsView(ReplicaReadsMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request, facility_id):
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Assessment, TreatmentRecord
+from .models import Assessment, TreatmentRecord, SyncBatch, SyncTelemetry, ArchivedCase
 
 
 @admin.register(Assessment)
@@ -15,3 +15,25 @@ class TreatmentRecordAdmin(admin.ModelAdmin):
     list_display = ['assessment', 'doctor', 'status', 'admission_date', 'discharge_date']
     list_filter = ['status', 'admission_date']
     search_fields = ['assessment__child_id', 'doctor__username']
+
+
+@admin.register(SyncBatch)
+class SyncBatchAdmin(admin.ModelAdmin):
+    list_display = ['id', 'submitted_by', 'status', 'total_records', 'created_records', 'failed_records', 'created_at']
+    list_filter = ['status', 'created_at']
+    exclude = ['payload']
+
+
+@admin.register(SyncTelemetry)
+class SyncTelemetryAdmin(admin.ModelAdmin):
+    list_display = ['bucket', 'endpoint', 'user', 'device_id', 'app_version', 'records', 'status_code', 'duration_ms']
+    list_filter = ['endpoint', 'state', 'app_version', 'status_code']
+    search_fields = ['device_id', 'user__username']
+
+
+@admin.register(ArchivedCase)
+class ArchivedCaseAdmin(admin.ModelAdmin):
+    list_display = ['child_id', 'final_status', 'state', 'facility', 'assessment_count', 'last_activity_at', 'archived_at']
+    list_filter = ['final_status', 'state']
+    search_fields = ['child_id']
+    exclude = ['payload']
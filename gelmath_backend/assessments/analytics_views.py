@@ -1,144 +1,163 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.db.models import Avg, Count, Q
+from django.db.models.functions import TruncDate
 from .models import Assessment
+from gelmath_api.throttling import DashboardRateThrottle
+from gelmath_api.db_routing import read_from_replica
 
+# Querysets and row shaping below are shared with the async variants in async_views.py
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def national_summary(request):
-    """Get national-level summary statistics"""
-    assessments = Assessment.objects.all()
-    
-    total = assessments.count()
-    sam = assessments.filter(clinical_status='SAM').count()
-    mam = assessments.filter(clinical_status='MAM').count()
-    healthy = assessments.filter(clinical_status='Healthy').count()
-    
-    return Response({
+STATUS_COUNTS = {
+    'sam_count': Count('id', filter=Q(clinical_status='SAM')),
+    'mam_count': Count('id', filter=Q(clinical_status='MAM')),
+    'healthy_count': Count('id', filter=Q(clinical_status='Healthy')),
+}
+
+
+def summary_payload(counts):
+    total, sam, mam = counts['total'], counts['sam_count'], counts['mam_count']
+    return {
         'total_assessments': total,
         'sam_count': sam,
         'mam_count': mam,
-        'healthy_count': healthy,
+        'healthy_count': counts['healthy_count'],
         'sam_prevalence': round((sam / total * 100) if total > 0 else 0, 1),
         'mam_prevalence': round((mam / total * 100) if total > 0 else 0, 1),
-    })
+    }
+
+
+def state_trends_queryset():
+    return Assessment.objects.values('state').annotate(**STATUS_COUNTS).order_by('-sam_count')
+
+
+def time_series_queryset():
+    return Assessment.objects.annotate(
+        date=TruncDate('timestamp')
+    ).values('date').annotate(**STATUS_COUNTS).order_by('date')
+
+
+def chw_performance_queryset():
+    from accounts.models import User
+
+    # One grouped query instead of three counts per CHW
+    return User.objects.filter(role='CHW').values('id', 'username', 'first_name', 'last_name').annotate(
+        total=Count('assessments'),
+        sam=Count('assessments', filter=Q(assessments__clinical_status='SAM')),
+        mam=Count('assessments', filter=Q(assessments__clinical_status='MAM')),
+    )
+
+
+def chw_row(chw):
+    total, sam, mam = chw['total'], chw['sam'], chw['mam']
+    return {
+        'chw_id': chw['id'],
+        'chw_name': f"{chw['first_name']} {chw['last_name']}" if chw['first_name'] else chw['username'],
+        'total_assessments': total,
+        'sam_cases': sam,
+        'mam_cases': mam,
+        'healthy_cases': total - sam - mam
+    }
+
+
+def doctor_performance_queryset():
+    from accounts.models import User
+
+    return User.objects.filter(role='DOCTOR').values('id', 'username', 'first_name', 'last_name').annotate(
+        total=Count('referrals_received'),
+        completed=Count('referrals_received', filter=Q(referrals_received__status='COMPLETED')),
+    )
+
+
+def doctor_row(doc):
+    total, completed = doc['total'], doc['completed']
+    return {
+        'doctor_id': doc['id'],
+        'doctor_name': f"{doc['first_name']} {doc['last_name']}" if doc['first_name'] else doc['username'],
+        'total_referrals': total,
+        'completed_referrals': completed,
+        'completion_rate': round((completed / total * 100) if total > 0 else 0, 1)
+    }
+
+
+# facility_stats counts and MUAC mean in one aggregate query
+FACILITY_AGGREGATES = {'total': Count('id'), 'avg_muac': Avg('muac_mm'), **STATUS_COUNTS}
+
+
+def facility_payload(facility, stats, chw_count):
+    return {
+        'facility': facility.name,
+        'state': facility.state,
+        'chw_count': chw_count,
+        'total': stats['total'],
+        'sam_count': stats['sam_count'],
+        'mam_count': stats['mam_count'],
+        'healthy_count': stats['healthy_count'],
+        'avg_muac': stats['avg_muac']
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([DashboardRateThrottle])
+@read_from_replica
+def national_summary(request):
+    """Get national-level summary statistics"""
+    counts = Assessment.objects.aggregate(total=Count('id'), **STATUS_COUNTS)
+    return Response(summary_payload(counts))
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([DashboardRateThrottle])
+@read_from_replica
 def state_trends(request):
     """Get state-level breakdown"""
-    from django.db.models import Count, Q
-    
-    states = Assessment.objects.values('state').annotate(
-        sam_count=Count('id', filter=Q(clinical_status='SAM')),
-        mam_count=Count('id', filter=Q(clinical_status='MAM')),
-        healthy_count=Count('id', filter=Q(clinical_status='Healthy'))
-    ).order_by('-sam_count')
-    
-    return Response(list(states))
+    return Response(list(state_trends_queryset()))
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([DashboardRateThrottle])
+@read_from_replica
 def time_series(request):
     """Get time series data"""
-    from django.db.models.functions import TruncDate
-    
-    series = Assessment.objects.annotate(
-        date=TruncDate('timestamp')
-    ).values('date').annotate(
-        sam_count=Count('id', filter=Q(clinical_status='SAM')),
-        mam_count=Count('id', filter=Q(clinical_status='MAM')),
-        healthy_count=Count('id', filter=Q(clinical_status='Healthy'))
-    ).order_by('date')
-    
-    return Response(list(series))
+    return Response(list(time_series_queryset()))
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([DashboardRateThrottle])
+@read_from_replica
 def chw_performance(request):
     """Get CHW performance metrics"""
-    from accounts.models import User
-    
-    chws = User.objects.filter(role='CHW').values('id', 'username', 'first_name', 'last_name')
-    
-    performance = []
-    for chw in chws:
-        assessments = Assessment.objects.filter(chw_id=chw['id'])
-        total = assessments.count()
-        sam = assessments.filter(clinical_status='SAM').count()
-        mam = assessments.filter(clinical_status='MAM').count()
-        
-        performance.append({
-            'chw_id': chw['id'],
-            'chw_name': f"{chw['first_name']} {chw['last_name']}" if chw['first_name'] else chw['username'],
-            'total_assessments': total,
-            'sam_cases': sam,
-            'mam_cases': mam,
-            'healthy_cases': total - sam - mam
-        })
-    
-    return Response(performance)
+    return Response([chw_row(chw) for chw in chw_performance_queryset()])
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([DashboardRateThrottle])
+@read_from_replica
 def doctor_performance(request):
     """Get doctor performance metrics"""
-    from accounts.models import User
-    from assessments.models import Referral
-    
-    doctors = User.objects.filter(role='DOCTOR').values('id', 'username', 'first_name', 'last_name')
-    
-    performance = []
-    for doc in doctors:
-        referrals = Referral.objects.filter(referred_to_id=doc['id'])
-        total = referrals.count()
-        completed = referrals.filter(status='COMPLETED').count()
-        
-        performance.append({
-            'doctor_id': doc['id'],
-            'doctor_name': f"{doc['first_name']} {doc['last_name']}" if doc['first_name'] else doc['username'],
-            'total_referrals': total,
-            'completed_referrals': completed,
-            'completion_rate': round((completed / total * 100) if total > 0 else 0, 1)
-        })
-    
-    return Response(performance)
+    return Response([doctor_row(doc) for doc in doctor_performance_queryset()])
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([DashboardRateThrottle])
+@read_from_replica
 def facility_stats(request, facility_id):
     """Get facility statistics"""
     from accounts.models import Facility, User
-    from django.db.models import Avg
-    
+
     try:
         facility = Facility.objects.get(id=facility_id)
     except Facility.DoesNotExist:
         return Response({'error': 'Facility not found'}, status=404)
-    
-    assessments = Assessment.objects.filter(facility_id=facility_id)
-    total = assessments.count()
-    sam = assessments.filter(clinical_status='SAM').count()
-    mam = assessments.filter(clinical_status='MAM').count()
-    healthy = assessments.filter(clinical_status='Healthy').count()
-    avg_muac = assessments.aggregate(Avg('muac_mm'))['muac_mm__avg']
-    
+
+    stats = Assessment.objects.filter(facility_id=facility_id).aggregate(**FACILITY_AGGREGATES)
     chw_count = User.objects.filter(facility_id=facility_id, role='CHW', is_active=True).count()
-    
-    return Response({
-        'facility': facility.name,
-        'state': facility.state,
-        'chw_count': chw_count,
-        'total': total,
-        'sam_count': sam,
-        'mam_count': mam,
-        'healthy_count': healthy,
-        'avg_muac': avg_muac
-    })
+
+    return Response(facility_payload(facility, stats, chw_count))
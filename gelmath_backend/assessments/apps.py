@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AssessmentsConfig(AppConfig):
     name = 'assessments'
+
+    def ready(self):
+        # Registers the doctor directory invalidation signal handlers
+        from . import doctor_directory  # noqa: F401
@@ -0,0 +1,179 @@
+"""
+Cold-storage archival of closed cases.
+
+A case (all rows for one child_id) is closed when its latest treatment record
+has a final outcome and nothing about the child - assessments, treatments,
+referrals - changed within the archive horizon. archive_closed_cases() moves
+such cases, in batches, into one compressed `archived_cases` row per child and
+deletes them from the hot tables. case_history() reads hot and archived rows
+together so historical lookups by child_id don't care where a case lives;
+restore_case() puts a case back.
+"""
+import json
+import zlib
+from datetime import timedelta
+from django.conf import settings
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max, OuterRef, Q, Subquery
+from django.utils import timezone
+from .models import ArchivedCase, Assessment, Referral, TreatmentRecord
+
+CLOSED_STATUSES = ('RECOVERED', 'DEFAULTED', 'DIED', 'TRANSFERRED')
+
+
+def closed_case_ids(cutoff, limit):
+    """child_ids whose final treatment outcome is closed and whose last activity is before `cutoff`."""
+    final_status = TreatmentRecord.objects.filter(
+        assessment__child_id=OuterRef('child_id')
+    ).order_by('-created_at', '-id').values('status')[:1]
+
+    cases = (
+        Assessment.objects.order_by('child_id').values('child_id')
+        .annotate(
+            last_assessment=Max('timestamp'),
+            last_treatment=Max('treatment_records__updated_at'),
+            last_referral=Max('referrals__updated_at'),
+            final_status=Subquery(final_status),
+        )
+        .filter(last_assessment__lt=cutoff, last_treatment__lt=cutoff, final_status__in=CLOSED_STATUSES)
+        .filter(Q(last_referral__isnull=True) | Q(last_referral__lt=cutoff))
+    )
+    return [row['child_id'] for row in cases[:limit]]
+
+
+def _pack(rows):
+    return zlib.compress(json.dumps(rows, cls=DjangoJSONEncoder).encode('utf-8'))
+
+
+def _unpack(payload):
+    return json.loads(zlib.decompress(bytes(payload)).decode('utf-8'))
+
+
+@transaction.atomic
+def archive_cases(child_ids):
+    """Move the given cases into archived_cases. Returns the number of assessments archived."""
+    assessments = list(Assessment.objects.filter(child_id__in=child_ids).order_by('timestamp', 'id'))
+    referrals = list(Referral.objects.filter(assessment__in=assessments).order_by('id'))
+    treatments = list(TreatmentRecord.objects.filter(assessment__in=assessments).order_by('created_at', 'id'))
+
+    by_child = {}
+    child_of = {}
+    for assessment in assessments:
+        by_child.setdefault(assessment.child_id, {'assessments': [], 'referrals': [], 'treatments': []})
+        by_child[assessment.child_id]['assessments'].append(assessment)
+        child_of[assessment.id] = assessment.child_id
+    for referral in referrals:
+        by_child[child_of[referral.assessment_id]]['referrals'].append(referral)
+    for treatment in treatments:
+        by_child[child_of[treatment.assessment_id]]['treatments'].append(treatment)
+
+    existing = {case.child_id: case for case in ArchivedCase.objects.select_for_update().filter(child_id__in=by_child)}
+    for child_id, rows in by_child.items():
+        serialized = {key: serializers.serialize('python', objects) for key, objects in rows.items()}
+        case = existing.get(child_id) or ArchivedCase(child_id=child_id)
+        if case.pk:
+            # The child was archived before and came back: keep both episodes
+            previous = _unpack(case.payload)
+            serialized = {key: previous.get(key, []) + serialized[key] for key in serialized}
+
+        latest = rows['assessments'][-1]
+        case.state = latest.state
+        case.facility_id = latest.facility_id
+        case.chw_id = latest.chw_id
+        case.final_status = rows['treatments'][-1].status if rows['treatments'] else case.final_status
+        case.last_activity_at = max(
+            [latest.timestamp]
+            + [treatment.updated_at for treatment in rows['treatments']]
+            + [referral.updated_at for referral in rows['referrals']]
+        )
+        case.assessment_count = len(serialized['assessments'])
+        case.referral_count = len(serialized['referrals'])
+        case.treatment_count = len(serialized['treatments'])
+        case.payload = _pack(serialized)
+        case.save()
+
+    # Referrals and treatment records go with their assessments (on_delete=CASCADE)
+    Assessment.objects.filter(id__in=[assessment.id for assessment in assessments]).delete()
+    return len(assessments)
+
+
+def archive_closed_cases(horizon_days=None, batch_size=None, max_batches=None, dry_run=False):
+    """Archive closed cases batch by batch. Returns (cases, assessments) archived, or would-be cases on dry_run."""
+    horizon_days = horizon_days or getattr(settings, 'ARCHIVE_HORIZON_DAYS', 730)
+    batch_size = batch_size or getattr(settings, 'ARCHIVE_BATCH_SIZE', 200)
+    cutoff = timezone.now() - timedelta(days=horizon_days)
+
+    if dry_run:
+        return len(closed_case_ids(cutoff, limit=None)), 0
+
+    cases = archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        child_ids = closed_case_ids(cutoff, batch_size)
+        if not child_ids:
+            break
+        archived += archive_cases(child_ids)
+        cases += len(child_ids)
+        batches += 1
+    return cases, archived
+
+
+def archived_objects(case):
+    """Unsaved model instances for an archived case, with referral/treatment -> assessment links resolved in memory."""
+    payload = _unpack(case.payload)
+    assessments = [item.object for item in serializers.deserialize('python', payload['assessments'])]
+    by_id = {assessment.id: assessment for assessment in assessments}
+    linked = {}
+    for key in ('referrals', 'treatments'):
+        linked[key] = []
+        for item in serializers.deserialize('python', payload[key]):
+            item.object.assessment = by_id[item.object.assessment_id]
+            linked[key].append(item.object)
+    return assessments, linked['referrals'], linked['treatments']
+
+
+def scoped_archived_cases(user):
+    """Archived cases visible to a user, mirroring AssessmentViewSet scoping."""
+    if user.role == 'MOH_ADMIN':
+        return ArchivedCase.objects.all()
+    if user.role == 'DOCTOR':
+        return ArchivedCase.objects.filter(facility_id=user.facility_id)
+    if user.role == 'CHW':
+        return ArchivedCase.objects.filter(chw=user)
+    return ArchivedCase.objects.none()
+
+
+def case_history(child_id, assessments, archived_cases):
+    """
+    Hot and archived rows for one child, oldest first.
+    `assessments` and `archived_cases` are the caller's role-scoped querysets.
+    """
+    hot = list(assessments.filter(child_id=child_id).order_by('timestamp', 'id'))
+    referrals = list(Referral.objects.filter(assessment__in=hot).select_related('assessment', 'referred_to'))
+    treatments = list(TreatmentRecord.objects.filter(assessment__in=hot).select_related('assessment', 'doctor'))
+
+    case = archived_cases.filter(child_id=child_id).first()
+    if case:
+        cold_assessments, cold_referrals, cold_treatments = archived_objects(case)
+        hot = cold_assessments + hot
+        referrals = cold_referrals + referrals
+        treatments = cold_treatments + treatments
+    return {
+        'assessments': hot,
+        'referrals': sorted(referrals, key=lambda referral: referral.created_at),
+        'treatments': sorted(treatments, key=lambda treatment: treatment.created_at),
+        'archived_case': case,
+    }
+
+
+@transaction.atomic
+def restore_case(child_id):
+    """Write an archived case back into the hot tables (original ids) and drop the archive row."""
+    case = ArchivedCase.objects.select_for_update().get(child_id=child_id)
+    payload = _unpack(case.payload)
+    for key in ('assessments', 'referrals', 'treatments'):
+        for item in serializers.deserialize('python', payload[key]):
+            item.save()
+    case.delete()
+    return case.assessment_count
@@ -0,0 +1,94 @@
+"""
+Async variants of the analytics, forecast and doctor directory reads.
+
+Same payloads as analytics_views, forecast_views and
+ReferralViewSet.active_doctors (they share the querysets and row shaping),
+served under /api/async/ for the ASGI deployment (gelmath_api/asgi.py with
+uvicorn). Independent reads run concurrently with asyncio.gather.
+"""
+import asyncio
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.db.models import Count
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import status
+from accounts.models import Facility, User
+from gelmath_api.async_api import AsyncViewError, async_api_view, render
+from gelmath_api.throttling import DashboardRateThrottle
+from .analytics_views import (
+    FACILITY_AGGREGATES, STATUS_COUNTS, chw_performance_queryset, chw_row, doctor_performance_queryset,
+    doctor_row, facility_payload, state_trends_queryset, summary_payload, time_series_queryset,
+)
+from .doctor_directory import CACHE_CONTROL, directory_variant, get_directory, not_modified
+from .forecast_views import forecast_payload, monthly_counts_queryset
+from .models import Assessment
+
+
+@async_api_view(throttle_classes=[DashboardRateThrottle])
+async def national_summary(request):
+    """Get national-level summary statistics"""
+    counts = await Assessment.objects.aaggregate(total=Count('id'), **STATUS_COUNTS)
+    return summary_payload(counts)
+
+
+@async_api_view(throttle_classes=[DashboardRateThrottle])
+async def state_trends(request):
+    """Get state-level breakdown"""
+    return [row async for row in state_trends_queryset()]
+
+
+@async_api_view(throttle_classes=[DashboardRateThrottle])
+async def time_series(request):
+    """Get time series data"""
+    return [row async for row in time_series_queryset()]
+
+
+@async_api_view(throttle_classes=[DashboardRateThrottle])
+async def chw_performance(request):
+    """Get CHW performance metrics"""
+    return [chw_row(chw) async for chw in chw_performance_queryset()]
+
+
+@async_api_view(throttle_classes=[DashboardRateThrottle])
+async def doctor_performance(request):
+    """Get doctor performance metrics"""
+    return [doctor_row(doc) async for doc in doctor_performance_queryset()]
+
+
+@async_api_view(throttle_classes=[DashboardRateThrottle])
+async def facility_stats(request, facility_id):
+    """Get facility statistics"""
+    try:
+        facility, stats, chw_count = await asyncio.gather(
+            Facility.objects.aget(id=facility_id),
+            Assessment.objects.filter(facility_id=facility_id).aaggregate(**FACILITY_AGGREGATES),
+            User.objects.filter(facility_id=facility_id, role='CHW', is_active=True).acount(),
+        )
+    except Facility.DoesNotExist:
+        raise AsyncViewError('Facility not found', status.HTTP_404_NOT_FOUND)
+    return facility_payload(facility, stats, chw_count)
+
+
+@async_api_view(throttle_classes=[DashboardRateThrottle])
+async def forecast_trends(request):
+    """3-month malnutrition forecast from the last 12 months"""
+    end_date = timezone.now()
+    start_date = end_date - timedelta(days=365)
+    monthly_data = [row async for row in monthly_counts_queryset(start_date, end_date)]
+    # Forecasting is a few numpy calls over at most 12 rows; not worth a thread hop
+    return forecast_payload(monthly_data, end_date)
+
+
+@async_api_view(replica=False)
+async def active_doctors(request):
+    """Active doctors for referrals (cached directory, see doctor_directory)"""
+    directory = await sync_to_async(get_directory)()
+    etag, data = directory_variant(directory, request.GET, request.user)
+    headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL}
+    if not_modified(request, etag):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        for name, value in headers.items():
+            response[name] = value
+        return response
+    return render(data, headers=headers)
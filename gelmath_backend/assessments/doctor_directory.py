@@ -0,0 +1,134 @@
+"""
+Cached doctor directory for referral selection.
+
+The serialized list of active doctors (DoctorProfileSerializer) and the same
+doctors grouped by state and facility are built once and kept in the cache
+for DOCTOR_DIRECTORY_CACHE_SECONDS. Saving or deleting a doctor (including
+activation/deactivation and role changes) or a facility drops the cached copy
+after the transaction commits; the next request rebuilds it. The drop only
+reaches the cache of the worker that made the change when the cache is
+per-process (the base settings' LocMem), so the timeout is the longest any
+other worker serves a stale directory. Responses carry an ETag derived from the
+directory contents, so unchanged directories cost clients a 304.
+
+?grouped=true returns the state/facility grouping; ?ordering=proximity puts
+doctors at the requesting user's facility first, then the rest of their state.
+"""
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from accounts.models import Facility, User
+from gelmath_api.metrics import record_cache
+
+CACHE_KEY = 'doctor-directory'
+UNASSIGNED = 'Unassigned'
+# Clients must revalidate: the directory changes whenever a doctor does
+CACHE_CONTROL = 'private, no-cache'
+
+
+def build_directory():
+    from .serializers import DoctorProfileSerializer
+
+    doctors = User.objects.filter(role='DOCTOR', is_active=True).select_related('facility').order_by(
+        'state', 'facility__name', 'first_name', 'last_name', 'id'
+    )
+    rows = DoctorProfileSerializer(doctors, many=True).data
+
+    states = {}
+    for row in rows:
+        facilities = states.setdefault(row['state'] or UNASSIGNED, {})
+        key = (row['facility'], row['facility_name'] or UNASSIGNED)
+        facilities.setdefault(key, []).append(row)
+    groups = [
+        {
+            'state': state,
+            'facilities': [
+                {'facility': facility_id, 'facility_name': name, 'doctors': members}
+                for (facility_id, name), members in facilities.items()
+            ],
+        }
+        for state, facilities in states.items()
+    ]
+
+    version = hashlib.md5(json.dumps(rows, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    return {'version': version, 'doctors': [dict(row) for row in rows], 'groups': groups}
+
+
+def get_directory():
+    directory = cache.get(CACHE_KEY)
+    record_cache('doctor_directory', directory is not None)
+    if directory is None:
+        directory = build_directory()
+        cache.set(CACHE_KEY, directory, getattr(settings, 'DOCTOR_DIRECTORY_CACHE_SECONDS', 60))
+    return directory
+
+
+def invalidate():
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _user_changed(sender, instance, **kwargs):
+    # Non-doctors may have just stopped being doctors; only the cached ids can tell
+    directory = cache.get(CACHE_KEY)
+    listed = directory is not None and any(row['id'] == instance.pk for row in directory['doctors'])
+    if instance.role == 'DOCTOR' or listed:
+        invalidate()
+
+
+@receiver(post_save, sender=Facility)
+@receiver(post_delete, sender=Facility)
+def _facility_changed(sender, instance, **kwargs):
+    invalidate()
+
+
+def by_proximity(doctors, facility_id, state):
+    """Doctors at `facility_id` first, then in `state`, then everyone else; stable within each band."""
+    def band(row):
+        if facility_id is not None and row['facility'] == facility_id:
+            return 0
+        if state and row['state'] == state:
+            return 1
+        return 2
+    return sorted(doctors, key=band)
+
+
+def directory_variant(directory, params, user):
+    """(etag, data) of the variant of `directory` the query params ask for."""
+    grouped = params.get('grouped') in ('1', 'true')
+    proximity = params.get('ordering') == 'proximity'
+
+    variant = 'grouped' if grouped else 'list'
+    if proximity and not grouped:
+        variant = f'near-{user.facility_id}-{user.state}'
+    etag = quote_etag(f"{directory['version']}-{hashlib.md5(variant.encode('utf-8')).hexdigest()[:8]}")
+
+    if grouped:
+        return etag, directory['groups']
+    if proximity:
+        return etag, by_proximity(directory['doctors'], user.facility_id, user.state)
+    return etag, directory['doctors']
+
+
+def not_modified(request, etag):
+    return etag in [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]
+
+
+def directory_response(request):
+    """The (possibly grouped or proximity-ordered) directory with ETag / If-None-Match handling."""
+    etag, data = directory_variant(get_directory(), request.query_params, request.user)
+    if not_modified(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    response['Cache-Control'] = CACHE_CONTROL
+    return response
@@ -0,0 +1,120 @@
+"""
+Compact wire encodings for mobile sync and list endpoints.
+
+Negotiated through the Content-Type (requests) and Accept (responses) headers;
+JSON stays the default for clients that don't ask for anything else.
+
+- application/msgpack: MessagePack, same shape as the JSON body
+- application/vnd.gelmath.columnar+json: record lists sent column-wise, so
+  long field names such as `recommended_pathway` appear once per batch
+  instead of once per record:
+
+      {"count": 2, "columns": {"child_id": ["C1", "C2"], "muac_mm": [110, 121]}}
+"""
+import json
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+try:
+    import msgpack
+except ImportError:  # optional: the columnar encoding works without it
+    msgpack = None
+
+
+def _msgpack_default(obj):
+    # Reuse DRF's JSON coercions for datetimes, decimals, UUIDs and lazy strings
+    return encoders.JSONEncoder().default(obj)
+
+
+def to_columns(records):
+    """List of dicts -> {'count': n, 'columns': {field: [values]}}. Missing keys become None."""
+    fields = []
+    seen = set()
+    for record in records:
+        for key in record:
+            if key not in seen:
+                seen.add(key)
+                fields.append(key)
+    return {
+        'count': len(records),
+        'columns': {field: [record.get(field) for record in records] for field in fields},
+    }
+
+
+def from_columns(data):
+    """Inverse of to_columns(). Raises ValueError on ragged or malformed input."""
+    if not isinstance(data, dict) or not isinstance(data.get('columns'), dict):
+        raise ValueError("Columnar payload must be an object with a 'columns' object")
+    columns = data['columns']
+    count = data.get('count')
+    if count is None:
+        count = len(next(iter(columns.values()), []))
+    for field, values in columns.items():
+        if not isinstance(values, list) or len(values) != count:
+            raise ValueError(f"Column '{field}' must be a list of {count} values")
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())] if names else [{} for _ in range(count)]
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if msgpack is None:
+            raise ParseError('MessagePack support is not installed on this server')
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except Exception as e:
+            raise ParseError(f'MessagePack parse error - {e}')
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True)
+
+
+class ColumnarJSONParser(BaseParser):
+    """Accepts a columnar batch and hands views the usual list of records."""
+    media_type = 'application/vnd.gelmath.columnar+json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            data = json.loads(stream.read().decode('utf-8'))
+            if isinstance(data, dict) and 'records' in data:
+                # Sync envelope: {'client_batch_id': ..., 'records': {'count': .., 'columns': {..}}}
+                return {**data, 'records': from_columns(data['records'])}
+            return from_columns(data)
+        except ValueError as e:
+            raise ParseError(f'Columnar parse error - {e}')
+
+
+class ColumnarJSONRenderer(renderers.JSONRenderer):
+    """Renders record lists (bare or paginated 'results') column-wise; other bodies unchanged."""
+    media_type = 'application/vnd.gelmath.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, list) and all(isinstance(item, dict) for item in data):
+            data = to_columns(data)
+        elif isinstance(data, dict) and isinstance(data.get('results'), list):
+            data = {**data, 'results': to_columns(data['results'])}
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+def _available(classes):
+    return [cls for cls in classes if msgpack is not None or not cls.__name__.startswith('MessagePack')]
+
+
+# JSON first so it remains the default when no Accept/Content-Type is given
+SYNC_PARSER_CLASSES = list(api_settings.DEFAULT_PARSER_CLASSES) + _available([MessagePackParser, ColumnarJSONParser])
+SYNC_RENDERER_CLASSES = list(api_settings.DEFAULT_RENDERER_CLASSES) + _available([MessagePackRenderer, ColumnarJSONRenderer])
@@ -1,15 +1,121 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Count, Q
 from django.db.models.functions import TruncMonth
 from datetime import datetime, timedelta
-import numpy as np
+import logging
 from .models import Assessment
+from gelmath_api.throttling import DashboardRateThrottle
+from gelmath_api.db_routing import read_from_replica
+
+logger = logging.getLogger('gelmath.forecast')
+
+
+def monthly_counts_queryset(start_date, end_date):
+    """Assessments per month (total, SAM, MAM) between the two dates."""
+    return Assessment.objects.filter(
+        timestamp__gte=start_date,
+        timestamp__lte=end_date
+    ).annotate(
+        month=TruncMonth('timestamp')
+    ).values('month').annotate(
+        total=Count('id'),
+        sam=Count('id', filter=Q(clinical_status='SAM')),
+        mam=Count('id', filter=Q(clinical_status='MAM'))
+    ).order_by('month')
+
+
+def forecast_payload(monthly_data, end_date):
+    """Forecast, trends, alerts and resource needs from monthly_counts_queryset() rows."""
+    import numpy as np  # imported on first forecast, not at startup
+
+    # Convert to lists for analysis
+    months = []
+    sam_counts = []
+    mam_counts = []
+    total_counts = []
+    
+    for entry in monthly_data:
+        months.append(entry['month'].strftime('%Y-%m'))
+        sam_counts.append(entry['sam'])
+        mam_counts.append(entry['mam'])
+        total_counts.append(entry['total'])
+    
+    # Simple linear regression forecast
+    if len(sam_counts) >= 3:
+        sam_forecast = simple_forecast(sam_counts, periods=3)
+        mam_forecast = simple_forecast(mam_counts, periods=3)
+        total_forecast = simple_forecast(total_counts, periods=3)
+    else:
+        # Not enough data, use averages
+        sam_forecast = [np.mean(sam_counts)] * 3 if sam_counts else [0, 0, 0]
+        mam_forecast = [np.mean(mam_counts)] * 3 if mam_counts else [0, 0, 0]
+        total_forecast = [np.mean(total_counts)] * 3 if total_counts else [0, 0, 0]
+    logger.debug('Forecast from %d months of data', len(months), extra={
+        'method': 'trend' if len(sam_counts) >= 3 else 'average',
+        'months': months, 'historical_sam': sam_counts, 'forecast_sam': sam_forecast,
+    })
+    
+    # Generate future months
+    future_months = []
+    for i in range(1, 4):
+        future_date = end_date + timedelta(days=30 * i)
+        future_months.append(future_date.strftime('%Y-%m'))
+    
+    # Calculate trends and alerts
+    sam_trend = calculate_trend(sam_counts)
+    mam_trend = calculate_trend(mam_counts)
+    
+    # Generate alerts
+    alerts = []
+    if sam_trend > 10:
+        alerts.append({
+            'severity': 'high',
+            'type': 'SAM_INCREASE',
+            'message': f'SAM cases projected to increase by {sam_trend:.1f}% in next 3 months',
+            'recommendation': 'Increase RUTF stock and SC-ITP capacity'
+        })
+    if mam_trend > 15:
+        alerts.append({
+            'severity': 'medium',
+            'type': 'MAM_INCREASE',
+            'message': f'MAM cases projected to increase by {mam_trend:.1f}% in next 3 months',
+            'recommendation': 'Prepare additional TSFP resources'
+        })
+    
+    # Resource requirements
+    resources = calculate_resource_needs(sam_forecast, mam_forecast)
+    
+    return {
+        'historical': {
+            'months': months,
+            'sam_counts': sam_counts,
+            'mam_counts': mam_counts,
+            'total_counts': total_counts
+        },
+        'forecast': {
+            'months': future_months,
+            'sam_forecast': [int(x) for x in sam_forecast],
+            'mam_forecast': [int(x) for x in mam_forecast],
+            'total_forecast': [int(x) for x in total_forecast]
+        },
+        'trends': {
+            'sam_trend': round(sam_trend, 1),
+            'mam_trend': round(mam_trend, 1),
+            'sam_direction': 'increasing' if sam_trend > 0 else 'decreasing',
+            'mam_direction': 'increasing' if mam_trend > 0 else 'decreasing'
+        },
+        'alerts': alerts,
+        'resources': resources,
+        'confidence': 'medium' if len(sam_counts) >= 6 else 'low'
+    }
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([DashboardRateThrottle])
+@read_from_replica
 def forecast_trends(request):
     """Generate 3-month forecast for malnutrition trends using simple time-series analysis."""
     try:
@@ -18,106 +124,11 @@ def forecast_trends(request):
         # Get historical data (last 12 months)
         end_date = timezone.now()
         start_date = end_date - timedelta(days=365)
-        
-        # Aggregate monthly data
-        monthly_data = Assessment.objects.filter(
-            timestamp__gte=start_date,
-            timestamp__lte=end_date
-        ).annotate(
-            month=TruncMonth('timestamp')
-        ).values('month').annotate(
-            total=Count('id'),
-            sam=Count('id', filter=Q(clinical_status='SAM')),
-            mam=Count('id', filter=Q(clinical_status='MAM'))
-        ).order_by('month')
-        
-        # Convert to lists for analysis
-        months = []
-        sam_counts = []
-        mam_counts = []
-        total_counts = []
-        
-        for entry in monthly_data:
-            months.append(entry['month'].strftime('%Y-%m'))
-            sam_counts.append(entry['sam'])
-            mam_counts.append(entry['mam'])
-            total_counts.append(entry['total'])
-        
-        # Simple linear regression forecast
-        if len(sam_counts) >= 3:
-            sam_forecast = simple_forecast(sam_counts, periods=3)
-            mam_forecast = simple_forecast(mam_counts, periods=3)
-            total_forecast = simple_forecast(total_counts, periods=3)
-            print(f"Forecast generated from {len(sam_counts)} months of data")
-            print(f"Historical SAM: {sam_counts}")
-            print(f"Forecasted SAM: {sam_forecast}")
-        else:
-            # Not enough data, use averages
-            sam_forecast = [np.mean(sam_counts)] * 3 if sam_counts else [0, 0, 0]
-            mam_forecast = [np.mean(mam_counts)] * 3 if mam_counts else [0, 0, 0]
-            total_forecast = [np.mean(total_counts)] * 3 if total_counts else [0, 0, 0]
-            print(f"Not enough data ({len(sam_counts)} months), using averages")
-        
-        # Generate future months
-        future_months = []
-        for i in range(1, 4):
-            future_date = end_date + timedelta(days=30 * i)
-            future_months.append(future_date.strftime('%Y-%m'))
-        
-        print(f"Total assessments in DB: {Assessment.objects.count()}")
-        print(f"Assessments in date range: {Assessment.objects.filter(timestamp__gte=start_date, timestamp__lte=end_date).count()}")
-        print(f"Unique months found: {len(months)}")
-        print(f"Months: {months}")
-        
-        # Calculate trends and alerts
-        sam_trend = calculate_trend(sam_counts)
-        mam_trend = calculate_trend(mam_counts)
-        
-        # Generate alerts
-        alerts = []
-        if sam_trend > 10:
-            alerts.append({
-                'severity': 'high',
-                'type': 'SAM_INCREASE',
-                'message': f'SAM cases projected to increase by {sam_trend:.1f}% in next 3 months',
-                'recommendation': 'Increase RUTF stock and SC-ITP capacity'
-            })
-        if mam_trend > 15:
-            alerts.append({
-                'severity': 'medium',
-                'type': 'MAM_INCREASE',
-                'message': f'MAM cases projected to increase by {mam_trend:.1f}% in next 3 months',
-                'recommendation': 'Prepare additional TSFP resources'
-            })
-        
-        # Resource requirements
-        resources = calculate_resource_needs(sam_forecast, mam_forecast)
-        
-        return Response({
-            'historical': {
-                'months': months,
-                'sam_counts': sam_counts,
-                'mam_counts': mam_counts,
-                'total_counts': total_counts
-            },
-            'forecast': {
-                'months': future_months,
-                'sam_forecast': [int(x) for x in sam_forecast],
-                'mam_forecast': [int(x) for x in mam_forecast],
-                'total_forecast': [int(x) for x in total_forecast]
-            },
-            'trends': {
-                'sam_trend': round(sam_trend, 1),
-                'mam_trend': round(mam_trend, 1),
-                'sam_direction': 'increasing' if sam_trend > 0 else 'decreasing',
-                'mam_direction': 'increasing' if mam_trend > 0 else 'decreasing'
-            },
-            'alerts': alerts,
-            'resources': resources,
-            'confidence': 'medium' if len(sam_counts) >= 6 else 'low'
-        })
+
+        return Response(forecast_payload(monthly_counts_queryset(start_date, end_date), end_date))
         
     except Exception as e:
+        logger.exception('Forecast failed')
         return Response({'error': str(e)}, status=500)
 
 
@@ -126,6 +137,8 @@ def simple_forecast(data, periods=3):
     if len(data) < 2:
         return [data[0] if data else 0] * periods
     
+    import numpy as np
+
     # Linear regression
     x = np.arange(len(data))
     y = np.array(data)
@@ -149,6 +162,7 @@ def calculate_trend(data):
     if len(data) < 2:
         return 0
     
+    import numpy as np
     recent_avg = np.mean(data[-3:]) if len(data) >= 3 else data[-1]
     older_avg = np.mean(data[:3]) if len(data) >= 6 else data[0]
     
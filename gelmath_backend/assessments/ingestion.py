@@ -0,0 +1,135 @@
+"""
+Asynchronous sync ingestion.
+
+The sync endpoint only validates the envelope and stages the raw batch in the
+`sync_batches` table. A DB-backed worker (`manage.py process_sync_batches`)
+claims queued batches and runs per-record validation, ML enrichment and the
+inserts, so request latency no longer depends on batch size.
+"""
+import logging
+import time
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from gelmath_api.metrics import SYNC_BATCH_RECORDS
+from .models import SyncBatch
+from .serializers import AssessmentCreateSerializer
+from .telemetry import collect, record_batch_processing
+
+logger = logging.getLogger('gelmath.ingestion')
+
+# Progress is written back every N records so the status endpoint stays current
+PROGRESS_EVERY = 50
+# Only keep the first few record errors on the batch row
+MAX_STORED_ERRORS = 100
+
+
+def stage_sync_batch(user, records, client_batch_id=''):
+    """Persist a validated envelope. Returns (batch, created); retries of the same client batch are deduplicated."""
+    if client_batch_id:
+        existing = SyncBatch.objects.filter(submitted_by=user, client_batch_id=client_batch_id).first()
+        if existing:
+            return existing, False
+
+    try:
+        with transaction.atomic():
+            batch = SyncBatch.objects.create(
+                submitted_by=user,
+                client_batch_id=client_batch_id,
+                payload=records,
+                total_records=len(records),
+            )
+    except IntegrityError:
+        # A concurrent retry of the same client batch staged it first
+        if not client_batch_id:
+            raise
+        return SyncBatch.objects.get(submitted_by=user, client_batch_id=client_batch_id), False
+    SYNC_BATCH_RECORDS.observe(len(records))
+    dispatch_sync_batch(batch)
+    return batch, True
+
+
+def dispatch_sync_batch(batch):
+    """Hand a staged batch to the configured worker mode."""
+    mode = getattr(settings, 'SYNC_INGESTION_MODE', 'worker')
+    if mode == 'eager':
+        # Development/tests: process in-process once the staging row is committed
+        transaction.on_commit(lambda: process_sync_batch(batch.id))
+    # 'worker': the process_sync_batches command polls for QUEUED batches
+
+
+def claim_next_batch():
+    """Atomically move the oldest queued batch to PROCESSING. Safe with several workers."""
+    for batch_id in SyncBatch.objects.filter(status='QUEUED').values_list('id', flat=True)[:10]:
+        claimed = SyncBatch.objects.filter(id=batch_id, status='QUEUED').update(
+            status='PROCESSING', started_at=timezone.now()
+        )
+        if claimed:
+            return batch_id
+    return None
+
+
+def requeue_stale_batches(older_than):
+    """Return batches stuck in PROCESSING (crashed worker) to the queue."""
+    cutoff = timezone.now() - older_than
+    return SyncBatch.objects.filter(status='PROCESSING', started_at__lt=cutoff).update(
+        status='QUEUED', started_at=None
+    )
+
+
+def process_sync_batch(batch_id):
+    """Validate and insert every record of a batch, recording progress and per-record errors."""
+    SyncBatch.objects.filter(id=batch_id, status='QUEUED').update(
+        status='PROCESSING', started_at=timezone.now()
+    )
+    batch = SyncBatch.objects.select_related('submitted_by').get(id=batch_id)
+    if batch.status != 'PROCESSING':
+        return batch
+
+    context = {'user': batch.submitted_by}
+    processed = created = failed = 0
+    errors = []
+
+    start = time.perf_counter()
+    with collect() as stats:
+        try:
+            for index, record in enumerate(batch.payload):
+                serializer = AssessmentCreateSerializer(data=record, context=context)
+                record_errors = None
+                if serializer.is_valid():
+                    try:
+                        # Savepoint per record: a failing insert doesn't take the batch (or earlier records) with it
+                        with transaction.atomic():
+                            serializer.save()
+                        created += 1
+                    except Exception as e:
+                        logger.exception('Sync record failed', extra={'batch_id': batch.id, 'index': index})
+                        record_errors = str(e)
+                else:
+                    record_errors = serializer.errors
+                if record_errors is not None:
+                    failed += 1
+                    if len(errors) < MAX_STORED_ERRORS:
+                        errors.append({'index': index, 'child_id': record.get('child_id'), 'errors': record_errors})
+                processed += 1
+
+                if processed % PROGRESS_EVERY == 0:
+                    SyncBatch.objects.filter(id=batch.id).update(
+                        processed_records=processed, created_records=created, failed_records=failed
+                    )
+
+            batch.status = 'COMPLETED'
+        except Exception as e:
+            logger.exception('Sync batch failed', extra={'batch_id': batch.id})
+            errors.append({'index': processed, 'errors': str(e)})
+            batch.status = 'FAILED'
+
+    batch.processed_records = processed
+    batch.created_records = created
+    batch.failed_records = failed
+    batch.errors = errors
+    batch.completed_at = timezone.now()
+    batch.save(update_fields=['status', 'processed_records', 'created_records',
+                              'failed_records', 'errors', 'completed_at'])
+    record_batch_processing(batch, (time.perf_counter() - start) * 1000, stats)
+    return batch
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from assessments.archive import archive_closed_cases
+
+
+class Command(BaseCommand):
+    help = 'Move closed cases with no recent activity from the hot tables into archived_cases'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon-days', type=int, default=getattr(settings, 'ARCHIVE_HORIZON_DAYS', 730),
+                            help='Archive cases whose last activity is older than this')
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'ARCHIVE_BATCH_SIZE', 200),
+                            help='Cases moved per transaction')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the cases that would be archived')
+
+    def handle(self, *args, **options):
+        cases, assessments = archive_closed_cases(
+            horizon_days=options['horizon_days'],
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(f'{cases} closed case(s) older than {options["horizon_days"]} days would be archived')
+        else:
+            self.stdout.write(f'Archived {cases} case(s) ({assessments} assessments)')
@@ -0,0 +1,45 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from assessments.partitions import (detach_partitions_before, ensure_partitions, is_partitioned,
+                                    list_partitions)
+
+
+def _month(value):
+    try:
+        return datetime.strptime(value, '%Y-%m').date()
+    except ValueError:
+        raise CommandError(f'Expected a month as YYYY-MM, got {value!r}')
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly assessment partitions, list them, or detach old months'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=3,
+                            help='Create partitions through this many months after the current one')
+        parser.add_argument('--list', action='store_true', help='List partitions with estimated row counts')
+        parser.add_argument('--detach-before', metavar='YYYY-MM',
+                            help='Detach monthly partitions older than this month (kept as standalone tables)')
+        parser.add_argument('--drop', action='store_true', help='With --detach-before, drop the detached tables')
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            self.stdout.write(self.style.WARNING('assessments is not partitioned on this database; nothing to do'))
+            return
+
+        if options['list']:
+            for name, month, rows in list_partitions():
+                self.stdout.write(f'{name:<28} {month.strftime("%Y-%m") if month else "DEFAULT":<8} ~{rows} rows')
+            return
+
+        if options['detach_before']:
+            detached = detach_partitions_before(_month(options['detach_before']), drop=options['drop'])
+            action = 'Dropped' if options['drop'] else 'Detached'
+            self.stdout.write(f'{action} {len(detached)} partition(s): {", ".join(detached) or "-"}')
+            return
+
+        if options['drop']:
+            raise CommandError('--drop only applies together with --detach-before')
+
+        created = ensure_partitions(options['months_ahead'])
+        self.stdout.write(f'Created {len(created)} partition(s): {", ".join(created) or "-"}')
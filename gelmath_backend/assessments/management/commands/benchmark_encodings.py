@@ -0,0 +1,50 @@
+import io
+import json
+import time
+from django.core.management.base import BaseCommand
+from assessments.encodings import msgpack, to_columns, ColumnarJSONParser
+from assessments.testing import full_record
+
+
+def _csv(value, cast=str):
+    return [cast(item) for item in value.split(',') if item]
+
+
+class Command(BaseCommand):
+    help = 'Compare payload size and parse time of the sync encodings against plain JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,10000', help='Records per sync batch to measure')
+        parser.add_argument('--iterations', type=int, default=5, help='Parses per measurement; the mean is shown')
+
+    def _parse_ms(self, parse, payload, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            parse(payload)
+        return (time.perf_counter() - start) / iterations * 1000
+
+    def handle(self, *args, **options):
+        parser = ColumnarJSONParser()
+        parsers = {
+            'json': json.loads,
+            'columnar': lambda payload: parser.parse(io.BytesIO(payload)),
+        }
+        if msgpack is not None:
+            parsers['msgpack'] = msgpack.unpackb
+        else:
+            self.stdout.write('msgpack not installed: MessagePack skipped')
+
+        self.stdout.write(f'{"records":>8} {"format":>9} {"bytes":>10} {"vs json":>8} {"parse ms":>9}')
+        for n in _csv(options['sizes'], int):
+            records = [full_record(i) for i in range(n)]
+            encoded = {
+                'json': json.dumps(records).encode(),
+                'columnar': json.dumps(to_columns(records)).encode(),
+            }
+            if msgpack is not None:
+                encoded['msgpack'] = msgpack.packb(records)
+
+            for name, payload in encoded.items():
+                ms = self._parse_ms(parsers[name], payload, options['iterations'])
+                ratio = len(payload) / len(encoded['json'])
+                self.stdout.write(f'{n:>8} {name:>9} {len(payload):>10} {ratio:>7.0%} {ms:>9.2f}')
@@ -0,0 +1,175 @@
+import json
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from accounts.models import User
+from assessments.models import Assessment
+from assessments.partitions import is_partitioned, month_start, partition_month
+from assessments.views import AssessmentViewSet, ReferralViewSet, TreatmentRecordViewSet
+
+def list_page(viewset, role, cursor_at=None, **params):
+    """
+    The page query a list request runs: the viewset's own scoping, filters and
+    select_related for a `role` user with id 1, ordered and sliced by its
+    KeysetPagination (after a cursor at `cursor_at` when given).
+    """
+    request = Request(APIRequestFactory().get('/', {**params, 'with_count': 'false'}))
+    request.user = User(id=1, role=role, facility_id=1)
+    view = viewset(request=request, action='list', format_kwarg=None, args=(), kwargs={})
+    paginator = view.paginator
+    paginator.ordering = tuple(getattr(view, 'keyset_ordering', paginator.ordering))
+    paginator.page_size = paginator.get_page_size(request)
+    cursor = {'position': [cursor_at, 1], 'reverse': False} if cursor_at else None
+    return paginator.page_queryset(view.filter_queryset(view.get_queryset()), cursor)
+
+
+def hot_queries():
+    """(label, queryset, acceptable index names) for the query shapes the API runs most."""
+    since = timezone.now() - timedelta(days=30)
+    return [
+        ('CHW assessment list',
+         list_page(AssessmentViewSet, 'CHW'),
+         {'assessment_chw_ts_idx'}),
+        ('Facility assessment list (doctor)',
+         list_page(AssessmentViewSet, 'DOCTOR'),
+         {'assessment_facility_ts_idx'}),
+        ('Doctor treatment list',
+         list_page(TreatmentRecordViewSet, 'DOCTOR'),
+         {'treatment_doctor_created_idx'}),
+        ('Doctor referral list',
+         list_page(ReferralViewSet, 'DOCTOR'),
+         {'referral_to_created_idx'}),
+        ('Doctor referral list, next page',
+         list_page(ReferralViewSet, 'DOCTOR', cursor_at=since),
+         {'referral_to_created_idx'}),
+        ('Doctor referrals by status',
+         list_page(ReferralViewSet, 'DOCTOR', status='ACCEPTED'),
+         {'referral_to_status_idx', 'referral_to_created_idx'}),
+        ('Doctor pending inbox',
+         list_page(ReferralViewSet, 'DOCTOR', status='PENDING'),
+         {'referral_pending_idx', 'referral_to_status_idx', 'referral_to_created_idx'}),
+        ('CHW referral list',
+         list_page(ReferralViewSet, 'CHW'),
+         {'referral_by_created_idx'}),
+        ('State status counts for a date range',
+         Assessment.objects.filter(state='Jonglei', timestamp__gte=since).order_by()
+         .values('clinical_status').annotate(total=Count('id')),
+         {'assessment_state_ts_idx'}),
+        ('SAM count for a date range',
+         Assessment.objects.filter(clinical_status='SAM', timestamp__gte=since).order_by().values('id'),
+         {'assessment_status_ts_idx'}),
+    ]
+
+
+def pruning_queries():
+    """(label, queryset, since, until) for time-bounded analytics; only partitions in range may be scanned."""
+    now = timezone.now()
+    year_ago, month_ago, week_ago = now - timedelta(days=365), now - timedelta(days=30), now - timedelta(days=7)
+    return [
+        ('Forecast monthly aggregates (12 months)',
+         Assessment.objects.filter(timestamp__gte=year_ago, timestamp__lte=now)
+         .annotate(month=TruncMonth('timestamp')).values('month')
+         .annotate(total=Count('id'), sam=Count('id', filter=Q(clinical_status='SAM'))).order_by('month'),
+         year_ago, now),
+        ('Active CHWs (30 days)',
+         Assessment.objects.filter(timestamp__gte=month_ago).values('chw').distinct(),
+         month_ago, None),
+        ('Recent assessments (7 days)',
+         Assessment.objects.filter(timestamp__gte=week_ago).order_by().values('id'),
+         week_ago, None),
+    ]
+
+
+def plan_relations(plan):
+    """Every table/partition scanned by an EXPLAIN (FORMAT JSON) plan."""
+    found = {plan['Relation Name']} if 'Relation Name' in plan else set()
+    for child in plan.get('Plans', []):
+        found |= plan_relations(child)
+    return found
+
+
+def unpruned_partitions(relations, since, until=None):
+    """Scanned partitions that lie outside [since, until]; the DEFAULT partition is only allowed for open ranges."""
+    first, last = month_start(since), month_start(until) if until else None
+    outside = set()
+    for name in relations:
+        month = partition_month(name)
+        if month is None:
+            if name.endswith('_default') and last is not None:
+                outside.add(name)
+        elif month < first or (last is not None and month > last):
+            outside.add(name)
+    return outside
+
+
+def plan_indexes(plan):
+    """Collect (node type, index name) for every index node in an EXPLAIN (FORMAT JSON) plan."""
+    found = []
+    if 'Index Name' in plan:
+        found.append((plan['Node Type'], plan['Index Name']))
+    for child in plan.get('Plans', []):
+        found.extend(plan_indexes(child))
+    return found
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+class Command(BaseCommand):
+    help = ('EXPLAIN the hot API queries, verify each one is served by its composite/partial index '
+            'and that time-bounded analytics only scan the partitions in range')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--natural', action='store_true',
+                            help='Keep sequential scans enabled (only meaningful on production-sized data)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(f'Skipped: EXPLAIN checks need PostgreSQL, not {connection.vendor}'))
+            return
+
+        failures = 0
+        with transaction.atomic():
+            if not options['natural']:
+                # Small dev databases make a seq scan cheapest; we are checking the index is usable
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for label, queryset, expected in hot_queries():
+                used = plan_indexes(explain(queryset))
+                names = {name for _, name in used}
+                if names & expected:
+                    self.stdout.write(self.style.SUCCESS(f'OK    {label}: ') + ', '.join(
+                        f'{node} on {name}' for node, name in used if name in expected))
+                else:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(f'FAIL  {label}: ') +
+                                      f'expected {" or ".join(sorted(expected))}, got {sorted(names) or "no index"}')
+
+        if is_partitioned():
+            for label, queryset, since, until in pruning_queries():
+                scanned = plan_relations(explain(queryset))
+                outside = unpruned_partitions(scanned, since, until)
+                if outside:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(f'FAIL  {label}: ') +
+                                      f'scans out-of-range partitions {sorted(outside)}')
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'OK    {label}: ') + f'{len(scanned)} partition(s) scanned')
+        else:
+            self.stdout.write(self.style.WARNING('assessments is not partitioned; pruning checks skipped'))
+
+        if failures:
+            raise CommandError(f'{failures} query plan check(s) failed')
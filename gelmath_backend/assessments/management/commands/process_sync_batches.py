@@ -0,0 +1,36 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from assessments.ingestion import claim_next_batch, process_sync_batch, requeue_stale_batches
+
+
+class Command(BaseCommand):
+    help = 'Process staged sync batches (DB-backed worker loop, no Redis required)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--stale-minutes', type=int, default=30,
+                            help='Requeue batches stuck in PROCESSING for longer than this')
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(minutes=options['stale_minutes'])
+        requeued = requeue_stale_batches(stale_after)
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale batch(es)')
+
+        while True:
+            close_old_connections()
+            batch_id = claim_next_batch()
+            if batch_id is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            batch = process_sync_batch(batch_id)
+            self.stdout.write(
+                f'Batch {batch.id}: {batch.status} '
+                f'({batch.created_records} created, {batch.failed_records} failed)'
+            )
@@ -0,0 +1,17 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from assessments.models import SyncTelemetry
+
+
+class Command(BaseCommand):
+    help = 'Delete sync telemetry older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=getattr(settings, 'SYNC_TELEMETRY_RETENTION_DAYS', 30))
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = SyncTelemetry.objects.filter(bucket__lt=cutoff).delete()
+        self.stdout.write(f'Deleted {deleted} telemetry rows older than {options["days"]} days')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from assessments.archive import restore_case
+from assessments.models import ArchivedCase
+
+
+class Command(BaseCommand):
+    help = 'Move archived cases back into the hot assessment, referral and treatment tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('child_ids', nargs='+', metavar='child_id')
+
+    def handle(self, *args, **options):
+        for child_id in options['child_ids']:
+            try:
+                restored = restore_case(child_id)
+            except ArchivedCase.DoesNotExist:
+                raise CommandError(f'No archived case for child {child_id}')
+            self.stdout.write(f'Restored {child_id} ({restored} assessments)')
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('assessments', '0003_referral_doctor_signature'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_batch_id', models.CharField(blank=True, max_length=100)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('PROCESSING', 'Processing'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='QUEUED', max_length=20)),
+                ('total_records', models.PositiveIntegerField(default=0)),
+                ('processed_records', models.PositiveIntegerField(default=0)),
+                ('created_records', models.PositiveIntegerField(default=0)),
+                ('failed_records', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('submitted_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sync_batches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'sync_batches',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='sync_batche_status_1df50a_idx')],
+            },
+        ),
+    ]
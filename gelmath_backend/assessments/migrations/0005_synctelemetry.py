@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_doctor_profile_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('assessments', '0004_syncbatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTelemetry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(help_text='Request time truncated to the hour')),
+                ('endpoint', models.CharField(choices=[('sync', 'Batch sync'), ('create', 'Single assessment upload')], max_length=20)),
+                ('device_id', models.CharField(blank=True, max_length=64)),
+                ('app_version', models.CharField(blank=True, max_length=32)),
+                ('state', models.CharField(blank=True, max_length=100)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('records', models.PositiveIntegerField(default=0)),
+                ('bytes_in', models.PositiveIntegerField(default=0)),
+                ('bytes_out', models.PositiveIntegerField(default=0)),
+                ('duration_ms', models.FloatField(default=0)),
+                ('db_ms', models.FloatField(default=0)),
+                ('db_queries', models.PositiveIntegerField(default=0)),
+                ('validation_failures', models.PositiveIntegerField(default=0)),
+                ('ml_ms', models.FloatField(default=0)),
+                ('worker_ms', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('facility', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sync_telemetry', to='accounts.facility')),
+                ('sync_batch', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='telemetry', to='assessments.syncbatch')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sync_telemetry', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'sync_telemetry',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['bucket', 'state'], name='sync_teleme_bucket_b171d0_idx'), models.Index(fields=['bucket', 'app_version'], name='sync_teleme_bucket_1b4ed0_idx'), models.Index(fields=['device_id', 'bucket'], name='sync_teleme_device__a615b0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0005_synctelemetry'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='assessment',
+            name='assessments_timesta_6829d3_idx',
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['timestamp', 'id'], name='assessments_timesta_5c8970_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='referral',
+            index=models.Index(fields=['created_at', 'id'], name='referrals_created_503578_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='treatmentrecord',
+            index=models.Index(fields=['created_at', 'id'], name='treatment_r_created_c4311e_idx'),
+        ),
+    ]
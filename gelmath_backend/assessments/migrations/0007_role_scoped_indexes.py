@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='assessment',
+            name='assessments_state_28ebcb_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='assessment',
+            name='assessments_facilit_d261c5_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='assessment',
+            name='assessments_clinica_27906d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['chw', '-timestamp', '-id'], name='assessment_chw_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['facility', '-timestamp', '-id'], name='assessment_facility_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['state', 'timestamp'], include=('clinical_status', 'id'), name='assessment_state_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['clinical_status', 'timestamp'], name='assessment_status_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='referral',
+            index=models.Index(fields=['referred_to', 'status', '-created_at'], name='referral_to_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='referral',
+            index=models.Index(fields=['referred_by', '-created_at', '-id'], name='referral_by_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='referral',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['referred_to', '-created_at'], name='referral_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='treatmentrecord',
+            index=models.Index(fields=['doctor', '-created_at', '-id'], name='treatment_doctor_created_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0007_role_scoped_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='referral',
+            name='assessment',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='referrals', to='assessments.assessment'),
+        ),
+        migrations.AlterField(
+            model_name='treatmentrecord',
+            name='assessment',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='treatment_records', to='assessments.assessment'),
+        ),
+    ]
@@ -0,0 +1,139 @@
+"""
+Convert `assessments` into a table range-partitioned by `timestamp` month.
+
+PostgreSQL only; other databases keep the plain table. Existing rows are
+copied into monthly partitions covering the oldest assessment through three
+months ahead, plus a DEFAULT partition. The primary key becomes
+(id, timestamp) because a partitioned table's unique constraints must include
+the partition key; the ORM still treats `id` as the primary key. Indexes and
+the outgoing foreign keys (facility, chw, assigned_doctor) are recreated on
+the partitioned table; incoming ones were dropped from the schema in 0008.
+
+Downtime: the whole conversion is one transaction holding an ACCESS EXCLUSIVE
+lock on `assessments` from the rename to the commit, so every read and write of
+assessments (and of referrals/treatments joined to them) waits for the copy,
+the index builds and the foreign key validation. Copying in batches would not
+shorten that: the new table can't be swapped in before it holds every row.
+Expect on the order of a minute per few million rows; run it in a maintenance
+window with the API and `process_sync_batches` workers stopped.
+"""
+from datetime import date, datetime, timezone
+
+from django.db import migrations
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month):
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+
+def _index_defs(cursor, table):
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+        [table, f'{table}_pkey'],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _foreign_key_defs(cursor, table):
+    """[(name, definition)] of the foreign keys declared on `table`."""
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def _add_foreign_keys(cursor, table, foreign_keys):
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+
+
+def partition_assessments(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        index_defs = _index_defs(cursor, 'assessments')
+        foreign_keys = _foreign_key_defs(cursor, 'assessments')
+        cursor.execute('SELECT min("timestamp"), COALESCE(max(id), 0) FROM assessments')
+        oldest, max_id = cursor.fetchone()
+
+        cursor.execute('ALTER TABLE assessments RENAME TO assessments_unpartitioned')
+        cursor.execute(
+            'CREATE TABLE assessments (LIKE assessments_unpartitioned INCLUDING DEFAULTS) '
+            'PARTITION BY RANGE ("timestamp")'
+        )
+
+        now = datetime.now(timezone.utc)
+        first = (oldest or now).astimezone(timezone.utc)
+        month = date(first.year, first.month, 1)
+        last = _add_months(date(now.year, now.month, 1), MONTHS_AHEAD)
+        while month <= last:
+            cursor.execute(
+                f'CREATE TABLE assessments_p{month.year:04d}_{month.month:02d} PARTITION OF assessments '
+                'FOR VALUES FROM (%s) TO (%s)',
+                [_bound(month), _bound(_add_months(month, 1))],
+            )
+            month = _add_months(month, 1)
+        cursor.execute('CREATE TABLE assessments_default PARTITION OF assessments DEFAULT')
+
+        cursor.execute('INSERT INTO assessments SELECT * FROM assessments_unpartitioned')
+        # CASCADE drops the FK constraints from referrals/treatment_records (see 0008)
+        cursor.execute('DROP TABLE assessments_unpartitioned CASCADE')
+
+        cursor.execute('ALTER TABLE assessments ADD PRIMARY KEY (id, "timestamp")')
+        for index_def in index_defs:
+            cursor.execute(index_def)
+        # LIKE doesn't copy foreign keys, and the model still declares them
+        _add_foreign_keys(cursor, 'assessments', foreign_keys)
+
+        cursor.execute('CREATE SEQUENCE assessments_id_seq OWNED BY assessments.id')
+        cursor.execute("SELECT setval('assessments_id_seq', %s, %s)", [max(max_id, 1), max_id > 0])
+        cursor.execute("ALTER TABLE assessments ALTER COLUMN id SET DEFAULT nextval('assessments_id_seq')")
+        cursor.execute('ANALYZE assessments')
+
+
+def unpartition_assessments(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        index_defs = _index_defs(cursor, 'assessments')
+        foreign_keys = _foreign_key_defs(cursor, 'assessments')
+        cursor.execute('SELECT COALESCE(max(id), 0) FROM assessments')
+        max_id = cursor.fetchone()[0]
+
+        cursor.execute('ALTER TABLE assessments RENAME TO assessments_partitioned')
+        cursor.execute('CREATE TABLE assessments (LIKE assessments_partitioned)')
+        cursor.execute('INSERT INTO assessments SELECT * FROM assessments_partitioned')
+        cursor.execute('DROP TABLE assessments_partitioned CASCADE')
+
+        cursor.execute('ALTER TABLE assessments ADD PRIMARY KEY (id)')
+        for index_def in index_defs:
+            cursor.execute(index_def)
+        _add_foreign_keys(cursor, 'assessments', foreign_keys)
+
+        cursor.execute('ALTER TABLE assessments ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence('assessments', 'id'), %s, %s)",
+            [max(max_id, 1), max_id > 0],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0008_assessment_fk_without_db_constraint'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_assessments, unpartition_assessments),
+    ]
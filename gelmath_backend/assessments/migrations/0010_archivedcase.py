@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_doctor_profile_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('assessments', '0009_partition_assessments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedCase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('child_id', models.CharField(max_length=50, unique=True)),
+                ('state', models.CharField(blank=True, max_length=100)),
+                ('final_status', models.CharField(choices=[('ADMITTED', 'Admitted'), ('IN_TREATMENT', 'In Treatment'), ('RECOVERED', 'Recovered'), ('DEFAULTED', 'Defaulted'), ('DIED', 'Died'), ('TRANSFERRED', 'Transferred')], max_length=20)),
+                ('last_activity_at', models.DateTimeField()),
+                ('assessment_count', models.PositiveIntegerField(default=0)),
+                ('referral_count', models.PositiveIntegerField(default=0)),
+                ('treatment_count', models.PositiveIntegerField(default=0)),
+                ('payload', models.BinaryField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('chw', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_cases', to=settings.AUTH_USER_MODEL)),
+                ('facility', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_cases', to='accounts.facility')),
+            ],
+            options={
+                'db_table': 'archived_cases',
+                'ordering': ['-archived_at'],
+                'indexes': [models.Index(fields=['state', 'last_activity_at'], name='archived_ca_state_7067bf_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+"""
+pg_trgm GIN indexes for TrigramSearchFilter (gelmath_api.search).
+
+Expression indexes on UPPER(field) serve both the similarity operator and the
+substring LIKE the search issues. PostgreSQL only, and kept out of
+Meta.indexes because the gin_trgm_ops opclass does not exist elsewhere.
+"""
+from django.db import migrations
+
+INDEXES = {
+    'assessment_child_id_trgm_idx': 'child_id',
+    'assessment_chw_name_trgm_idx': 'chw_name',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON assessments USING gin (UPPER({column}) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0010_archivedcase'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:54
+
+from django.db import migrations, models
+
+
+def rename_duplicate_batches(apps, schema_editor):
+    """Concurrent retries may already have staged a client batch twice; keep the first under its id."""
+    SyncBatch = apps.get_model('assessments', 'SyncBatch')
+    seen = set()
+    for batch in SyncBatch.objects.exclude(client_batch_id='').order_by('id').iterator():
+        key = (batch.submitted_by_id, batch.client_batch_id)
+        if key in seen:
+            batch.client_batch_id = f'{batch.client_batch_id[:80]}#dup-{batch.id}'
+            batch.save(update_fields=['client_batch_id'])
+        seen.add(key)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0011_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_batches, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='syncbatch',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_batch_id', ''), _negated=True), fields=('submitted_by', 'client_batch_id'), name='unique_client_batch_per_user'),
+        ),
+    ]
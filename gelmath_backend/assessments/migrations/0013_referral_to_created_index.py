@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0012_unique_client_batch'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='referral',
+            index=models.Index(fields=['referred_to', '-created_at', '-id'], name='referral_to_created_idx'),
+        ),
+    ]
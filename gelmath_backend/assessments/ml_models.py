@@ -0,0 +1,156 @@
+"""
+Shared ML artifacts: loaded once per process, warmed up before serving.
+
+    pathway_model   Models/cmam_model.pkl (Random Forest, required)
+    quality_model   Models/model2_quality_classifier.pkl (measurement quality)
+    shap_explainer  Models/shap_explainer.pkl (needs the shap package)
+    muac_lms        WHO_Table MUAC-for-age LMS tables (needs openpyxl), per sex an
+                    array of (month, L, M, S) rows
+
+get(name) loads an artifact on first use and returns None if it can't be loaded.
+joblib, pandas, numpy and scikit-learn are imported here on first use only, so
+management commands, migrations and tests that never predict don't pay for them
+(see benchmark_startup.py).
+warm_up() loads all of them; the gunicorn config (gelmath_api/gunicorn_conf.py)
+calls it in the master before forking, so every worker (including ones recycled
+by max_requests) starts with the models in memory, sharing the pages
+copy-on-write. /readyz reports ready once warm-up has finished.
+
+Wrap predictions in `with inference(name):` to record their latency in the
+gelmath_model_inference_seconds histogram, labelled with the artifact version
+(first 12 hex digits of the file's SHA-256).
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from gelmath_api.metrics import MODEL_INFERENCE
+
+logger = logging.getLogger('gelmath.ml_models')
+
+REQUIRED = ('pathway_model',)
+
+_artifacts = {}
+_errors = {}
+_versions = {}
+_lock = threading.RLock()
+_warm_up = {'status': 'cold', 'seconds': None}
+
+
+def _models_dir():
+    return getattr(settings, 'ML_MODELS_DIR', os.path.join(settings.BASE_DIR.parent, 'Models'))
+
+
+def _joblib(name, filename):
+    def load():
+        import joblib
+        with open(os.path.join(_models_dir(), filename), 'rb') as f:
+            data = f.read()
+        artifact = joblib.load(io.BytesIO(data))
+        _versions[name] = hashlib.sha256(data).hexdigest()[:12]
+        return artifact
+    return load
+
+
+def _load_muac_lms():
+    import numpy as np
+    from openpyxl import load_workbook
+
+    tables_dir = getattr(settings, 'WHO_TABLES_DIR', os.path.join(settings.BASE_DIR.parent, 'WHO_Table'))
+    tables = {}
+    for sex, filename in (('M', 'acfa-boys-3-5-zscores.xlsx'), ('F', 'acfa-girls-3-5-zscores.xlsx')):
+        sheet = load_workbook(os.path.join(tables_dir, filename), read_only=True).active
+        rows = sheet.iter_rows(min_row=2, max_col=4, values_only=True)
+        table = np.array([row for row in rows if row[0] is not None], dtype=float)
+        # Read-only: workers share the pages with the master
+        table.flags.writeable = False
+        tables[sex] = table
+    return tables
+
+
+# Column order the pathway model was trained with (model.feature_names_in_)
+PATHWAY_FEATURES = ['muac_mm', 'age_months', 'sex', 'edema', 'appetite', 'danger_signs']
+
+
+def pathway_features(row):
+    """One-row feature frame for the pathway model from a dict of encoded features."""
+    import pandas as pd
+    return pd.DataFrame([[row[name] for name in PATHWAY_FEATURES]], columns=PATHWAY_FEATURES)
+
+
+LOADERS = {
+    'pathway_model': _joblib('pathway_model', 'cmam_model.pkl'),
+    'quality_model': _joblib('quality_model', 'model2_quality_classifier.pkl'),
+    'shap_explainer': _joblib('shap_explainer', 'shap_explainer.pkl'),
+    'muac_lms': _load_muac_lms,
+}
+
+
+def get(name):
+    """The named artifact, loading it on first use; None if it failed to load."""
+    if name not in _artifacts and name not in _errors:
+        with _lock:
+            if name not in _artifacts and name not in _errors:
+                start = time.perf_counter()
+                try:
+                    _artifacts[name] = LOADERS[name]()
+                    logger.info('Loaded %s in %.0f ms', name, (time.perf_counter() - start) * 1000)
+                except Exception as exc:
+                    _errors[name] = f'{type(exc).__name__}: {exc}'
+                    log = logger.error if name in REQUIRED else logger.warning
+                    log('Could not load %s: %s', name, _errors[name])
+    return _artifacts.get(name)
+
+
+@contextmanager
+def inference(name):
+    """Time the enclosed predict calls of the named model."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        MODEL_INFERENCE.labels(model=name, version=_versions.get(name, 'unknown')).observe(
+            time.perf_counter() - start
+        )
+
+
+def _load_all():
+    start = time.perf_counter()
+    for name in LOADERS:
+        get(name)
+    _warm_up['seconds'] = round(time.perf_counter() - start, 2)
+    _warm_up['status'] = 'failed' if any(name in _errors for name in REQUIRED) else 'ready'
+
+
+def warm_up():
+    """Load every artifact. Idempotent; returns the warm-up status."""
+    with _lock:
+        if _warm_up['status'] not in ('ready', 'failed'):
+            _warm_up['status'] = 'warming'
+            _load_all()
+        return _warm_up['status']
+
+
+def warm_up_in_background():
+    """Start warm-up on a daemon thread unless it already started (servers without preload)."""
+    with _lock:
+        if _warm_up['status'] != 'cold':
+            return
+        _warm_up['status'] = 'warming'
+    threading.Thread(target=_load_all, name='ml-warm-up', daemon=True).start()
+
+
+def status():
+    return {
+        'status': _warm_up['status'],
+        'warm_up_seconds': _warm_up['seconds'],
+        'artifacts': {
+            name: 'loaded' if name in _artifacts else _errors.get(name, 'not loaded')
+            for name in LOADERS
+        },
+        'versions': dict(_versions),
+    }
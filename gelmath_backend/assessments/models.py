@@ -68,10 +68,15 @@ class Assessment(models.Model):
         db_table = 'assessments'
         ordering = ['-timestamp']
         indexes = [
-            models.Index(fields=['timestamp']),
-            models.Index(fields=['state']),
-            models.Index(fields=['facility']),
-            models.Index(fields=['clinical_status']),
+            # Keyset pagination order; also serves plain timestamp ranges
+            models.Index(fields=['timestamp', 'id']),
+            # Role-scoped lists (get_queryset) in keyset order
+            models.Index(fields=['chw', '-timestamp', '-id'], name='assessment_chw_ts_idx'),
+            models.Index(fields=['facility', '-timestamp', '-id'], name='assessment_facility_ts_idx'),
+            # Analytics: per-state and per-status counts over a date range, index-only
+            models.Index(fields=['state', 'timestamp'], include=['clinical_status', 'id'],
+                         name='assessment_state_ts_idx'),
+            models.Index(fields=['clinical_status', 'timestamp'], name='assessment_status_ts_idx'),
             models.Index(fields=['child_id']),
         ]
     
@@ -89,7 +94,9 @@ class TreatmentRecord(models.Model):
         ('TRANSFERRED', 'Transferred'),
     )
     
-    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name='treatment_records')
+    # No DB-level constraint: assessments is partitioned and its primary key is (id, timestamp)
+    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name='treatment_records',
+                                   db_constraint=False)
     doctor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='treatments')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES)
     notes = models.TextField(blank=True)
@@ -101,6 +108,10 @@ class TreatmentRecord(models.Model):
     class Meta:
         db_table = 'treatment_records'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['doctor', '-created_at', '-id'], name='treatment_doctor_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.assessment.child_id} - {self.status}"
@@ -114,7 +125,9 @@ class Referral(models.Model):
         ('COMPLETED', 'Completed'),
     )
     
-    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name='referrals')
+    # No DB-level constraint: assessments is partitioned and its primary key is (id, timestamp)
+    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name='referrals',
+                                   db_constraint=False)
     referred_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='referrals_made')
     referred_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='referrals_received')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
@@ -129,6 +142,135 @@ class Referral(models.Model):
     class Meta:
         db_table = 'referrals'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+            # Doctor referral list (keyset order), and ?status= within it
+            models.Index(fields=['referred_to', '-created_at', '-id'], name='referral_to_created_idx'),
+            models.Index(fields=['referred_to', 'status', '-created_at'], name='referral_to_status_idx'),
+            models.Index(fields=['referred_by', '-created_at', '-id'], name='referral_by_created_idx'),
+            # Doctor inbox: open referrals are a small slice of the table
+            models.Index(fields=['referred_to', '-created_at'], condition=models.Q(status='PENDING'),
+                         name='referral_pending_idx'),
+        ]
     
     def __str__(self):
         return f"Referral: {self.assessment.child_id} to Dr. {self.referred_to.username if self.referred_to else 'Unassigned'}"
+
+
+class SyncBatch(models.Model):
+    """Raw assessment batch staged by the mobile sync endpoint for background ingestion."""
+    STATUS_CHOICES = (
+        ('QUEUED', 'Queued'),
+        ('PROCESSING', 'Processing'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    )
+    
+    submitted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='sync_batches')
+    client_batch_id = models.CharField(max_length=100, blank=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    
+    # Progress
+    total_records = models.PositiveIntegerField(default=0)
+    processed_records = models.PositiveIntegerField(default=0)
+    created_records = models.PositiveIntegerField(default=0)
+    failed_records = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'sync_batches'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+        constraints = [
+            # Concurrent retries of one client batch are staged once (see ingestion.stage_sync_batch)
+            models.UniqueConstraint(
+                fields=['submitted_by', 'client_batch_id'],
+                condition=~models.Q(client_batch_id=''),
+                name='unique_client_batch_per_user',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Sync batch {self.id} ({self.status}, {self.processed_records}/{self.total_records})"
+
+
+class SyncTelemetry(models.Model):
+    """One row per mobile sync request, grouped into hourly buckets for percentile reports."""
+    ENDPOINT_CHOICES = (
+        ('sync', 'Batch sync'),
+        ('create', 'Single assessment upload'),
+    )
+    
+    bucket = models.DateTimeField(help_text="Request time truncated to the hour")
+    endpoint = models.CharField(max_length=20, choices=ENDPOINT_CHOICES)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='sync_telemetry')
+    device_id = models.CharField(max_length=64, blank=True)
+    app_version = models.CharField(max_length=32, blank=True)
+    state = models.CharField(max_length=100, blank=True)
+    facility = models.ForeignKey(Facility, on_delete=models.SET_NULL, null=True, blank=True, related_name='sync_telemetry')
+    sync_batch = models.OneToOneField(SyncBatch, on_delete=models.SET_NULL, null=True, blank=True, related_name='telemetry')
+    
+    # Request metrics
+    status_code = models.PositiveSmallIntegerField()
+    records = models.PositiveIntegerField(default=0)
+    bytes_in = models.PositiveIntegerField(default=0)
+    bytes_out = models.PositiveIntegerField(default=0)
+    duration_ms = models.FloatField(default=0)
+    db_ms = models.FloatField(default=0)
+    db_queries = models.PositiveIntegerField(default=0)
+    
+    # Filled in by the ingestion worker for staged batches
+    validation_failures = models.PositiveIntegerField(default=0)
+    ml_ms = models.FloatField(default=0)
+    worker_ms = models.FloatField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'sync_telemetry'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['bucket', 'state']),
+            models.Index(fields=['bucket', 'app_version']),
+            models.Index(fields=['device_id', 'bucket']),
+        ]
+    
+    def __str__(self):
+        return f"{self.endpoint} {self.records} records in {self.duration_ms:.0f}ms ({self.status_code})"
+
+
+class ArchivedCase(models.Model):
+    """A closed case moved out of the hot tables: every assessment, referral and treatment record of one child."""
+    child_id = models.CharField(max_length=50, unique=True)
+    
+    # Copied from the latest assessment so role scoping works without decompressing
+    state = models.CharField(max_length=100, blank=True)
+    facility = models.ForeignKey(Facility, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_cases')
+    chw = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_cases')
+    final_status = models.CharField(max_length=20, choices=TreatmentRecord.STATUS_CHOICES)
+    last_activity_at = models.DateTimeField()
+    
+    assessment_count = models.PositiveIntegerField(default=0)
+    referral_count = models.PositiveIntegerField(default=0)
+    treatment_count = models.PositiveIntegerField(default=0)
+    # zlib-compressed JSON of the serialized rows (django.core.serializers 'python' format)
+    payload = models.BinaryField()
+    
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'archived_cases'
+        ordering = ['-archived_at']
+        indexes = [
+            models.Index(fields=['state', 'last_activity_at']),
+        ]
+    
+    def __str__(self):
+        return f"Archived case {self.child_id} ({self.final_status}, {self.assessment_count} assessments)"
@@ -0,0 +1,141 @@
+"""
+Monthly range partitions of the `assessments` table (PostgreSQL only).
+
+The table is partitioned by `timestamp` month (migration 0009). Partitions are
+named assessments_pYYYY_MM; a DEFAULT partition catches rows outside every
+defined month so an insert never fails because a partition is missing.
+`manage.py assessment_partitions` keeps future months created and detaches
+old ones, which turns archiving a month into a metadata operation.
+
+On other databases (SQLite in development/tests) the table is a plain table
+and every helper here is a no-op.
+"""
+import re
+from datetime import date, datetime, timezone as dt_timezone
+from django.db import connection, transaction
+from django.utils import timezone
+
+TABLE = 'assessments'
+DEFAULT_PARTITION = f'{TABLE}_default'
+_NAME_RE = re.compile(rf'^{TABLE}_p(\d{{4}})_(\d{{2}})$')
+
+
+def month_start(value):
+    # Bounds are UTC months, matching the UTC session Django opens with USE_TZ
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        value = value.astimezone(dt_timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bound(month):
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month.year:04d}_{month.month:02d}'
+
+
+def partition_month(name):
+    match = _NAME_RE.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = %s',
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    """[(name, month or None for DEFAULT, estimated rows)] ordered by month."""
+    if not is_partitioned():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, child.reltuples::bigint
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [TABLE],
+        )
+        rows = [(name, partition_month(name), max(estimate, 0)) for name, estimate in cursor.fetchall()]
+    return sorted(rows, key=lambda row: (row[1] is None, row[1] or date.min))
+
+
+def create_partition(month):
+    """
+    Create the partition for `month` if it is missing. Rows that already landed in
+    the DEFAULT partition for that month are moved into it before attaching.
+    Returns True when a partition was created.
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    if name in {row[0] for row in list_partitions()}:
+        return False
+
+    start, end = month_bound(month), month_bound(add_months(month, 1))
+    quote = connection.ops.quote_name
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {quote(name)} (LIKE {quote(TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {quote(DEFAULT_PARTITION)}
+                WHERE "timestamp" >= %s AND "timestamp" < %s
+                RETURNING *
+            )
+            INSERT INTO {quote(name)} SELECT * FROM moved
+            """,
+            [start, end],
+        )
+        cursor.execute(
+            f'ALTER TABLE {quote(TABLE)} ATTACH PARTITION {quote(name)} FOR VALUES FROM (%s) TO (%s)',
+            [start, end],
+        )
+    return True
+
+
+def ensure_partitions(months_ahead=3, today=None):
+    """Create partitions from the current month through `months_ahead` months ahead. Returns created names."""
+    if not is_partitioned():
+        return []
+    current = month_start(today or timezone.now())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if create_partition(month):
+            created.append(partition_name(month))
+    return created
+
+
+def detach_partitions_before(month, drop=False):
+    """
+    Detach every monthly partition older than `month`. Detached tables keep their
+    data as standalone tables (for dump/archival) unless `drop` is set.
+    """
+    if not is_partitioned():
+        return []
+    quote = connection.ops.quote_name
+    detached = []
+    for name, partition, _ in list_partitions():
+        if partition is None or partition >= month_start(month):
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(name)}')
+            if drop:
+                cursor.execute(f'DROP TABLE {quote(name)}')
+        detached.append(name)
+    return detached
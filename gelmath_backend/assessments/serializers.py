@@ -1,12 +1,17 @@
 from rest_framework import serializers
-from .models import Assessment, TreatmentRecord, Referral
+from .models import Assessment, TreatmentRecord, Referral, SyncBatch
 from accounts.models import User
-import joblib
-import pandas as pd
-import os
+from .telemetry import add_timing
+from . import ml_models
+from gelmath_api.sparse_fields import SparseFieldsMixin
+import logging
+import time
 
 
-class AssessmentSerializer(serializers.ModelSerializer):
+logger = logging.getLogger('gelmath.assessments')
+
+
+class AssessmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     facility_name = serializers.CharField(source='facility.name', read_only=True)
     chw_username = serializers.CharField(source='chw.username', read_only=True)
     doctor_name = serializers.CharField(source='assigned_doctor.get_full_name', read_only=True)
@@ -15,6 +20,8 @@ class AssessmentSerializer(serializers.ModelSerializer):
         model = Assessment
         fields = '__all__'
         read_only_fields = ['id', 'created_at', 'updated_at', 'timestamp']
+        summary_fields = ['id', 'child_id', 'sex', 'age_months', 'muac_mm', 'clinical_status',
+                          'recommended_pathway', 'state', 'facility_name', 'chw_name', 'timestamp']
 
 
 class AssessmentCreateSerializer(serializers.ModelSerializer):
@@ -26,30 +33,31 @@ class AssessmentCreateSerializer(serializers.ModelSerializer):
                   'county', 'chw_name', 'chw_phone', 'chw_notes', 'chw_signature']
     
     def create(self, validated_data):
-        user = self.context['request'].user
-        if user.role == 'CHW':
+        # Background sync ingestion passes the submitting user directly (no request)
+        user = self.context['user'] if 'user' in self.context else self.context['request'].user
+        if user is not None and user.role == 'CHW':
             validated_data['chw'] = user
         
         # Run ML prediction if not provided
         if not validated_data.get('clinical_status') or not validated_data.get('recommended_pathway'):
+            ml_start = time.perf_counter()
             try:
-                model_path = os.path.join(os.path.dirname(__file__), '../../Models/cmam_model.pkl')
-                if os.path.exists(model_path):
-                    model = joblib.load(model_path)
-                    
+                model = ml_models.get('pathway_model')
+                if model is not None:
                     # Prepare features in correct order
-                    features = pd.DataFrame([{
+                    features = ml_models.pathway_features({
                         'muac_mm': validated_data.get('muac_mm', 0),
                         'age_months': validated_data.get('age_months', 0),
                         'sex': 1 if validated_data.get('sex') == 'M' else 0,
                         'edema': validated_data.get('edema', 0),
                         'appetite': 1 if validated_data.get('appetite') in ['poor', 'failed'] else 0,
                         'danger_signs': validated_data.get('danger_signs', 0)
-                    }])
+                    })
                     
                     # Predict
-                    prediction = model.predict(features)[0]
-                    confidence = model.predict_proba(features).max()
+                    with ml_models.inference('pathway_model'):
+                        prediction = model.predict(features)[0]
+                        confidence = model.predict_proba(features).max()
                     
                     # Determine clinical status
                     muac = validated_data.get('muac_mm', 0)
@@ -65,13 +73,15 @@ class AssessmentCreateSerializer(serializers.ModelSerializer):
                     validated_data['clinical_status'] = clinical_status
                     validated_data['recommended_pathway'] = prediction
                     validated_data['confidence'] = round(confidence * 100, 1)
-            except Exception as e:
-                print(f"ML prediction error: {e}")
+            except Exception:
+                logger.warning('ML prediction failed', exc_info=True,
+                               extra={'child_id': validated_data.get('child_id')})
+            add_timing('ml_ms', (time.perf_counter() - ml_start) * 1000)
         
         return super().create(validated_data)
 
 
-class TreatmentRecordSerializer(serializers.ModelSerializer):
+class TreatmentRecordSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     doctor_name = serializers.CharField(source='doctor.get_full_name', read_only=True)
     child_id = serializers.CharField(source='assessment.child_id', read_only=True)
     
@@ -79,6 +89,8 @@ class TreatmentRecordSerializer(serializers.ModelSerializer):
         model = TreatmentRecord
         fields = '__all__'
         read_only_fields = ['id', 'created_at', 'updated_at']
+        summary_fields = ['id', 'assessment', 'child_id', 'status', 'doctor_name',
+                          'admission_date', 'discharge_date', 'created_at']
 
 
 class DoctorProfileSerializer(serializers.ModelSerializer):
@@ -101,7 +113,7 @@ class DoctorProfileSerializer(serializers.ModelSerializer):
             return obj.username
 
 
-class ReferralSerializer(serializers.ModelSerializer):
+class ReferralSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     referred_by_name = serializers.CharField(source='referred_by.username', read_only=True)
     referred_to_name = serializers.SerializerMethodField()
     child_id = serializers.CharField(source='assessment.child_id', read_only=True)
@@ -111,8 +123,41 @@ class ReferralSerializer(serializers.ModelSerializer):
         model = Referral
         fields = '__all__'
         read_only_fields = ['id', 'created_at', 'updated_at']
+        # The summary drops the embedded assessment; clients that need it ask for ?fields=
+        summary_fields = ['id', 'assessment', 'child_id', 'status', 'urgency',
+                          'referred_by_name', 'referred_to_name', 'created_at']
+        method_field_sources = {'referred_to_name': 'referred_to'}
     
     def get_referred_to_name(self, obj):
         if obj.referred_to:
             return f"Dr. {obj.referred_to.first_name} {obj.referred_to.last_name}" if obj.referred_to.first_name else obj.referred_to.username
         return None
+
+
+class SyncBatchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SyncBatch
+        fields = ['id', 'client_batch_id', 'status', 'total_records', 'processed_records',
+                  'created_records', 'failed_records', 'errors', 'created_at',
+                  'started_at', 'completed_at']
+        read_only_fields = fields
+
+
+class SyncEnvelopeSerializer(serializers.Serializer):
+    """Validates only the shape of a sync upload; records are validated by the worker."""
+    client_batch_id = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    records = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+    
+    def to_internal_value(self, data):
+        # A bare list is an upload without a client_batch_id (the columnar and msgpack
+        # parsers also yield one when the body has no envelope), so retries aren't deduplicated
+        if isinstance(data, list):
+            data = {'records': data}
+        return super().to_internal_value(data)
+    
+    def validate_records(self, value):
+        from django.conf import settings
+        max_records = getattr(settings, 'SYNC_MAX_BATCH_RECORDS', 10000)
+        if len(value) > max_records:
+            raise serializers.ValidationError(f"Batch too large: {len(value)} records (max {max_records})")
+        return value
@@ -0,0 +1,185 @@
+"""
+Sync telemetry.
+
+SyncTelemetryMiddleware times every mobile upload (batch sync and single
+assessment create), counts DB time through connection.execute_wrapper and
+stores one SyncTelemetry row per request. Views annotate the request with
+record counts; ML time is reported from the serializer via add_timing().
+The ingestion worker fills in validation failures and ML time for staged
+batches.
+"""
+import contextvars
+import logging
+import math
+import time
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger('gelmath.telemetry')
+
+# view_name (from the URL resolver) -> SyncTelemetry.endpoint, for POST requests
+SYNC_VIEW_NAMES = {
+    'assessment-sync': 'sync',
+    'assessment-list': 'create',
+}
+
+_collector = contextvars.ContextVar('sync_telemetry_collector', default=None)
+
+
+def add_timing(name, ms):
+    """Add elapsed milliseconds to the active collector (no-op outside collection)."""
+    stats = _collector.get()
+    if stats is not None:
+        stats[name] = stats.get(name, 0) + ms
+
+
+def annotate(request, **values):
+    """Attach view-level values (records, sync_batch, ...) for the middleware to store."""
+    request = getattr(request, '_request', request)
+    request.sync_telemetry = {**getattr(request, 'sync_telemetry', {}), **values}
+
+
+class _QueryTimer:
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            add_timing('db_ms', (time.perf_counter() - start) * 1000)
+            add_timing('db_queries', 1)
+
+
+def _time_queries():
+    stack = ExitStack()
+    stack.enter_context(connection.execute_wrapper(_QueryTimer()))
+    return stack
+
+
+@contextmanager
+def collect():
+    """Collect db_ms/db_queries/ml_ms for the enclosed block."""
+    stats = {}
+    token = _collector.set(stats)
+    try:
+        with _time_queries():
+            yield stats
+    finally:
+        _collector.reset(token)
+
+
+@asynccontextmanager
+async def acollect():
+    """collect() for async code; the query timer goes on the connection of the thread the ORM runs in."""
+    stats = {}
+    token = _collector.set(stats)
+    try:
+        timer = await sync_to_async(_time_queries)()
+        try:
+            yield stats
+        finally:
+            await sync_to_async(timer.close)()
+    finally:
+        _collector.reset(token)
+
+
+class SyncTelemetryMiddleware:
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _collects(self, request):
+        return request.method == 'POST' and request.path.startswith('/api/assessments/')
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._collects(request):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with collect() as stats:
+            response = self.get_response(request)
+        self._record(request, response, (time.perf_counter() - start) * 1000, stats)
+        return response
+
+    async def __acall__(self, request):
+        if not self._collects(request):
+            return await self.get_response(request)
+
+        start = time.perf_counter()
+        async with acollect() as stats:
+            response = await self.get_response(request)
+        await sync_to_async(self._record)(request, response, (time.perf_counter() - start) * 1000, stats)
+        return response
+
+    def _record(self, request, response, duration_ms, stats):
+        match = getattr(request, 'resolver_match', None)
+        endpoint = SYNC_VIEW_NAMES.get(match.view_name) if match else None
+        if endpoint and getattr(settings, 'SYNC_TELEMETRY_ENABLED', True):
+            try:
+                record_request(request, response, endpoint, duration_ms, stats)
+            except Exception:
+                # Telemetry must never fail an upload
+                logger.exception('Sync telemetry could not be recorded',
+                                 extra={'endpoint': endpoint, 'status_code': response.status_code})
+
+
+def record_request(request, response, endpoint, duration_ms, stats):
+    from .models import SyncTelemetry
+
+    user = request.user if request.user.is_authenticated else None
+    values = getattr(request, 'sync_telemetry', {})
+    single = endpoint == 'create'
+    now = timezone.now()
+    return SyncTelemetry.objects.create(
+        bucket=now.replace(minute=0, second=0, microsecond=0),
+        endpoint=endpoint,
+        user=user,
+        device_id=request.META.get('HTTP_X_DEVICE_ID', '')[:64],
+        app_version=request.META.get('HTTP_X_APP_VERSION', '')[:32],
+        state=(user.state if user else '')[:100],
+        facility_id=user.facility_id if user else None,
+        sync_batch=values.get('sync_batch'),
+        status_code=response.status_code,
+        records=values.get('records', 1 if single else 0),
+        bytes_in=int(request.META.get('CONTENT_LENGTH') or 0),
+        bytes_out=len(response.content) if not response.streaming else 0,
+        validation_failures=values.get('validation_failures', 1 if single and response.status_code == 400 else 0),
+        duration_ms=round(duration_ms, 2),
+        db_ms=round(stats.get('db_ms', 0), 2),
+        db_queries=stats.get('db_queries', 0),
+        ml_ms=round(stats.get('ml_ms', 0), 2),
+    )
+
+
+def record_batch_processing(batch, worker_ms, stats):
+    """Complete the telemetry row of a staged batch once the worker has ingested it."""
+    from .models import SyncTelemetry
+
+    SyncTelemetry.objects.filter(sync_batch=batch).update(
+        validation_failures=batch.failed_records,
+        ml_ms=round(stats.get('ml_ms', 0), 2),
+        worker_ms=round(worker_ms, 2),
+    )
+
+
+def histogram_percentile(cumulative, total, pct, maximum):
+    """
+    Nearest-rank percentile from cumulative histogram counts
+    [(upper_bound, rows <= upper_bound), ...]: the upper bound of the bucket the
+    rank falls in, capped at the observed maximum (which also answers ranks
+    beyond the last bound).
+    """
+    if not total:
+        return None
+    rank = max(1, math.ceil(pct / 100 * total))
+    for bound, count in cumulative:
+        if count >= rank:
+            return min(bound, maximum)
+    return maximum
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from django.db.models import Avg, Count, F, FloatField, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from accounts.views import IsMoHAdmin
+from .models import SyncTelemetry
+from .telemetry import histogram_percentile
+
+GROUP_FIELDS = {
+    'state': 'state',
+    'facility': 'facility__name',
+    'app_version': 'app_version',
+    'endpoint': 'endpoint',
+}
+
+# Histogram bounds (1-2-5 steps) that percentiles are read from. Everything is
+# aggregated in the database, so a 30-day window costs one row per group.
+DURATION_BOUNDS_MS = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 60000)
+SIZE_BOUNDS_BYTES = (1_000, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000, 200_000, 500_000,
+                     1_000_000, 2_000_000, 5_000_000, 10_000_000)
+PERCENTILES = (50, 90, 99)
+
+
+def aggregates():
+    """Per-group totals plus cumulative duration / upload size histograms."""
+    values = {
+        'requests': Count('id'),
+        'records': Coalesce(Sum('records'), 0),
+        'errors': Count('id', filter=Q(status_code__gte=400)),
+        'validation_failures': Coalesce(Sum('validation_failures'), 0),
+        'bytes_out_total': Coalesce(Sum('bytes_out'), 0),
+        'db_ms_total': Coalesce(Sum('db_ms'), Value(0.0), output_field=FloatField()),
+        'ml_ms_total': Coalesce(Sum('ml_ms'), Value(0.0), output_field=FloatField()),
+        'duration_max': Max('duration_ms'),
+        'bytes_in_max': Max('bytes_in'),
+    }
+    for bound in DURATION_BOUNDS_MS:
+        values[f'duration_le_{bound}'] = Count('id', filter=Q(duration_ms__lte=bound))
+    for bound in SIZE_BOUNDS_BYTES:
+        values[f'bytes_in_le_{bound}'] = Count('id', filter=Q(bytes_in__lte=bound))
+    return values
+
+
+def summarize(row):
+    def percentiles(name, bounds):
+        cumulative = [(bound, row[f'{name}_le_{bound}']) for bound in bounds]
+        return {f'p{p}': histogram_percentile(cumulative, row['requests'], p, row[f'{name}_max'])
+                for p in PERCENTILES}
+
+    return {
+        'requests': row['requests'],
+        'records': row['records'],
+        'errors': row['errors'],
+        'validation_failures': row['validation_failures'],
+        'duration_ms': percentiles('duration', DURATION_BOUNDS_MS),
+        'bytes_in': percentiles('bytes_in', SIZE_BOUNDS_BYTES),
+        'bytes_out_total': row['bytes_out_total'],
+        'db_ms_total': round(row['db_ms_total'], 1),
+        'ml_ms_total': round(row['ml_ms_total'], 1),
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsMoHAdmin])
+def sync_telemetry(request):
+    """Sync latency/size percentiles grouped by state, facility, app version or endpoint"""
+    try:
+        hours = min(max(int(request.query_params.get('hours', 24)), 1), 24 * 30)
+    except ValueError:
+        return Response({'error': 'hours must be an integer'}, status=400)
+    group_by = request.query_params.get('group_by', 'state')
+    if group_by not in GROUP_FIELDS:
+        return Response({'error': f"group_by must be one of {', '.join(GROUP_FIELDS)}"}, status=400)
+
+    field = GROUP_FIELDS[group_by]
+    since = timezone.now() - timedelta(hours=hours)
+    rows = SyncTelemetry.objects.filter(bucket__gte=since).order_by()
+
+    groups = {}
+    for row in rows.values(field).annotate(**aggregates()):
+        groups[row[field] or 'unknown'] = summarize(row)
+
+    # Devices with the most failed uploads, then the slowest on average
+    failing = (
+        rows.exclude(device_id='').values('device_id')
+        .annotate(**aggregates(), duration_avg=Avg('duration_ms'))
+        .annotate(failures=F('errors') + F('validation_failures'))
+        .order_by('-failures', '-duration_avg')[:10]
+    )
+
+    return Response({
+        'window_hours': hours,
+        'group_by': group_by,
+        'overall': summarize(rows.aggregate(**aggregates())),
+        'groups': dict(sorted(groups.items(), key=lambda g: str(g[0]))),
+        'problem_devices': [{'device_id': row['device_id'], **summarize(row)} for row in failing],
+    })
@@ -0,0 +1,82 @@
+"""
+ARCHIVAL TESTS
+Tests moving closed cases to archived_cases, read-through history lookups and restore
+"""
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import Facility
+from assessments.archive import archive_closed_cases
+from assessments.models import ArchivedCase, Assessment, Referral, TreatmentRecord
+from assessments.testing import make_record
+
+User = get_user_model()
+
+
+class ArchiveTests(TestCase):
+
+    def setUp(self):
+        self.facility = Facility.objects.create(name='Bor OTP', facility_type='OTP', state='Jonglei')
+        self.chw = User.objects.create_user(username='arch_chw', password='test123', role='CHW', facility=self.facility)
+        self.doctor = User.objects.create_user(username='arch_doc', password='test123', role='DOCTOR', facility=self.facility)
+        old = timezone.now() - timedelta(days=1000)
+
+        self.closed = self.make_case(1, 'RECOVERED', when=old)
+        self.recent = self.make_case(2, 'RECOVERED', when=timezone.now())
+        self.open = self.make_case(3, 'IN_TREATMENT', when=old)
+
+    def make_case(self, i, outcome, when):
+        assessment = Assessment.objects.create(**make_record(i), chw=self.chw, facility=self.facility, state='Jonglei')
+        referral = Referral.objects.create(assessment=assessment, referred_by=self.chw, referred_to=self.doctor)
+        treatment = TreatmentRecord.objects.create(assessment=assessment, doctor=self.doctor, status=outcome)
+        Assessment.objects.filter(id=assessment.id).update(timestamp=when, created_at=when, updated_at=when)
+        Referral.objects.filter(id=referral.id).update(created_at=when, updated_at=when)
+        TreatmentRecord.objects.filter(id=treatment.id).update(created_at=when, updated_at=when)
+        return assessment
+
+    def test_only_old_closed_cases_are_archived(self):
+        self.assertEqual(archive_closed_cases(dry_run=True), (1, 0))
+        self.assertEqual(archive_closed_cases(horizon_days=730, batch_size=10), (1, 1))
+
+        case = ArchivedCase.objects.get()
+        self.assertEqual(case.child_id, self.closed.child_id)
+        self.assertEqual(case.final_status, 'RECOVERED')
+        self.assertEqual((case.referral_count, case.treatment_count), (1, 1))
+        self.assertFalse(Assessment.objects.filter(child_id=self.closed.child_id).exists())
+        self.assertFalse(Referral.objects.filter(assessment_id=self.closed.id).exists())
+        self.assertEqual(Assessment.objects.count(), 2)
+
+    def test_history_reads_through_to_archive(self):
+        archive_closed_cases()
+        client = APIClient()
+        client.force_authenticate(user=self.chw)
+
+        response = client.get(f'/api/assessments/history/?child_id={self.closed.child_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['archived'])
+        self.assertEqual(response.data['assessments'][0]['id'], self.closed.id)
+        self.assertEqual(response.data['assessments'][0]['facility_name'], 'Bor OTP')
+        self.assertEqual(response.data['treatment_records'][0]['status'], 'RECOVERED')
+        self.assertEqual(len(response.data['referrals']), 1)
+
+        response = client.get(f'/api/assessments/history/?child_id={self.recent.child_id}')
+        self.assertFalse(response.data['archived'])
+
+        other = User.objects.create_user(username='arch_other', password='test123', role='CHW')
+        client.force_authenticate(user=other)
+        response = client.get(f'/api/assessments/history/?child_id={self.closed.child_id}')
+        self.assertEqual(response.status_code, 404)
+
+    def test_restore_command(self):
+        archive_closed_cases()
+        call_command('restore_archived_cases', self.closed.child_id, stdout=StringIO())
+
+        self.assertFalse(ArchivedCase.objects.exists())
+        restored = Assessment.objects.get(id=self.closed.id)
+        self.assertLess(restored.timestamp, timezone.now() - timedelta(days=900))
+        self.assertEqual(TreatmentRecord.objects.get(assessment=restored).status, 'RECOVERED')
+        self.assertTrue(Referral.objects.filter(assessment=restored).exists())
@@ -0,0 +1,122 @@
+"""
+ASYNC READ ENDPOINT TESTS
+Tests that the /api/async/ analytics, forecast and doctor directory views match their sync counterparts,
+and that requests through AsyncClient run the middleware stack without thread adapters
+"""
+import json
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.authentication import add_user_claims
+from accounts.models import Facility
+from assessments.models import Assessment, Referral, SyncTelemetry
+from assessments.testing import make_record
+
+User = get_user_model()
+
+
+class AsyncViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.facility = Facility.objects.create(name='Bor OTP', facility_type='OTP', state='Jonglei')
+        cls.admin = User.objects.create_user(username='async_admin', password='test123', role='MOH_ADMIN')
+        cls.chw = User.objects.create_user(username='async_chw', password='test123', role='CHW',
+                                           facility=cls.facility, state='Jonglei', first_name='Nyandeng')
+        cls.doctor = User.objects.create_user(username='async_doc', password='test123', role='DOCTOR',
+                                              facility=cls.facility, state='Jonglei')
+        for i, clinical_status in enumerate(['SAM', 'MAM', 'MAM', 'Healthy']):
+            assessment = Assessment.objects.create(**make_record(i, clinical_status=clinical_status),
+                                                   chw=cls.chw, facility=cls.facility)
+            Referral.objects.create(assessment=assessment, referred_by=cls.chw, referred_to=cls.doctor,
+                                    status='COMPLETED' if i == 0 else 'PENDING')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.bearer = self.bearer_for(self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION=self.bearer)
+
+    def bearer_for(self, user):
+        return f'Bearer {add_user_claims(AccessToken.for_user(user), user)}'
+
+    def test_payloads_match_sync_views(self):
+        for path in ['analytics/national-summary/', 'analytics/state-trends/', 'analytics/time-series/',
+                     'analytics/chw-performance/', 'analytics/doctor-performance/',
+                     f'analytics/facility/{self.facility.id}/', 'referrals/active_doctors/?grouped=true']:
+            with self.subTest(path=path):
+                sync = self.client.get(f'/api/{path}')
+                response = self.client.get(f'/api/async/{path}')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.json(), sync.json())
+
+    def test_national_summary(self):
+        data = self.client.get('/api/async/analytics/national-summary/').json()
+        self.assertEqual((data['total_assessments'], data['sam_count'], data['mam_count']), (4, 1, 2))
+        self.assertEqual(data['sam_prevalence'], 25.0)
+
+    def test_forecast(self):
+        data = self.client.get('/api/async/analytics/forecast/').json()
+        self.assertEqual(sum(data['historical']['total_counts']), 4)
+        self.assertEqual(len(data['forecast']['months']), 3)
+
+    def test_missing_facility(self):
+        response = self.client.get('/api/async/analytics/facility/999999/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {'error': 'Facility not found'})
+
+    def test_requires_authentication(self):
+        self.client.credentials()
+        response = self.client.get('/api/async/analytics/national-summary/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(self.client.get('/api/async/analytics/national-summary/').status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+
+    def test_get_only(self):
+        response = self.client.post('/api/async/analytics/national-summary/')
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_directory_etag(self):
+        response = self.client.get('/api/async/referrals/active_doctors/')
+        self.assertEqual(response.json()[0]['id'], self.doctor.id)
+        revalidated = self.client.get('/api/async/referrals/active_doctors/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+    def test_middleware_is_not_adapted(self):
+        # With DEBUG on, Django logs '... handler adapted for middleware ...' for each one it has to wrap
+        with override_settings(DEBUG=True), self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler().load_middleware(is_async=True)
+
+    async def test_payload_and_middleware_headers(self):
+        # Per-request headers replace the client's default ones in Django 4.2, so pass them all here
+        response = await AsyncClient().get('/api/async/analytics/national-summary/',
+                                           headers={'Authorization': self.bearer, 'X-Request-ID': 'dash-7'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual((data['total_assessments'], data['sam_count'], data['mam_count']), (4, 1, 2))
+        self.assertEqual(response['X-Request-ID'], 'dash-7')
+        self.assertGreater(response.query_stats['queries'], 0)
+        self.assertIn(f'desc="{response.query_stats["queries"]} queries"', response['Server-Timing'])
+
+    async def test_requires_authentication_async(self):
+        response = await AsyncClient().get('/api/async/analytics/national-summary/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(response['X-Request-ID'])
+
+    async def test_sync_upload_is_recorded(self):
+        """Sync views still run under the async stack, and telemetry is written off the event loop"""
+        response = await AsyncClient().post(
+            '/api/assessments/sync/', json.dumps([make_record(10)]), content_type='application/json',
+            headers={'Authorization': self.bearer_for(self.chw), 'X-Device-ID': 'dev-9'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        row = await SyncTelemetry.objects.aget()
+        self.assertEqual((row.endpoint, row.device_id, row.records), ('sync', 'dev-9', 1))
+        self.assertGreater(row.db_queries, 0)
@@ -2,6 +2,7 @@
 COMPREHENSIVE BACKEND TESTS
 Tests ML predictions, Z-scores, business logic, data validation, and integration
 """
+from django.core.cache import cache
 from django.test import TestCase, TransactionTestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
@@ -16,6 +17,9 @@ User = get_user_model()
 class MLPredictionTests(TestCase):
     """Test actual ML model predictions"""
     
+    def setUp(self):
+        cache.clear()
+    
     def test_sam_with_complications_predicts_sc_itp(self):
         """Test SAM + complications → SC-ITP"""
         data = {
@@ -109,6 +113,7 @@ class DataValidationTests(TestCase):
     """Test input validation and edge cases"""
     
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(username='validator', password='test', role='CHW')
         self.client.force_authenticate(user=self.user)
@@ -208,6 +213,7 @@ class BusinessLogicTests(TestCase):
     """Test CMAM business rules"""
     
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(username='logic_test', password='test', role='CHW')
         self.client.force_authenticate(user=self.user)
@@ -267,6 +273,9 @@ class BusinessLogicTests(TestCase):
 class DataIntegrityTests(TransactionTestCase):
     """Test data consistency and integrity"""
     
+    def setUp(self):
+        cache.clear()
+    
     def test_duplicate_child_id_allowed(self):
         """Test system allows multiple assessments for same child"""
         client = APIClient()
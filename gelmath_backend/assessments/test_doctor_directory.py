@@ -0,0 +1,101 @@
+"""
+DOCTOR DIRECTORY TESTS
+Tests the cached referral doctor directory: grouping, proximity ordering, ETags and invalidation
+"""
+from unittest import mock
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+from accounts.models import Facility
+from assessments.doctor_directory import get_directory
+
+User = get_user_model()
+
+
+class DoctorDirectoryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.bor = Facility.objects.create(name='Bor OTP', facility_type='OTP', state='Jonglei')
+        self.akobo = Facility.objects.create(name='Akobo SC', facility_type='SC', state='Jonglei')
+        self.juba = Facility.objects.create(name='Juba Teaching', facility_type='SC', state='Central Equatoria')
+        self.doctors = {
+            facility.name: User.objects.create_user(
+                username=f'dir_doc_{facility.id}', password='test123', role='DOCTOR',
+                facility=facility, state=facility.state, first_name='Doc', last_name=facility.name,
+            )
+            for facility in (self.juba, self.akobo, self.bor)
+        }
+        User.objects.create_user(username='dir_inactive', password='test123', role='DOCTOR', is_active=False)
+        self.chw = User.objects.create_user(username='dir_chw', password='test123', role='CHW',
+                                            facility=self.bor, state='Jonglei')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.chw)
+
+    def get(self, query='', **headers):
+        return self.client.get(f'/api/referrals/active_doctors/{query}', **headers)
+
+    def test_lists_active_doctors_from_cache(self):
+        response = self.get()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertIn('display_name_for_referral', response.data[0])
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.get().data), 3)
+
+    def test_grouped_by_state_and_facility(self):
+        groups = self.get('?grouped=true').data
+        self.assertEqual([group['state'] for group in groups], ['Central Equatoria', 'Jonglei'])
+        jonglei = groups[1]['facilities']
+        self.assertEqual([facility['facility_name'] for facility in jonglei], ['Akobo SC', 'Bor OTP'])
+        self.assertEqual(jonglei[1]['doctors'][0]['id'], self.doctors['Bor OTP'].id)
+
+    def test_proximity_ordering(self):
+        ids = [row['id'] for row in self.get('?ordering=proximity').data]
+        expected = [self.doctors[name].id for name in ('Bor OTP', 'Akobo SC', 'Juba Teaching')]
+        self.assertEqual(ids, expected)
+
+    def test_etag_revalidation(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertNotEqual(self.get('?grouped=true')['ETag'], etag)
+
+    def test_doctor_changes_invalidate(self):
+        etag = self.get()['ETag']
+        doctor = self.doctors['Juba Teaching']
+        with self.captureOnCommitCallbacks(execute=True):
+            doctor.is_active = False
+            doctor.save()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.akobo.name = 'Akobo Stabilisation Centre'
+            self.akobo.save()
+        names = {row['facility_name'] for row in self.get().data}
+        self.assertIn('Akobo Stabilisation Centre', names)
+
+    def test_role_change_away_from_doctor_invalidates(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            doctor = self.doctors['Bor OTP']
+            doctor.role = 'CHW'
+            doctor.save()
+        self.assertEqual(len(self.get().data), 2)
+
+    def test_chw_changes_keep_cache(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.chw.phone = '0912000000'
+            self.chw.save()
+        self.assertEqual(callbacks, [])
+
+    @override_settings(DOCTOR_DIRECTORY_CACHE_SECONDS=15)
+    def test_cache_entry_has_a_timeout(self):
+        # Other workers' copies are never invalidated, so they must expire
+        with mock.patch.object(cache, 'set') as cache_set:
+            get_directory()
+        self.assertEqual(cache_set.call_args.args[2], 15)
@@ -0,0 +1,81 @@
+"""
+SYNC ENCODING TESTS
+Content negotiation and round-trips for MessagePack / columnar JSON
+(size and parse-time comparison: `python manage.py benchmark_encodings`)
+"""
+import io
+import json
+import unittest
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from assessments.models import Assessment, SyncBatch
+from assessments.encodings import msgpack, to_columns, from_columns, ColumnarJSONParser
+from assessments.testing import full_record
+
+User = get_user_model()
+
+COLUMNAR = 'application/vnd.gelmath.columnar+json'
+
+
+class EncodingNegotiationTests(TestCase):
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.chw = User.objects.create_user(username='enc_chw', password='test123', role='CHW')
+        self.client.force_authenticate(user=self.chw)
+    
+    def test_json_remains_default(self):
+        """No Accept header -> JSON"""
+        response = self.client.get('/api/assessments/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('application/json'))
+    
+    def test_columnar_roundtrip(self):
+        """Columnar layout round-trips records, including missing keys"""
+        records = [{'a': 1, 'b': 'x'}, {'a': 2}]
+        self.assertEqual(from_columns(to_columns(records)), [{'a': 1, 'b': 'x'}, {'a': 2, 'b': None}])
+    
+    def test_columnar_parser_roundtrip(self):
+        """A full sync batch parses back unchanged, and is smaller than the JSON"""
+        records = [full_record(i) for i in range(50)]
+        payload = json.dumps(to_columns(records)).encode()
+        self.assertEqual(ColumnarJSONParser().parse(io.BytesIO(payload)), records)
+        self.assertLess(len(payload), len(json.dumps(records)))
+    
+    def test_columnar_sync_upload(self):
+        """Sync accepts a columnar envelope"""
+        body = json.dumps({'client_batch_id': 'c1', 'records': to_columns([full_record(i) for i in range(3)])})
+        response = self.client.post('/api/assessments/sync/', body, content_type=COLUMNAR)
+        
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(SyncBatch.objects.get().payload[2]['child_id'], 'SYNC_0002')
+    
+    def test_columnar_list_response(self):
+        """Paginated list results are rendered column-wise when requested"""
+        Assessment.objects.create(child_id='COL1', sex='M', age_months=24, muac_mm=105, chw=self.chw)
+        response = self.client.get('/api/assessments/', HTTP_ACCEPT=COLUMNAR)
+        
+        body = json.loads(response.content)
+        self.assertEqual(body['results']['count'], 1)
+        self.assertEqual(body['results']['columns']['child_id'], ['COL1'])
+    
+    def test_ragged_columnar_rejected(self):
+        """Columns of different lengths are a parse error"""
+        body = json.dumps({'count': 2, 'columns': {'a': [1, 2], 'b': [1]}})
+        response = self.client.post('/api/assessments/sync/', body, content_type=COLUMNAR)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    @unittest.skipIf(msgpack is None, 'msgpack not installed')
+    def test_msgpack_sync_and_list(self):
+        """MessagePack request and response bodies"""
+        body = msgpack.packb({'records': [full_record(1)]})
+        response = self.client.post('/api/assessments/sync/', body, content_type='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        
+        Assessment.objects.create(child_id='MP1', sex='F', age_months=12, muac_mm=118, chw=self.chw)
+        response = self.client.get('/api/assessments/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content)['results'][0]['child_id'], 'MP1')
+
@@ -0,0 +1,103 @@
+"""
+PROMETHEUS METRICS TESTS
+Tests request, query, inference, cache and sync batch metrics and the /metrics/ endpoint
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+from assessments.testing import make_record
+
+User = get_user_model()
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@override_settings(METRICS_TOKEN='scrape-token')
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='metrics_admin', password='test123', role='MOH_ADMIN')
+        self.client.force_authenticate(user=self.admin)
+
+    def scrape(self, token='scrape-token'):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        return APIClient().get('/metrics/', **headers)
+
+    def test_metrics_need_token(self):
+        self.assertEqual(self.scrape(token=None).status_code, 403)
+        self.assertEqual(self.scrape(token='wrong').status_code, 403)
+        with override_settings(METRICS_TOKEN=''):
+            self.assertEqual(self.scrape(token='').status_code, 403)
+
+        response = self.scrape()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'gelmath_http_request_duration_seconds_bucket', response.content)
+
+    def test_request_latency_and_queries_by_route(self):
+        labels = {'route': 'assessments.analytics_views.national_summary', 'method': 'GET', 'status': '200'}
+        before = sample('gelmath_http_request_duration_seconds_count', **labels)
+        queries_before = sample('gelmath_http_request_db_queries_count', route=labels['route'])
+
+        self.assertEqual(self.client.get('/api/analytics/national-summary/').status_code, 200)
+
+        self.assertEqual(sample('gelmath_http_request_duration_seconds_count', **labels), before + 1)
+        self.assertEqual(sample('gelmath_http_request_db_queries_count', route=labels['route']), queries_before + 1)
+        self.assertEqual(sample('gelmath_http_requests_in_progress'), 0)
+
+    def test_unmatched_paths_share_one_route(self):
+        before = sample('gelmath_http_request_duration_seconds_count', route='unmatched', method='GET', status='404')
+        self.client.get('/no-such-page/1/')
+        self.client.get('/no-such-page/2/')
+        self.assertEqual(
+            sample('gelmath_http_request_duration_seconds_count', route='unmatched', method='GET', status='404'),
+            before + 2,
+        )
+
+    def test_cache_hits_and_misses(self):
+        misses = sample('gelmath_cache_requests_total', cache='doctor_directory', result='miss')
+        hits = sample('gelmath_cache_requests_total', cache='doctor_directory', result='hit')
+        self.client.get('/api/referrals/active_doctors/')
+        self.client.get('/api/referrals/active_doctors/')
+        self.assertEqual(sample('gelmath_cache_requests_total', cache='doctor_directory', result='miss'), misses + 1)
+        self.assertEqual(sample('gelmath_cache_requests_total', cache='doctor_directory', result='hit'), hits + 1)
+
+    def test_sync_batch_size(self):
+        before = sample('gelmath_sync_batch_records_sum')
+        self.client.force_authenticate(user=User.objects.create_user(username='metrics_chw', password='x', role='CHW'))
+        self.client.post('/api/assessments/sync/', [make_record(i) for i in range(7)], format='json')
+        self.assertEqual(sample('gelmath_sync_batch_records_sum'), before + 7)
+
+    def test_inference_latency_by_model_version(self):
+        from assessments import ml_models
+
+        response = self.client.post('/api/predict/', {'muac_mm': 110, 'age_months': 24, 'sex': 'M'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        version = ml_models.status()['versions']['pathway_model']
+        self.assertEqual(len(version), 12)
+        self.assertGreaterEqual(
+            sample('gelmath_model_inference_seconds_count', model='pathway_model', version=version), 1
+        )
+
+    def test_multiprocess_scrape_aggregates_workers(self):
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=metrics_dir)
+            worker = 'from gelmath_api.metrics import record_cache; record_cache("directory", True)'
+            for _ in range(2):
+                subprocess.run([sys.executable, '-c', worker], env=env, cwd=settings.BASE_DIR, check=True)
+
+            with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': metrics_dir}):
+                response = self.scrape()
+        self.assertIn(b'gelmath_cache_requests_total{cache="directory",result="hit"} 2.0', response.content)
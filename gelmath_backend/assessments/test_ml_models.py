@@ -0,0 +1,73 @@
+"""
+ML MODEL REGISTRY TESTS
+Tests that artifacts load once per process, failures are reported, and /readyz follows warm-up
+"""
+from unittest import mock
+from django.test import SimpleTestCase
+from assessments import ml_models
+
+
+class MLModelRegistryTests(SimpleTestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.loaders = {
+            'pathway_model': self.loader('pathway'),
+            'shap_explainer': self.failing_loader,
+        }
+        # Fresh registry per test; the real artifacts are restored afterwards
+        for name, value in (('LOADERS', self.loaders), ('_artifacts', {}), ('_errors', {}),
+                            ('_warm_up', {'status': 'cold', 'seconds': None})):
+            patcher = mock.patch.object(ml_models, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def loader(self, value):
+        def load():
+            self.calls.append(value)
+            return value
+        return load
+
+    def failing_loader(self):
+        self.calls.append('shap')
+        raise ImportError("No module named 'shap'")
+
+    def test_artifact_loaded_once(self):
+        self.assertEqual(ml_models.get('pathway_model'), 'pathway')
+        self.assertEqual(ml_models.get('pathway_model'), 'pathway')
+        self.assertEqual(self.calls, ['pathway'])
+
+    def test_failed_optional_artifact_is_none_and_not_retried(self):
+        self.assertIsNone(ml_models.get('shap_explainer'))
+        self.assertIsNone(ml_models.get('shap_explainer'))
+        self.assertEqual(self.calls, ['shap'])
+        self.assertIn('ImportError', ml_models.status()['artifacts']['shap_explainer'])
+
+    def test_warm_up_ready_despite_optional_failure(self):
+        self.assertEqual(ml_models.warm_up(), 'ready')
+        state = ml_models.status()
+        self.assertEqual(state['artifacts']['pathway_model'], 'loaded')
+        self.assertIsNotNone(state['warm_up_seconds'])
+        ml_models.warm_up()
+        self.assertEqual(sorted(self.calls), ['pathway', 'shap'])
+
+    def test_warm_up_fails_without_required_artifact(self):
+        self.loaders['pathway_model'] = self.failing_loader
+        self.assertEqual(ml_models.warm_up(), 'failed')
+
+    def test_readyz_503_until_warm(self):
+        with mock.patch.object(ml_models, 'warm_up_in_background') as background:
+            response = self.client.get('/readyz/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['status'], 'cold')
+        background.assert_called_once()
+
+        ml_models.warm_up()
+        response = self.client.get('/readyz/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['artifacts']['pathway_model'], 'loaded')
+
+    def test_readyz_503_when_required_artifact_failed(self):
+        self.loaders['pathway_model'] = self.failing_loader
+        ml_models.warm_up()
+        self.assertEqual(self.client.get('/readyz/').status_code, 503)
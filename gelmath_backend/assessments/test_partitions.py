@@ -0,0 +1,41 @@
+"""
+ASSESSMENT PARTITION TESTS
+Tests month arithmetic and partition naming, and that partition management is
+a no-op on databases without declarative partitioning
+"""
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from assessments.partitions import (add_months, ensure_partitions, is_partitioned, month_start,
+                                    partition_month, partition_name)
+
+
+class PartitionHelperTests(TestCase):
+
+    def test_month_arithmetic(self):
+        self.assertEqual(add_months(date(2026, 11, 1), 3), date(2027, 2, 1))
+        self.assertEqual(add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+
+    def test_month_start_uses_utc(self):
+        # 00:30 on 1 November in Juba is still October in UTC
+        juba = timezone(timedelta(hours=2))
+        self.assertEqual(month_start(datetime(2026, 11, 1, 0, 30, tzinfo=juba)), date(2026, 10, 1))
+
+    def test_partition_names_round_trip(self):
+        self.assertEqual(partition_name(date(2026, 3, 1)), 'assessments_p2026_03')
+        self.assertEqual(partition_month('assessments_p2026_03'), date(2026, 3, 1))
+        self.assertIsNone(partition_month('assessments_default'))
+
+    def test_noop_without_postgres(self):
+        self.assertFalse(is_partitioned())
+        self.assertEqual(ensure_partitions(), [])
+        out = StringIO()
+        call_command('assessment_partitions', stdout=out)
+        self.assertIn('not partitioned', out.getvalue())
+
+    def test_rejects_bad_month(self):
+        from assessments.management.commands.assessment_partitions import _month
+        with self.assertRaises(CommandError):
+            _month('2026/03')
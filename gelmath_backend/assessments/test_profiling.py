@@ -0,0 +1,127 @@
+"""
+REQUEST PROFILING TESTS
+Tests header- and sample-triggered profiles, the on-disk ring and the pstats/speedscope downloads
+"""
+import pstats
+import shutil
+import tempfile
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.authentication import add_user_claims
+
+User = get_user_model()
+
+
+class ProfilingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='prof_admin', password='test123', role='MOH_ADMIN')
+        cls.chw = User.objects.create_user(username='prof_chw', password='test123', role='CHW')
+
+    def setUp(self):
+        cache.clear()
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        settings_override = override_settings(PROFILE_DIR=self.profile_dir, PROFILE_MAX_FILES=3)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def bearer_for(self, user):
+        return f'Bearer {add_user_claims(AccessToken.for_user(user), user)}'
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=self.bearer_for(user))
+        return client
+
+    def profiles(self):
+        response = self.client_for(self.admin).get('/api/ops/profiles/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_unprofiled_by_default(self):
+        self.client_for(self.admin).get('/api/analytics/national-summary/')
+        self.assertEqual(self.profiles(), [])
+
+    def test_admin_header_profiles_request(self):
+        response = self.client_for(self.admin).get('/api/analytics/forecast/', HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        profile_id = response['X-Profile-Id']
+
+        [meta] = self.profiles()
+        self.assertEqual(meta['id'], profile_id)
+        self.assertEqual(meta['route'], 'assessments.forecast_views.forecast_trends')
+        self.assertEqual((meta['trigger'], meta['status'], meta['user_id']), ('header', 200, self.admin.pk))
+
+        download = self.client_for(self.admin).get(f'/api/ops/profiles/{profile_id}/pstats/')
+        self.assertEqual(download.status_code, 200)
+        path = f'{self.profile_dir}/download.pstats'
+        with open(path, 'wb') as f:
+            f.write(b''.join(download.streaming_content))
+        functions = {function for _, _, function in pstats.Stats(path).stats}
+        self.assertIn('forecast_payload', functions)
+
+    def test_speedscope_download(self):
+        profile_id = self.client_for(self.admin).get(
+            '/api/analytics/forecast/', HTTP_X_PROFILE='1')['X-Profile-Id']
+        response = self.client_for(self.admin).get(f'/api/ops/profiles/{profile_id}/speedscope/')
+        self.assertEqual(response.status_code, 200)
+        speedscope = response.json()
+        profile = speedscope['profiles'][0]
+        self.assertEqual(profile['type'], 'sampled')
+        self.assertEqual(len(profile['samples']), len(profile['weights']))
+        frames = speedscope['shared']['frames']
+        self.assertIn('forecast_payload', {frame['name'] for frame in frames})
+        self.assertTrue(all(index < len(frames) for stack in profile['samples'] for index in stack))
+
+    def test_header_from_non_admin_is_ignored(self):
+        """The token is checked before profiling: others never start cProfile or take the lock"""
+        anonymous = APIClient()
+        invalid = APIClient()
+        invalid.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        with mock.patch('gelmath_api.profiling._busy') as busy, \
+                mock.patch('gelmath_api.profiling.cProfile.Profile') as profile:
+            response = self.client_for(self.chw).get('/api/analytics/national-summary/', HTTP_X_PROFILE='1')
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('X-Profile-Id', response)
+            for client in (anonymous, invalid):
+                self.assertEqual(client.get('/api/analytics/national-summary/', HTTP_X_PROFILE='1').status_code, 401)
+        busy.acquire.assert_not_called()
+        profile.assert_not_called()
+        self.assertEqual(self.profiles(), [])
+
+    async def test_admin_header_under_asgi(self):
+        """Under the async stack the profile still covers the sync view's thread"""
+        response = await AsyncClient().get('/api/analytics/forecast/',
+                                           headers={'Authorization': self.bearer_for(self.admin), 'X-Profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        path = f'{self.profile_dir}/{response["X-Profile-Id"]}.pstats'
+        self.assertIn('forecast_payload', {function for _, _, function in pstats.Stats(path).stats})
+
+        response = await AsyncClient().get('/api/analytics/forecast/',
+                                           headers={'Authorization': self.bearer_for(self.chw), 'X-Profile': '1'})
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_sampled_route(self):
+        with override_settings(PROFILE_SAMPLE_RATES={'assessments.analytics_views.state_trends': 1.0}):
+            self.client_for(self.chw).get('/api/analytics/state-trends/')
+            self.client_for(self.chw).get('/api/analytics/national-summary/')
+        [meta] = self.profiles()
+        self.assertEqual((meta['route'], meta['trigger']), ('assessments.analytics_views.state_trends', 'sample'))
+
+    def test_ring_keeps_newest(self):
+        client = self.client_for(self.admin)
+        ids = [client.get('/api/analytics/national-summary/', HTTP_X_PROFILE='1')['X-Profile-Id'] for _ in range(5)]
+        self.assertEqual([meta['id'] for meta in self.profiles()], ids[:-4:-1])
+
+    def test_admin_only(self):
+        self.assertEqual(self.client_for(self.chw).get('/api/ops/profiles/').status_code, 403)
+        response = self.client_for(self.admin).get('/api/ops/profiles/20260101T000000-1-1/pstats/')
+        self.assertEqual(response.status_code, 404)
+        response = self.client_for(self.admin).get('/api/ops/profiles/..%2Fsecret/pstats/')
+        self.assertEqual(response.status_code, 404)
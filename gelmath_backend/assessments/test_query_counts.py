@@ -0,0 +1,63 @@
+"""
+QUERY COUNT TESTS
+List endpoints must run a fixed number of queries per page, no matter how many
+related facilities, CHWs and doctors the rows point at: count estimate + SELECT
+for keyset paginated lists (one SELECT with ?with_count=false), COUNT + SELECT
+for page-number lists
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from accounts.models import Facility
+from assessments.models import Assessment, Referral, TreatmentRecord
+from assessments.testing import make_record
+
+User = get_user_model()
+
+ROWS = 30
+
+
+class ListQueryCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='qc_admin', password='test123', role='MOH_ADMIN')
+        for i in range(ROWS):
+            facility = Facility.objects.create(name=f'Facility {i}', facility_type='OTP', state='Jonglei')
+            chw = User.objects.create_user(username=f'qc_chw_{i}', password='test123', role='CHW', facility=facility)
+            doctor = User.objects.create_user(username=f'qc_doc_{i}', password='test123', role='DOCTOR', facility=facility)
+            assessment = Assessment.objects.create(
+                **make_record(i), chw=chw, facility=facility, assigned_doctor=doctor
+            )
+            Referral.objects.create(assessment=assessment, referred_by=chw, referred_to=doctor)
+            TreatmentRecord.objects.create(assessment=assessment, doctor=doctor, status='ADMITTED')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def assertListQueries(self, url, expected_rows, queries=2):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), expected_rows)
+        return response
+
+    def test_assessment_list(self):
+        response = self.assertListQueries('/api/assessments/', ROWS)
+        self.assertTrue(response.data['results'][0]['facility_name'].startswith('Facility'))
+
+    def test_referral_list(self):
+        response = self.assertListQueries('/api/referrals/', ROWS)
+        self.assertTrue(response.data['results'][0]['referred_to_name'])
+
+    def test_treatment_list(self):
+        self.assertListQueries('/api/treatments/', ROWS)
+
+    def test_list_without_count(self):
+        self.assertListQueries('/api/assessments/?with_count=false', ROWS, queries=1)
+
+    def test_user_list(self):
+        # 61 users, first page of 50
+        self.assertListQueries('/api/users/', 50, queries=2)
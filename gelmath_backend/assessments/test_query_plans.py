@@ -0,0 +1,63 @@
+"""
+QUERY PLAN CHECK TESTS
+Tests the EXPLAIN plan walkers (indexes, partition pruning) and that the check
+command degrades on non-Postgres databases
+"""
+from datetime import datetime, timezone
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from assessments.management.commands.check_query_plans import (hot_queries, plan_indexes, plan_relations,
+                                                               unpruned_partitions)
+
+
+class QueryPlanCheckTests(TestCase):
+
+    def test_plan_indexes_walks_nested_nodes(self):
+        plan = {
+            'Node Type': 'Limit',
+            'Plans': [{
+                'Node Type': 'Aggregate',
+                'Plans': [{'Node Type': 'Index Only Scan', 'Index Name': 'assessment_state_ts_idx', 'Plans': []}],
+            }, {
+                'Node Type': 'Bitmap Heap Scan',
+                'Plans': [{'Node Type': 'Bitmap Index Scan', 'Index Name': 'referral_pending_idx'}],
+            }],
+        }
+        self.assertEqual(plan_indexes(plan), [
+            ('Index Only Scan', 'assessment_state_ts_idx'),
+            ('Bitmap Index Scan', 'referral_pending_idx'),
+        ])
+
+    def test_unpruned_partitions(self):
+        plan = {'Node Type': 'Append', 'Plans': [
+            {'Node Type': 'Seq Scan', 'Relation Name': 'assessments_p2025_12'},
+            {'Node Type': 'Seq Scan', 'Relation Name': 'assessments_p2026_01'},
+            {'Node Type': 'Seq Scan', 'Relation Name': 'assessments_default'},
+        ]}
+        scanned = plan_relations(plan)
+        since = datetime(2026, 1, 10, tzinfo=timezone.utc)
+        until = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+        self.assertEqual(unpruned_partitions(scanned, since, until), {'assessments_p2025_12', 'assessments_default'})
+        # Open-ended ranges may reach the DEFAULT partition
+        self.assertEqual(unpruned_partitions(scanned, since), {'assessments_p2025_12'})
+
+    def test_hot_queries_compile(self):
+        for label, queryset, expected in hot_queries():
+            self.assertTrue(str(queryset.query), label)
+            self.assertTrue(expected)
+
+    def test_hot_list_queries_are_the_api_page_queries(self):
+        queries = {label: str(queryset.query) for label, queryset, _ in hot_queries()}
+        doctor_referrals = queries['Doctor referral list']
+        self.assertIn('WHERE "referrals"."referred_to_id" = 1 ORDER BY "referrals"."created_at" DESC, '
+                      '"referrals"."id" DESC LIMIT 51', doctor_referrals)
+        # select_related from the serializer, as the API runs it
+        self.assertIn('INNER JOIN "assessments"', doctor_referrals)
+        self.assertIn('"referrals"."id" < 1', queries['Doctor referral list, next page'])
+
+    def test_command_skips_without_postgres(self):
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertIn('Skipped', out.getvalue())
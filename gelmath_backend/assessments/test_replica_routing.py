@@ -0,0 +1,68 @@
+"""
+REPLICA ROUTING TESTS
+Tests that analytics reads go to the replica alias, writes stay on the primary,
+and reads fall back after a user's write or when the replica lags
+"""
+from unittest import mock
+from django.core.cache import cache
+from django.db import connections, router
+from django.test import TestCase, RequestFactory
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from assessments.models import Assessment
+from assessments.testing import make_record
+from gelmath_api import db_routing
+
+User = get_user_model()
+
+
+class ReplicaRoutingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='replica_admin', password='test123', role='MOH_ADMIN')
+        # Register a replica alias without connecting to it; routing decisions only
+        databases = mock.patch.dict(connections.databases, {'replica': connections.databases['default']})
+        databases.start()
+        self.addCleanup(databases.stop)
+        lag = mock.patch.object(db_routing, 'replica_lag', return_value=0.0)
+        self.lag = lag.start()
+        self.addCleanup(lag.stop)
+
+    def get_request(self, method='get'):
+        request = getattr(RequestFactory(), method)('/api/analytics/national-summary/')
+        request.user = self.user
+        return request
+
+    def test_reads_inside_routed_view_use_replica(self):
+        with db_routing.replica_reads(self.get_request()):
+            self.assertEqual(router.db_for_read(Assessment), 'replica')
+            self.assertEqual(router.db_for_write(Assessment), 'default')
+        self.assertEqual(router.db_for_read(Assessment), 'default')
+
+    def test_unsafe_methods_are_not_routed(self):
+        with db_routing.replica_reads(self.get_request('post')):
+            self.assertEqual(router.db_for_read(Assessment), 'default')
+
+    def test_pinned_user_reads_primary(self):
+        db_routing.pin_user(self.user)
+        with db_routing.replica_reads(self.get_request()):
+            self.assertEqual(router.db_for_read(Assessment), 'default')
+
+    def test_lagging_or_unreachable_replica_falls_back(self):
+        for lag in (120.0, None):
+            self.lag.return_value = lag
+            with db_routing.replica_reads(self.get_request()):
+                self.assertEqual(router.db_for_read(Assessment), 'default')
+
+    def test_write_pins_user(self):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(username='replica_chw', password='x', role='CHW'))
+        response = client.post('/api/assessments/', make_record(1), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(db_routing.is_pinned(response.wsgi_request.user))
+        self.assertFalse(db_routing.is_pinned(self.user))
+
+    def test_replica_never_migrated(self):
+        self.assertFalse(router.allow_migrate('replica', 'assessments'))
+        self.assertTrue(router.allow_migrate('default', 'assessments'))
@@ -0,0 +1,88 @@
+"""
+SEARCH TESTS
+Tests ranked trigram search on assessments (in-memory fallback on SQLite)
+"""
+from django.contrib.auth import get_user_model
+from unittest import mock
+from django.test import TestCase
+from rest_framework.test import APIClient
+from accounts.models import Facility
+from assessments.models import Assessment
+from assessments.testing import make_record
+from gelmath_api.search import similarity, trigrams
+
+User = get_user_model()
+
+
+class TrigramTests(TestCase):
+
+    def test_trigrams_match_pg_trgm(self):
+        # SELECT show_trgm('Cat') -> {"  c"," ca","at ",cat}
+        self.assertEqual(trigrams('Cat'), {'  c', ' ca', 'cat', 'at '})
+        self.assertEqual(trigrams('a-b'), {'  a', ' a ', '  b', ' b '})
+        self.assertEqual(similarity('JON-00412', 'jon-00412'), 1.0)
+        self.assertEqual(similarity('', 'x'), 0.0)
+
+
+class AssessmentSearchTests(TestCase):
+
+    def setUp(self):
+        self.facility = Facility.objects.create(name='Bor OTP', facility_type='OTP', state='Jonglei')
+        self.chw = User.objects.create_user(username='search_chw', password='test123', role='CHW', facility=self.facility)
+        self.other_chw = User.objects.create_user(username='search_chw2', password='test123', role='CHW')
+        self.admin = User.objects.create_user(username='search_admin', password='test123', role='MOH_ADMIN')
+        for child_id, chw_name, chw in [
+            ('JON-00412', 'Achol Deng', self.chw),
+            ('JON-00413', 'Achol Deng', self.chw),
+            ('JON-10412', 'Achol Deng', self.chw),
+            ('UNI-77001', 'Nyandeng Kuol', self.other_chw),
+        ]:
+            Assessment.objects.create(**make_record(0, child_id=child_id), chw=chw, chw_name=chw_name)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def search(self, term, **params):
+        response = self.client.get('/api/assessments/', {'search': term, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['child_id'] for row in response.data['results']]
+
+    def test_mistyped_child_id_ranks_exact_child_first(self):
+        results = self.search('JON-0412')
+        self.assertEqual(results[0], 'JON-00412')
+        self.assertNotIn('UNI-77001', results)
+
+    def test_exact_id_is_not_diluted_by_similar_ids(self):
+        self.assertEqual(self.search('jon-00412'), ['JON-00412'])
+
+    def test_prefix_matches_rank_above_substring_matches(self):
+        results = self.search('0412')
+        self.assertEqual(set(results), {'JON-00412', 'JON-10412'})
+        Assessment.objects.create(**make_record(0, child_id='0412-XYZ'), chw=self.chw)
+        self.assertEqual(self.search('0412')[0], '0412-XYZ')
+
+    def test_chw_name_search(self):
+        self.assertEqual(self.search('nyandeng'), ['UNI-77001'])
+        self.assertEqual(self.search('zzzz'), [])
+
+    def test_results_stay_role_scoped(self):
+        self.client.force_authenticate(user=self.other_chw)
+        self.assertEqual(self.search('JON-00412'), [])
+
+    def test_scope_applies_before_the_result_cap(self):
+        """Hits outside the user's scope don't use up the fallback's result limit"""
+        # Another CHW's children that outrank every match in scope
+        for _ in range(3):
+            Assessment.objects.create(**make_record(0, child_id='JON-0041'), chw=self.other_chw)
+        self.client.force_authenticate(user=self.chw)
+        with mock.patch('gelmath_api.search.MAX_FALLBACK_RESULTS', 2):
+            self.assertCountEqual(self.search('JON-0041'), ['JON-00412', 'JON-00413'])
+
+    def test_new_assessments_are_searchable(self):
+        self.search('JON')  # builds the in-memory index
+        Assessment.objects.create(**make_record(0, child_id='JON-55555'), chw=self.chw)
+        self.assertEqual(self.search('JON-55555')[0], 'JON-55555')
+
+    def test_explicit_ordering_overrides_rank(self):
+        Assessment.objects.filter(child_id='JON-10412').update(age_months=6)
+        results = self.search('0412', ordering='age_months')
+        self.assertEqual(results[0], 'JON-10412')
@@ -0,0 +1,109 @@
+"""
+SPARSE FIELDSET TESTS
+Tests ?fields= / ?omit= / ?view=summary on list endpoints and the matching .only() querysets
+"""
+import json
+from itertools import combinations, islice
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from accounts.models import Facility
+from assessments.models import Assessment, Referral, TreatmentRecord
+from assessments.serializers import AssessmentSerializer
+from assessments.testing import make_record
+from gelmath_api.query_optimization import RELATIONS_CACHE_SIZE, relations_for
+
+User = get_user_model()
+
+
+class SparseFieldsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.facility = Facility.objects.create(name='Bor OTP', facility_type='OTP', state='Jonglei')
+        cls.admin = User.objects.create_user(username='sparse_admin', password='test123', role='MOH_ADMIN')
+        cls.chw = User.objects.create_user(username='sparse_chw', password='test123', role='CHW', facility=cls.facility)
+        cls.doctor = User.objects.create_user(username='sparse_doc', password='test123', role='DOCTOR',
+                                              facility=cls.facility, first_name='Ayen', last_name='Garang')
+        for i in range(20):
+            assessment = Assessment.objects.create(
+                **make_record(i, chw_notes='Follow up at home ' * 40, chw_signature='x' * 200),
+                chw=cls.chw, facility=cls.facility, assigned_doctor=cls.doctor,
+            )
+            Referral.objects.create(assessment=assessment, referred_by=cls.chw, referred_to=cls.doctor,
+                                    referral_notes='Severe wasting ' * 20)
+            TreatmentRecord.objects.create(assessment=assessment, doctor=cls.doctor, status='ADMITTED')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in queries]
+
+    def test_fields_selects_fields_and_columns(self):
+        response, queries = self.get('/api/assessments/?fields=child_id,facility_name&with_count=false')
+        self.assertEqual(set(response.data['results'][0]), {'child_id', 'facility_name'})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('chw_notes', queries[0])
+        self.assertNotIn('"users"', queries[0])
+
+    def test_omit(self):
+        response, queries = self.get('/api/assessments/?omit=chw_notes,chw_signature&with_count=false')
+        row = response.data['results'][0]
+        self.assertNotIn('chw_notes', row)
+        self.assertIn('doctor_name', row)
+        self.assertEqual(row['doctor_name'], 'Ayen Garang')
+        self.assertNotIn('chw_signature', queries[0])
+
+    def test_summary_views(self):
+        for url, expected in [
+            ('/api/assessments/', {'id', 'child_id', 'clinical_status', 'facility_name', 'timestamp'}),
+            ('/api/referrals/', {'id', 'child_id', 'status', 'referred_to_name'}),
+            ('/api/treatments/', {'id', 'child_id', 'status', 'doctor_name'}),
+            ('/api/users/', {'id', 'username', 'role', 'facility_name'}),
+        ]:
+            with self.subTest(url=url):
+                response, queries = self.get(f'{url}?view=summary')
+                row = response.data['results'][0]
+                self.assertTrue(expected <= set(row))
+                self.assertNotIn('assessment_details', row)
+                self.assertNotIn('notes', queries[-1])
+
+    def test_referral_summary_is_several_times_smaller(self):
+        full, _ = self.get('/api/referrals/')
+        summary, _ = self.get('/api/referrals/?view=summary')
+        self.assertEqual(summary.data['results'][0]['referred_to_name'], 'Dr. Ayen Garang')
+        self.assertLess(len(json.dumps(summary.data)) * 5, len(json.dumps(full.data)))
+
+    def test_nested_serializer_keeps_its_fields(self):
+        response, queries = self.get('/api/referrals/?fields=child_id,assessment_details&with_count=false')
+        details = response.data['results'][0]['assessment_details']
+        self.assertIn('chw_notes', details)
+        self.assertEqual(details['facility_name'], 'Bor OTP')
+        self.assertEqual(len(queries), 1)
+
+    def test_relations_cache_is_bounded(self):
+        """Client-chosen field sets can't grow the per-process relations cache without limit"""
+        names = sorted(AssessmentSerializer().fields)
+        for subset in islice(combinations(names, 3), RELATIONS_CACHE_SIZE + 50):
+            relations_for(AssessmentSerializer, Assessment, subset)
+        self.assertEqual(relations_for.cache_info().currsize, RELATIONS_CACHE_SIZE)
+        self.assertEqual(relations_for(AssessmentSerializer, Assessment, ('facility_name', 'id')),
+                         (('facility',), ()))
+
+    def test_keyset_cursor_works_with_only(self):
+        response, _ = self.get('/api/assessments/?view=summary&page_size=5&with_count=false')
+        next_page, queries = self.get(response.data['next'])
+        self.assertEqual(len(next_page.data['results']), 5)
+        self.assertEqual(len(queries), 1)
+
+    def test_writes_ignore_fields(self):
+        response = self.client.post('/api/assessments/?fields=child_id', make_record(99), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('muac_mm', response.data)
@@ -0,0 +1,29 @@
+"""
+STARTUP IMPORT TESTS
+Tests that loading the URLconf doesn't import the ML stack (see benchmark_startup.py)
+"""
+import os
+from django.test import SimpleTestCase
+from benchmark_startup import SCENARIOS, parse_importtime, profile, summarize
+
+
+class StartupImportTests(SimpleTestCase):
+
+    def test_parse_importtime(self):
+        rows = parse_importtime(
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |     numpy.core\n'
+            'import time:       300 |        420 |   numpy\n'
+            'import time:        50 |        470 | assessments.forecast_views\n'
+        )
+        self.assertEqual(rows[-1], ('assessments.forecast_views', 50, 470, 0))
+        self.assertEqual(rows[0][3], 2)
+        summary = summarize(rows)
+        self.assertEqual(summary['total_ms'], 0.47)
+        self.assertEqual(summary['heavy'], ['numpy'])
+
+    def test_worker_startup_skips_ml_stack(self):
+        code, _ = SCENARIOS['worker']
+        rows = profile(code, os.environ['DJANGO_SETTINGS_MODULE'])
+        self.assertIn('assessments.views', [module for module, *_ in rows])
+        self.assertEqual(summarize(rows)['heavy'], [])
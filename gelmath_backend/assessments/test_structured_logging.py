@@ -0,0 +1,103 @@
+"""
+STRUCTURED LOGGING TESTS
+Tests JSON log lines, request-id correlation, sampling, the queue handler and the print-free forecast path
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from gelmath_api.structured_logging import JSONFormatter, SamplingFilter, _request_id, queue_handler
+from assessments.testing import make_record
+
+User = get_user_model()
+
+
+def record(name='gelmath.test', level=logging.INFO, msg='hello %s', args=('world',), **extra):
+    log_record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    log_record.__dict__.update(extra)
+    return log_record
+
+
+class StructuredLoggingTests(SimpleTestCase):
+
+    def test_json_line_with_extras(self):
+        entry = json.loads(JSONFormatter().format(record(request_id='abc', child_id='SS-1', months=['2026-01'])))
+        self.assertEqual(entry['message'], 'hello world')
+        self.assertEqual((entry['level'], entry['logger'], entry['request_id']), ('INFO', 'gelmath.test', 'abc'))
+        self.assertEqual((entry['child_id'], entry['months']), ('SS-1', ['2026-01']))
+        self.assertTrue(entry['ts'].endswith('Z'))
+
+    def test_sampling(self):
+        sampling = SamplingFilter()
+        with override_settings(LOG_SAMPLE_RATES={'gelmath': 1.0, 'gelmath.forecast': 0.0}):
+            self.assertFalse(sampling.filter(record('gelmath.forecast.detail')))
+            self.assertTrue(sampling.filter(record('gelmath.forecast', level=logging.ERROR)))
+            kept = record('gelmath.assessments')
+            self.assertTrue(sampling.filter(kept))
+            self.assertEqual(kept.sample_rate, 1.0)
+            self.assertTrue(sampling.filter(record('django.request')))
+
+    def test_queue_handler_writes_json_lines_off_thread(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'app.log')
+        handler = queue_handler(filename=path)
+        logger = logging.getLogger('gelmath.test_queue')
+        logger.addHandler(handler)
+        logger.propagate = False
+        self.addCleanup(logger.removeHandler, handler)
+        self.addCleanup(setattr, logger, 'propagate', True)
+
+        token = _request_id.set('req-42')
+        try:
+            logger.warning('Batch %s failed', 7, extra={'records': 3})
+            try:
+                raise ValueError('bad muac')
+            except ValueError:
+                logger.error('Prediction failed', exc_info=True)
+        finally:
+            _request_id.reset(token)
+        handler.listener.stop()
+
+        with open(path) as f:
+            first, second = [json.loads(line) for line in f]
+        self.assertEqual((first['message'], first['records'], first['request_id']), ('Batch 7 failed', 3, 'req-42'))
+        self.assertIn('ValueError: bad muac', second['exception'])
+
+
+class RequestLoggingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.chw = User.objects.create_user(username='log_chw', password='test123', role='CHW')
+        self.client.force_authenticate(user=self.chw)
+
+    def test_request_id_echoed_or_generated(self):
+        response = self.client.get('/api/analytics/national-summary/', HTTP_X_REQUEST_ID='mobile-123')
+        self.assertEqual(response['X-Request-ID'], 'mobile-123')
+        response = self.client.get('/api/analytics/national-summary/', HTTP_X_REQUEST_ID='bad id\r\n')
+        self.assertRegex(response['X-Request-ID'], r'^[0-9a-f]{32}$')
+
+    def test_forecast_runs_only_the_monthly_query(self):
+        with self.assertNumQueries(1), mock.patch('builtins.print') as stdout_print:
+            response = self.client.get('/api/analytics/forecast/')
+        self.assertEqual(response.status_code, 200)
+        stdout_print.assert_not_called()
+
+    def test_ml_failure_logged_with_request_id(self):
+        broken_model = mock.Mock(**{'predict.side_effect': RuntimeError('model exploded')})
+        payload = make_record(1, clinical_status='', recommended_pathway='')
+        with mock.patch('assessments.ml_models.get', return_value=broken_model), \
+                self.assertLogs('gelmath.assessments', 'WARNING') as logs:
+            response = self.client.post('/api/assessments/', payload, format='json', HTTP_X_REQUEST_ID='sync-9')
+        self.assertEqual(response.status_code, 201)
+        [entry] = logs.records
+        self.assertEqual((entry.getMessage(), entry.child_id), ('ML prediction failed', payload['child_id']))
+        self.assertEqual(entry.exc_info[0], RuntimeError)
@@ -0,0 +1,125 @@
+"""
+SYNC INGESTION TESTS
+Tests the 202 Accepted staging endpoint, the DB-backed worker and job status
+"""
+from unittest import mock
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from assessments.models import Assessment, SyncBatch
+from assessments.ingestion import process_sync_batch, stage_sync_batch
+from assessments.serializers import AssessmentCreateSerializer
+from assessments.testing import make_record
+
+User = get_user_model()
+
+
+class SyncIngestionTests(TestCase):
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.chw = User.objects.create_user(username='sync_chw', password='test123', role='CHW')
+        self.client.force_authenticate(user=self.chw)
+    
+    def test_sync_returns_202_without_inserting(self):
+        """Upload is staged, not processed, on the request path"""
+        response = self.client.post('/api/assessments/sync/', [make_record(i) for i in range(20)], format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'QUEUED')
+        self.assertEqual(response.data['total_records'], 20)
+        self.assertEqual(Assessment.objects.count(), 0)
+    
+    def test_worker_processes_batch_and_reports_progress(self):
+        """Worker command ingests records and status endpoint reports counts"""
+        records = [make_record(i) for i in range(5)] + [make_record(99, sex='X')]
+        response = self.client.post('/api/assessments/sync/', {'records': records}, format='json')
+        job_id = response.data['id']
+        
+        call_command('process_sync_batches', once=True, stdout=open('/dev/null', 'w'))
+        
+        self.assertEqual(Assessment.objects.filter(chw=self.chw).count(), 5)
+        status_response = self.client.get(f'/api/sync-jobs/{job_id}/')
+        self.assertEqual(status_response.data['status'], 'COMPLETED')
+        self.assertEqual(status_response.data['processed_records'], 6)
+        self.assertEqual(status_response.data['failed_records'], 1)
+        self.assertEqual(status_response.data['errors'][0]['index'], 5)
+    
+    def test_client_batch_id_is_idempotent(self):
+        """Retrying the same client batch does not stage it twice"""
+        payload = {'client_batch_id': 'device-1-0001', 'records': [make_record(1)]}
+        first = self.client.post('/api/assessments/sync/', payload, format='json')
+        second = self.client.post('/api/assessments/sync/', payload, format='json')
+        
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(SyncBatch.objects.count(), 1)
+    
+    def test_invalid_envelope_rejected(self):
+        """Empty or non-list payloads are rejected synchronously"""
+        response = self.client.post('/api/assessments/sync/', {'records': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        response = self.client.post('/api/assessments/sync/', {'records': 'nope'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_other_users_cannot_see_job(self):
+        """Job status is scoped to the submitting user"""
+        batch = SyncBatch.objects.create(submitted_by=self.chw, payload=[make_record(1)], total_records=1)
+        other = User.objects.create_user(username='other_chw', password='test123', role='CHW')
+        self.client.force_authenticate(user=other)
+        
+        response = self.client.get(f'/api/sync-jobs/{batch.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_process_is_noop_for_completed_batch(self):
+        """A batch is only ingested once"""
+        batch = SyncBatch.objects.create(submitted_by=self.chw, payload=[make_record(1)], total_records=1)
+        process_sync_batch(batch.id)
+        process_sync_batch(batch.id)
+        self.assertEqual(Assessment.objects.count(), 1)
+    
+    def test_concurrent_retry_returns_staged_batch(self):
+        """A retry that misses the lookup hits the unique constraint and gets the staged batch"""
+        first, created = stage_sync_batch(self.chw, [make_record(1)], client_batch_id='device-1-0002')
+        self.assertTrue(created)
+        with mock.patch('assessments.ingestion.SyncBatch.objects.filter') as lookup:
+            lookup.return_value.first.return_value = None
+            second, created = stage_sync_batch(self.chw, [make_record(1)], client_batch_id='device-1-0002')
+        self.assertFalse(created)
+        self.assertEqual(second.id, first.id)
+        self.assertEqual(SyncBatch.objects.count(), 1)
+    
+    def test_unique_client_batch_constraint(self):
+        """Blank client batch ids may repeat; real ones may not"""
+        SyncBatch.objects.create(submitted_by=self.chw, payload=[], client_batch_id='')
+        SyncBatch.objects.create(submitted_by=self.chw, payload=[], client_batch_id='')
+        SyncBatch.objects.create(submitted_by=self.chw, payload=[], client_batch_id='device-1-0003')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            SyncBatch.objects.create(submitted_by=self.chw, payload=[], client_batch_id='device-1-0003')
+    
+    def test_failing_record_does_not_fail_batch(self):
+        """A record whose insert raises is reported on its own; the others are kept"""
+        save = AssessmentCreateSerializer.save
+        
+        def save_or_fail(serializer, **kwargs):
+            if serializer.validated_data['child_id'] == 'SYNC_0001':
+                raise ValueError('disk full')
+            return save(serializer, **kwargs)
+        
+        batch = SyncBatch.objects.create(submitted_by=self.chw, payload=[make_record(i) for i in range(3)],
+                                         total_records=3)
+        with mock.patch.object(AssessmentCreateSerializer, 'save', save_or_fail), \
+                self.assertLogs('gelmath.ingestion', 'ERROR'):
+            batch = process_sync_batch(batch.id)
+        
+        self.assertEqual(batch.status, 'COMPLETED')
+        self.assertEqual((batch.created_records, batch.failed_records), (2, 1))
+        self.assertEqual(batch.errors, [{'index': 1, 'child_id': 'SYNC_0001', 'errors': 'disk full'}])
+        self.assertEqual(
+            sorted(Assessment.objects.values_list('child_id', flat=True)), ['SYNC_0000', 'SYNC_0002']
+        )
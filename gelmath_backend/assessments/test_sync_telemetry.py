@@ -0,0 +1,101 @@
+"""
+SYNC TELEMETRY TESTS
+Per-request sync metrics and the admin percentile report
+"""
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from accounts.models import Facility
+from assessments.models import SyncTelemetry
+from assessments.telemetry import histogram_percentile
+from assessments.testing import make_record
+
+User = get_user_model()
+
+
+class SyncTelemetryTests(TestCase):
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.facility = Facility.objects.create(name='Juba PHCC', state='Central Equatoria', facility_type='OTP')
+        self.chw = User.objects.create_user(username='tel_chw', password='test123', role='CHW',
+                                            state='Central Equatoria', facility=self.facility)
+        self.client.force_authenticate(user=self.chw)
+    
+    def test_batch_sync_is_recorded_and_completed_by_worker(self):
+        """Request metrics at upload time, validation failures after ingestion"""
+        records = [make_record(1), make_record(2, sex='X')]
+        self.client.post('/api/assessments/sync/', records, format='json',
+                         HTTP_X_DEVICE_ID='dev-1', HTTP_X_APP_VERSION='2.3.0')
+        
+        row = SyncTelemetry.objects.get()
+        self.assertEqual(row.endpoint, 'sync')
+        self.assertEqual(row.records, 2)
+        self.assertEqual(row.status_code, 202)
+        self.assertEqual((row.device_id, row.app_version, row.facility), ('dev-1', '2.3.0', self.facility))
+        self.assertGreater(row.bytes_in, 0)
+        self.assertGreater(row.bytes_out, 0)
+        self.assertGreater(row.db_queries, 0)
+        
+        call_command('process_sync_batches', once=True, stdout=open('/dev/null', 'w'))
+        row.refresh_from_db()
+        self.assertEqual(row.validation_failures, 1)
+        self.assertIsNotNone(row.worker_ms)
+    
+    def test_single_create_failure_is_recorded(self):
+        """A rejected single upload counts as a validation failure"""
+        self.client.post('/api/assessments/', {'child_id': 'X'}, format='json')
+        
+        row = SyncTelemetry.objects.get()
+        self.assertEqual((row.endpoint, row.status_code, row.validation_failures), ('create', 400, 1))
+    
+    def test_reads_are_not_recorded(self):
+        self.client.get('/api/assessments/')
+        self.assertEqual(SyncTelemetry.objects.count(), 0)
+    
+    def test_admin_report_groups_by_app_version(self):
+        """Percentiles per group plus failing devices"""
+        for version in ('2.3.0', '2.3.0', '2.2.1'):
+            self.client.post('/api/assessments/sync/', [make_record(1)], format='json',
+                             HTTP_X_DEVICE_ID='dev-1', HTTP_X_APP_VERSION=version)
+        
+        self.assertEqual(self.client.get('/api/ops/sync-telemetry/').status_code, status.HTTP_403_FORBIDDEN)
+        admin = User.objects.create_user(username='tel_admin', password='test123', role='MOH_ADMIN')
+        self.client.force_authenticate(user=admin)
+        
+        response = self.client.get('/api/ops/sync-telemetry/?group_by=app_version')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['groups']['2.3.0']['requests'], 2)
+        self.assertIn('p99', response.data['overall']['duration_ms'])
+        self.assertEqual(response.data['problem_devices'][0]['device_id'], 'dev-1')
+    
+    def test_report_percentiles_from_sql_histogram(self):
+        """Percentiles are the histogram bound holding the rank, capped at the maximum"""
+        admin = User.objects.create_user(username='tel_admin', password='test123', role='MOH_ADMIN')
+        bucket = timezone.now().replace(minute=0, second=0, microsecond=0)
+        SyncTelemetry.objects.bulk_create(
+            SyncTelemetry(bucket=bucket, endpoint='sync', status_code=500 if ms == 300 else 202,
+                          duration_ms=ms, bytes_in=800, device_id=f'dev-{ms}')
+            for ms in [15] * 50 + [150] * 40 + [300] * 9 + [7000]
+        )
+        self.client.force_authenticate(user=admin)
+        
+        with self.assertNumQueries(3):  # groups, overall, problem devices: no raw rows
+            report = self.client.get('/api/ops/sync-telemetry/').data
+        self.assertEqual(report['overall']['duration_ms'], {'p50': 20, 'p90': 200, 'p99': 500})
+        self.assertEqual(report['overall']['bytes_in'], {'p50': 800, 'p90': 800, 'p99': 800})
+        self.assertEqual(report['overall']['errors'], 9)
+        self.assertEqual(report['problem_devices'][0]['device_id'], 'dev-300')
+    
+    def test_histogram_percentile(self):
+        cumulative = [(10, 50), (100, 90), (1000, 99)]
+        self.assertEqual(histogram_percentile(cumulative, 100, 50, 5000), 10)
+        self.assertEqual(histogram_percentile(cumulative, 100, 90, 5000), 100)
+        self.assertEqual(histogram_percentile(cumulative, 100, 100, 5000), 5000)
+        self.assertEqual(histogram_percentile([(10, 1)], 1, 99, 4), 4)
+        self.assertIsNone(histogram_percentile(cumulative, 0, 50, None))
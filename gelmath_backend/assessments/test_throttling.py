@@ -0,0 +1,146 @@
+"""
+THROTTLING TESTS
+Token buckets per user (and narrower per device), global sync admission and Retry-After
+"""
+import threading
+from types import SimpleNamespace
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from assessments.testing import make_record
+from gelmath_api.throttling import TokenBucketThrottle
+
+User = get_user_model()
+
+SMALL_BUCKETS = {
+    'sync': {'capacity': 2, 'refill_rate': 0.1, 'global_capacity': 3, 'global_refill_rate': 0.1},
+    'device': {'capacity': 3, 'refill_rate': 0.1, 'device_capacity': 1, 'device_refill_rate': 0.1},
+    'predict': {'capacity': 1, 'refill_rate': 0.5},
+    'dashboard': {'capacity': 5, 'refill_rate': 1},
+}
+
+
+@override_settings(TOKEN_BUCKETS=SMALL_BUCKETS)
+class TokenBucketThrottleTests(TestCase):
+    
+    def setUp(self):
+        cache.clear()
+        # Mid-window, so no test straddles a refill
+        clock = mock.patch('gelmath_api.throttling.time.time', return_value=1_000_005.0)
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.client = APIClient()
+        self.chw = User.objects.create_user(username='tb_chw', password='test123', role='CHW')
+        self.client.force_authenticate(user=self.chw)
+    
+    def tearDown(self):
+        cache.clear()
+    
+    def sync(self, device):
+        return self.client.post('/api/assessments/sync/', [make_record(1)], format='json',
+                                HTTP_X_DEVICE_ID=device)
+    
+    def create(self, device):
+        return self.client.post('/api/assessments/', make_record(2), format='json', HTTP_X_DEVICE_ID=device)
+    
+    def test_sync_bucket_exhausts_with_retry_after(self):
+        """Third sync from one device within the window gets 429 + Retry-After"""
+        self.assertEqual(self.sync('dev-a').status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.sync('dev-a').status_code, status.HTTP_202_ACCEPTED)
+        
+        response = self.sync('dev-a')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+    
+    def test_single_record_create_is_throttled(self):
+        """POST /api/assessments/ draws from the same sync buckets as batch uploads"""
+        self.sync('dev-a')
+        self.assertEqual(self.create('dev-a').status_code, status.HTTP_201_CREATED)
+        
+        response = self.create('dev-a')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(int(response['Retry-After']), 15)
+        self.assertEqual(self.sync('dev-a').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+    
+    def test_changing_device_id_does_not_reset_user_bucket(self):
+        """The user's bucket is shared by all of their devices"""
+        self.sync('dev-a')
+        self.sync('dev-b')
+        self.assertEqual(self.sync('dev-c').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.sync('').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+    
+    def test_users_share_global_bucket(self):
+        """Another user has their own bucket until the global sync bucket runs dry"""
+        self.sync('dev-a')
+        self.sync('dev-a')
+        self.client.force_authenticate(user=User.objects.create_user(username='tb_chw2', password='x', role='CHW'))
+        self.assertEqual(self.sync('dev-b').status_code, status.HTTP_202_ACCEPTED)
+        # Global capacity (3) is now spent
+        self.assertEqual(self.sync('dev-c').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+    
+    def test_bucket_refills_after_window(self):
+        """A full refill at the start of the next window, announced in Retry-After"""
+        self.sync('dev-a')
+        self.sync('dev-a')
+        response = self.sync('dev-a')
+        # capacity 2 / refill_rate 0.1 -> 20 s windows; the clock is 5 s into one
+        self.assertEqual(int(response['Retry-After']), 15)
+        with mock.patch('gelmath_api.throttling.time.time', return_value=1_000_020.0):
+            self.assertEqual(self.sync('dev-a').status_code, status.HTTP_202_ACCEPTED)
+    
+    def test_device_bucket_only_narrows(self):
+        """device_capacity caps each device below the user's own limit"""
+        throttle = DeviceThrottle()
+        self.assertTrue(throttle.allow_request(self.request(device='dev-a'), None))
+        self.assertFalse(throttle.allow_request(self.request(device='dev-a'), None))
+        self.assertTrue(throttle.allow_request(self.request(device='dev-b'), None))
+        self.assertTrue(throttle.allow_request(self.request(device='dev-c'), None))
+        # User capacity (3) is spent whatever the device
+        self.assertFalse(throttle.allow_request(self.request(device='dev-d'), None))
+    
+    def test_concurrent_requests_cannot_overspend(self):
+        """Tokens are taken atomically: racing requests admit exactly `capacity`"""
+        throttle = DeviceThrottle()
+        results = []
+        barrier = threading.Barrier(12)
+        
+        def attempt():
+            barrier.wait()
+            results.append(throttle.allow_request(self.request(), None))
+        
+        threads = [threading.Thread(target=attempt) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 3)
+    
+    def request(self, device=''):
+        return SimpleNamespace(user=self.chw, META={'HTTP_X_DEVICE_ID': device, 'REMOTE_ADDR': '10.0.0.1'})
+    
+    def test_dashboard_unaffected_by_sync_burst(self):
+        """Dashboard reads use their own bucket"""
+        for device in ('dev-a', 'dev-a', 'dev-a'):
+            self.sync(device)
+        response = self.client.get('/api/analytics/national-summary/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_stats_exported_for_admin(self):
+        """Allowed/throttled counters per bucket"""
+        self.sync('dev-a')
+        self.sync('dev-a')
+        self.sync('dev-a')
+        
+        self.assertEqual(self.client.get('/api/ops/throttle-stats/').status_code, status.HTTP_403_FORBIDDEN)
+        admin = User.objects.create_user(username='tb_admin', password='test123', role='MOH_ADMIN')
+        self.client.force_authenticate(user=admin)
+        stats = self.client.get('/api/ops/throttle-stats/').data
+        self.assertEqual(stats['sync']['allowed'], 2)
+        self.assertEqual(stats['sync']['throttled'], 1)
+
+
+class DeviceThrottle(TokenBucketThrottle):
+    scope = 'device'
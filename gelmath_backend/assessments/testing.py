@@ -0,0 +1,29 @@
+"""
+Shared test fixtures for the assessments API.
+"""
+
+
+def make_record(i, **overrides):
+    """A valid mobile assessment payload; `i` makes the child_id unique."""
+    record = {
+        'child_id': f'SYNC_{i:04d}',
+        'sex': 'M' if i % 2 == 0 else 'F',
+        'age_months': 24,
+        'muac_mm': 110,
+        'edema': 0,
+        'appetite': 'good',
+        'danger_signs': 0,
+        'clinical_status': 'SAM',
+        'recommended_pathway': 'OTP',
+    }
+    record.update(overrides)
+    return record
+
+
+def full_record(i):
+    """make_record with every optional mobile field filled in, as a real device sends it."""
+    return make_record(
+        i, muac_z_score=-2.81, confidence=91.4, state='Central Equatoria', county='Juba',
+        chw_name='James Deng', chw_phone='+211900000000', chw_notes='Follow up in 2 weeks',
+        chw_signature='James Deng 2026-02-14T09:12:00Z',
+    )
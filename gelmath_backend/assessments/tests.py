@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
@@ -54,6 +55,7 @@ class AssessmentAPITests(TestCase):
     """Integration tests for Assessment API endpoints"""
     
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(
             username='test_chw',
@@ -155,6 +157,7 @@ class SmokeTests(TestCase):
     """Smoke tests - Critical functionality checks"""
     
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(
             username='smoke_test',
@@ -1,39 +1,59 @@
-from rest_framework import viewsets, permissions, filters
-from rest_framework.decorators import action, api_view, permission_classes
+import logging
+from rest_framework import viewsets, permissions, filters, status
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Assessment, TreatmentRecord, Referral
+from .models import Assessment, TreatmentRecord, Referral, SyncBatch
 from .serializers import (AssessmentSerializer, AssessmentCreateSerializer, 
-                          TreatmentRecordSerializer, ReferralSerializer, DoctorProfileSerializer)
-from accounts.models import User
-import joblib
-import pandas as pd
-import numpy as np
-import os
+                          TreatmentRecordSerializer, ReferralSerializer,
+                          SyncBatchSerializer, SyncEnvelopeSerializer)
+from .ingestion import stage_sync_batch
+from .archive import case_history, scoped_archived_cases
+from .doctor_directory import directory_response
+from .telemetry import annotate as annotate_telemetry
+from . import ml_models
+from .encodings import SYNC_PARSER_CLASSES, SYNC_RENDERER_CLASSES
+from gelmath_api.throttling import SyncRateThrottle, PredictRateThrottle
+from gelmath_api.query_optimization import SerializerRelationsMixin
+from gelmath_api.pagination import KeysetPagination
+from gelmath_api.search import TrigramSearchFilter
 
+logger = logging.getLogger('gelmath.assessments')
 
-class AssessmentViewSet(viewsets.ModelViewSet):
+
+class AssessmentViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     queryset = Assessment.objects.all()
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # Search runs last so its rank order survives OrderingFilter's default ordering
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, TrigramSearchFilter]
     filterset_fields = ['state', 'facility', 'clinical_status', 'recommended_pathway', 'chw']
     search_fields = ['child_id', 'chw_name']
     ordering_fields = ['timestamp', 'age_months', 'muac_mm']
     ordering = ['-timestamp']
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-timestamp', '-id')
+    parser_classes = SYNC_PARSER_CLASSES
+    renderer_classes = SYNC_RENDERER_CLASSES
     
     def get_serializer_class(self):
         if self.action == 'create':
             return AssessmentCreateSerializer
         return AssessmentSerializer
     
+    def get_throttles(self):
+        # Single-record uploads are sync traffic too: they share the sync buckets
+        if self.action == 'create':
+            return [SyncRateThrottle()]
+        return super().get_throttles()
+    
     def get_queryset(self):
         user = self.request.user
-        queryset = Assessment.objects.all()
+        queryset = self.optimize_queryset(Assessment.objects.all())
         
         if user.role == 'MOH_ADMIN':
             return queryset
         elif user.role == 'DOCTOR':
-            return queryset.filter(facility=user.facility)
+            return queryset.filter(facility_id=user.facility_id)
         elif user.role == 'CHW':
             return queryset.filter(chw=user)
         
@@ -46,19 +66,74 @@ class AssessmentViewSet(viewsets.ModelViewSet):
         counts = Assessment.objects.values('chw__username').annotate(count=Count('id'))
         result = {item['chw__username']: item['count'] for item in counts if item['chw__username']}
         return Response(result)
+    
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """All assessments, referrals and treatments of one child, read through to archived cases"""
+        child_id = request.query_params.get('child_id')
+        if not child_id:
+            return Response({'error': 'child_id is required'}, status=400)
+        
+        history = case_history(child_id, self.get_queryset(), scoped_archived_cases(request.user))
+        if not history['assessments']:
+            return Response({'error': f'No assessments found for child {child_id}'}, status=404)
+        
+        return Response({
+            'child_id': child_id,
+            'archived': history['archived_case'] is not None,
+            'assessments': AssessmentSerializer(history['assessments'], many=True).data,
+            'referrals': ReferralSerializer(history['referrals'], many=True).data,
+            'treatment_records': TreatmentRecordSerializer(history['treatments'], many=True).data,
+        })
+    
+    @action(detail=False, methods=['post'], throttle_classes=[SyncRateThrottle])
+    def sync(self, request):
+        """Stage a batch of assessments for background ingestion and return 202 with a job id"""
+        envelope = SyncEnvelopeSerializer(data=request.data)
+        envelope.is_valid(raise_exception=True)
+        
+        batch, created = stage_sync_batch(
+            request.user,
+            envelope.validated_data['records'],
+            envelope.validated_data['client_batch_id'],
+        )
+        annotate_telemetry(request, records=batch.total_records, sync_batch=batch if created else None)
+        data = SyncBatchSerializer(batch).data
+        data['status_url'] = request.build_absolute_uri(f'/api/sync-jobs/{batch.id}/')
+        return Response(data, status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK)
 
 
-class TreatmentRecordViewSet(viewsets.ModelViewSet):
+class SyncBatchViewSet(viewsets.ReadOnlyModelViewSet):
+    """Progress of staged sync uploads"""
+    queryset = SyncBatch.objects.all()
+    serializer_class = SyncBatchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status']
+    
+    def get_queryset(self):
+        user = self.request.user
+        queryset = SyncBatch.objects.order_by('-created_at')
+        
+        if user.role == 'MOH_ADMIN':
+            return queryset
+        return queryset.filter(submitted_by=user)
+
+
+class TreatmentRecordViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     queryset = TreatmentRecord.objects.all()
     serializer_class = TreatmentRecordSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['assessment', 'doctor', 'status']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
+    parser_classes = SYNC_PARSER_CLASSES
+    renderer_classes = SYNC_RENDERER_CLASSES
     
     def get_queryset(self):
         user = self.request.user
-        queryset = TreatmentRecord.objects.all()
+        queryset = self.optimize_queryset(TreatmentRecord.objects.all())
         
         if user.role == 'MOH_ADMIN':
             return queryset
@@ -71,17 +146,21 @@ class TreatmentRecordViewSet(viewsets.ModelViewSet):
         serializer.save(doctor=self.request.user)
 
 
-class ReferralViewSet(viewsets.ModelViewSet):
+class ReferralViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     queryset = Referral.objects.all()
     serializer_class = ReferralSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['status', 'referred_to', 'assessment']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
+    parser_classes = SYNC_PARSER_CLASSES
+    renderer_classes = SYNC_RENDERER_CLASSES
+    select_related_extra = ('referred_to',)  # read in get_referred_to_name
     
     def get_queryset(self):
         user = self.request.user
-        queryset = Referral.objects.all()
+        queryset = self.optimize_queryset(Referral.objects.all())
         
         if user.role == 'MOH_ADMIN':
             return queryset
@@ -106,25 +185,13 @@ class ReferralViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def active_doctors(self, request):
-        doctors = User.objects.filter(role='DOCTOR', is_active=True)
-        return Response(DoctorProfileSerializer(doctors, many=True).data)
-
-
-_pathway_model = None
-# Load the pathway classification model once at module level (lazy load on first request)
-def _get_pathway_model():
-    global _pathway_model
-    if _pathway_model is None:
-        model_path = os.path.join(os.path.dirname(__file__), '../../Models/cmam_model.pkl')
-        try:
-            _pathway_model = joblib.load(model_path)
-        except Exception as e:
-            print(f"Pathway model load error: {e}")
-    return _pathway_model
+        # Cached; see doctor_directory for ?grouped= and ?ordering=proximity
+        return directory_response(request)
 
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@throttle_classes([PredictRateThrottle])
 def predict_pathway(request):
     """Model 1: Run Random Forest on server and return CMAM pathway recommendation."""
     data = request.data
@@ -138,7 +205,7 @@ def predict_pathway(request):
     if muac_mm is None or age_months is None or sex is None:
         return Response({'error': 'Missing required fields: muac_mm, age_months, sex'}, status=400)
 
-    model = _get_pathway_model()
+    model = ml_models.get('pathway_model')
     if model is None:
         return Response({'error': 'Model unavailable'}, status=503)
 
@@ -148,12 +215,15 @@ def predict_pathway(request):
     appetite_map = {'good': 0, 'poor': 1, 'failed': 1}  # 'failed' → treat as 'poor' (safe fallback)
     appetite_encoded = appetite_map.get(appetite, 0)
 
-    # Feature order from model.feature_names_in_: ['muac_mm','age_months','sex','edema','appetite','danger_signs']
-    X = pd.DataFrame([[int(muac_mm), int(age_months), sex_encoded, int(edema), appetite_encoded, int(danger_signs)]],
-                     columns=['muac_mm', 'age_months', 'sex', 'edema', 'appetite', 'danger_signs'])
+    # Columns are put in training order (ml_models.PATHWAY_FEATURES)
+    X = ml_models.pathway_features({
+        'muac_mm': int(muac_mm), 'age_months': int(age_months), 'sex': sex_encoded,
+        'edema': int(edema), 'appetite': appetite_encoded, 'danger_signs': int(danger_signs),
+    })
 
-    pathway = model.predict(X)[0]
-    proba = model.predict_proba(X)[0]
+    with ml_models.inference('pathway_model'):
+        pathway = model.predict(X)[0]
+        proba = model.predict_proba(X)[0]
     classes = list(model.classes_)
     confidence = float(max(proba))
 
@@ -191,12 +261,10 @@ def explain_prediction(request):
         if not actual_pathway:
             return Response({'error': 'No pathway recommendation provided'}, status=400)
         
-        # Load model only to get feature importance (not to re-predict)
-        model_path = os.path.join(os.path.dirname(__file__), '../../Models/cmam_model.pkl')
-        if not os.path.exists(model_path):
+        # Model only provides feature importance (not to re-predict)
+        model = ml_models.get('pathway_model')
+        if model is None:
             return Response({'error': 'Model file not found'}, status=404)
-            
-        model = joblib.load(model_path)
         
         # Prepare features for explanation
         features = {
@@ -388,7 +456,7 @@ def explain_prediction(request):
     except Exception as e:
         import traceback
         error_detail = traceback.format_exc()
-        print(f"Explainability error: {error_detail}")
+        logger.exception('Explainability failed')
         return Response({'error': str(e), 'detail': error_detail}, status=500)
 
 
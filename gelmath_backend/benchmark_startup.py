@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import time of a cold worker and of a management command.
+
+Runs each scenario in a fresh interpreter with `python -X importtime`, parses the
+per-module timings and reports the slowest top-level imports. Exits non-zero if
+a scenario goes over its budget or imports one of the heavy ML packages, which
+must only be loaded on first use (assessments.ml_models, forecast_views).
+
+    python benchmark_startup.py                  # gelmath_api.settings
+    python benchmark_startup.py --settings gelmath_api.settings_production --top 20
+
+Budgets are import time only (interpreter start and checks excluded); measure
+on a quiet machine and take the best of --runs.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+HEAVY_MODULES = ('pandas', 'numpy', 'joblib', 'sklearn', 'scipy', 'shap', 'openpyxl')
+
+SCENARIOS = {
+    # What a gunicorn/uvicorn worker imports before serving its first request
+    'worker': ('import django; django.setup(); import gelmath_api.urls', 600),
+    # What `manage.py migrate`, `test` and friends import: setup plus the system checks,
+    # which load the URLconf and through it every view module
+    'command': ('import django; django.setup(); from django.core.management import call_command; '
+                'call_command("check", verbosity=0)', 650),
+}
+
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$')
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from `-X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def profile(code, settings_module):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], env=env,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def summarize(rows):
+    top_level = [row for row in rows if row[3] == 0]
+    imported = {module.split('.')[0] for module, *_ in rows}
+    return {
+        'total_ms': sum(cumulative for _, _, cumulative, _ in top_level) / 1000,
+        'modules': len(rows),
+        'slowest': sorted(top_level, key=lambda row: -row[2]),
+        'heavy': sorted(imported.intersection(HEAVY_MODULES)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--settings', default=os.environ.get('DJANGO_SETTINGS_MODULE', 'gelmath_api.settings'))
+    parser.add_argument('--runs', type=int, default=3, help='Runs per scenario; the fastest is reported')
+    parser.add_argument('--top', type=int, default=10, help='Slowest top-level imports to list')
+    args = parser.parse_args()
+
+    failed = False
+    for name, (code, budget_ms) in SCENARIOS.items():
+        runs = [summarize(profile(code, args.settings)) for _ in range(args.runs)]
+        best = min(runs, key=lambda run: run['total_ms'])
+        over = best['total_ms'] > budget_ms
+        failed |= over or bool(best['heavy'])
+        print(f'{name}: {best["total_ms"]:.0f} ms import time, {best["modules"]} modules '
+              f'(budget {budget_ms} ms){"  OVER BUDGET" if over else ""}')
+        if best['heavy']:
+            print(f'  heavy modules imported at startup: {", ".join(best["heavy"])}')
+        for module, _, cumulative, _ in best['slowest'][:args.top]:
+            print(f'  {cumulative / 1000:8.1f} ms  {module}')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
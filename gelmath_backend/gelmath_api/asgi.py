@@ -3,6 +3,11 @@ ASGI config for gelmath_api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with uvicorn for the async dashboard reads under /api/async/
+(assessments/async_views.py):
+
+    uvicorn gelmath_api.asgi:application --workers 2 --port 8001
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
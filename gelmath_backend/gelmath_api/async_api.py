@@ -0,0 +1,109 @@
+"""
+Async read endpoints.
+
+DRF 3.14 views are synchronous, so each dashboard request holds a worker
+thread for the whole of its database waits. @async_api_view turns a plain
+`async def view(request, ...)` into a GET endpoint with the same contract as
+the DRF analytics views, for serving under ASGI (gelmath_api/asgi.py with
+uvicorn):
+
+- authentication with REST_FRAMEWORK's DEFAULT_AUTHENTICATION_CLASSES and
+  IsAuthenticated semantics (401/403 bodies as DRF renders them),
+- optional throttle classes (429 with Retry-After),
+- reads routed through db_routing.replica_reads,
+- dicts/lists returned by the view rendered with DRF's JSONRenderer; views may
+  also return an HttpResponse of their own.
+
+Authentication and throttling touch the cache (and, on a cold status cache, the
+database), so they run through sync_to_async. Views use the async ORM
+(aget, acount, aaggregate, async for) and asyncio.gather for independent
+reads.
+"""
+import functools
+import math
+from contextlib import nullcontext
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from .db_routing import replica_reads
+
+
+class AsyncViewError(Exception):
+    """Raised inside an async view to return {'error': message} with the given status."""
+
+    def __init__(self, message, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def render(data, status_code=status.HTTP_200_OK, headers=None):
+    response = HttpResponse(JSONRenderer().render(data), status=status_code, content_type='application/json')
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+def _authenticators():
+    return [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+
+
+def _prepare(request, throttle_classes):
+    """Authenticate and throttle as APIView.initial() does; raises APIException."""
+    request.auth = None
+    user = None
+    for authenticator in _authenticators():
+        result = authenticator.authenticate(request)
+        if result is not None:
+            user, request.auth = result
+            break
+    if user is None or not user.is_authenticated:
+        raise exceptions.NotAuthenticated()
+    request.user = user
+
+    waits = [throttle.wait() for throttle in (throttle_class() for throttle_class in throttle_classes)
+             if not throttle.allow_request(request, None)]
+    if waits:
+        raise exceptions.Throttled(max((wait for wait in waits if wait is not None), default=None))
+
+
+def _error_response(request, exc):
+    """The response DRF's exception handler would give for `exc`."""
+    headers = {}
+    status_code = exc.status_code
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        authenticators = _authenticators()
+        header = authenticators[0].authenticate_header(request) if authenticators else None
+        if header:
+            headers['WWW-Authenticate'] = header
+        else:
+            status_code = status.HTTP_403_FORBIDDEN
+    if getattr(exc, 'wait', None):
+        headers['Retry-After'] = str(math.ceil(exc.wait))
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return render(data, status_code, headers)
+
+
+def async_api_view(throttle_classes=(), replica=True):
+    """Decorator for `async def` GET views; see the module docstring."""
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return render({'detail': f'Method "{request.method}" not allowed.'},
+                              status.HTTP_405_METHOD_NOT_ALLOWED, {'Allow': 'GET'})
+            try:
+                await sync_to_async(_prepare)(request, throttle_classes)
+            except exceptions.APIException as exc:
+                return _error_response(request, exc)
+
+            with replica_reads(request) if replica else nullcontext():
+                try:
+                    result = await view(request, *args, **kwargs)
+                except AsyncViewError as exc:
+                    return render({'error': exc.message}, exc.status_code)
+            return result if isinstance(result, HttpResponse) else render(result)
+        return wrapper
+    return decorator
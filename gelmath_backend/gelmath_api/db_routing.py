@@ -0,0 +1,178 @@
+"""
+Read-replica routing for analytics, forecasts and exports.
+
+Views opt in with @read_from_replica (function views) or ReplicaReadsMixin
+(APIView); only their reads go to settings.REPLICA_DATABASE_ALIAS. All other
+reads and every write stay on the primary. Reads fall back to the primary
+when:
+
+- no replica is configured (DATABASES has no such alias),
+- the user wrote something in the last REPLICA_PIN_SECONDS (read-your-writes,
+  recorded by ReplicaPinningMiddleware),
+- replication lag exceeds REPLICA_MAX_LAG_SECONDS or the replica is unreachable.
+"""
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+PIN_PREFIX = 'replica-pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica_request = contextvars.ContextVar('replica_request', default=None)
+_lag = {'value': None, 'checked': 0.0}
+
+
+def replica_alias():
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', 'replica')
+    return alias if alias in connections.databases else None
+
+
+def replica_lag():
+    """Seconds the replica is behind the primary, cached for REPLICA_LAG_CHECK_SECONDS. None if unreachable."""
+    alias = replica_alias()
+    if alias is None:
+        return None
+    now = time.monotonic()
+    if now - _lag['checked'] < getattr(settings, 'REPLICA_LAG_CHECK_SECONDS', 5):
+        return _lag['value']
+
+    value = 0.0
+    try:
+        connection = connections[alias]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT CASE
+                        WHEN NOT pg_is_in_recovery() THEN 0
+                        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                    END
+                    """
+                )
+                value = float(cursor.fetchone()[0])
+    except DatabaseError:
+        value = None
+    _lag.update(value=value, checked=now)
+    return value
+
+
+def pin_user(user):
+    cache.set(f'{PIN_PREFIX}:{user.pk}', 1, getattr(settings, 'REPLICA_PIN_SECONDS', 30))
+
+
+def is_pinned(user):
+    return bool(user and user.is_authenticated and cache.get(f'{PIN_PREFIX}:{user.pk}'))
+
+
+def _replica_for(request):
+    """Replica alias if this request may read from it, else None. Decided once per request."""
+    if not hasattr(request, '_replica_db'):
+        alias = replica_alias()
+        if alias is not None and is_pinned(getattr(request, 'user', None)):
+            alias = None
+        if alias is not None:
+            lag = replica_lag()
+            if lag is None or lag > getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 30):
+                alias = None
+        request._replica_db = alias
+    return request._replica_db
+
+
+@contextmanager
+def replica_reads(request):
+    """Route ORM reads inside the block to the replica (subject to pinning and lag)."""
+    token = _replica_request.set(request if request.method in SAFE_METHODS else None)
+    try:
+        yield
+    finally:
+        _replica_request.reset(token)
+
+
+def read_from_replica(view):
+    """Decorator for function views; place it directly above the def, below @api_view and friends."""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with replica_reads(request):
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadsMixin:
+    """APIView mixin: handlers run with reads routed to the replica."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._replica_reads = replica_reads(request)
+        self._replica_reads.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        reads = getattr(self, '_replica_reads', None)
+        if reads is not None:
+            self._replica_reads = None
+            reads.__exit__(None, None, None)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        request = _replica_request.get()
+        if request is None:
+            return None
+        return _replica_for(request)
+
+    def db_for_write(self, model, **hints):
+        # Explicit so instances loaded from the replica are saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        alias = replica_alias()
+        databases = {DEFAULT_DB_ALIAS, alias} if alias else {DEFAULT_DB_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """Pin users to the primary for a short window after a successful write."""
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self._wrote(request, response):
+            self._pin(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self._wrote(request, response):
+            # request.user may still be a lazy session lookup, and pinning writes the cache
+            await sync_to_async(self._pin)(request)
+        return response
+
+    def _wrote(self, request, response):
+        return request.method not in SAFE_METHODS and response.status_code < 400
+
+    def _pin(self, request):
+        # DRF copies the authenticated (JWT) user onto the Django request
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated and replica_alias():
+            pin_user(user)
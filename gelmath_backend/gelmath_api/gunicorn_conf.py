@@ -0,0 +1,60 @@
+"""
+Gunicorn config for the WSGI deployment.
+
+    gunicorn -c gelmath_api/gunicorn_conf.py
+
+The app is imported and the ML artifacts loaded once in the master
+(preload_app + when_ready), then workers are forked and share those pages
+copy-on-write instead of each loading its own copy of the models on its first
+prediction. gc.freeze() moves everything loaded so far out of the garbage
+collector's generations, so collections in the workers don't touch (and copy)
+the shared objects. Workers recycled by max_requests are forked from the same
+warm master, so they are ready immediately.
+
+Prometheus metrics (gelmath_api.metrics) are kept in PROMETHEUS_MULTIPROC_DIR,
+which has to be set before prometheus_client is imported (the preloaded app
+imports it before any server hook runs), so it is set up and emptied when this
+file is loaded. Dead workers' live gauges are dropped as they exit.
+"""
+import gc
+import glob
+import os
+import tempfile
+
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'gelmath-metrics'))
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+for _path in glob.glob(os.path.join(os.environ['PROMETHEUS_MULTIPROC_DIR'], '*.db')):
+    os.remove(_path)
+
+wsgi_app = 'gelmath_api.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+preload_app = True
+
+
+def when_ready(server):
+    from django.db import connections
+    from assessments import ml_models
+
+    state = ml_models.warm_up()
+    server.log.info('ML warm-up %s in %ss', state, ml_models.status()['warm_up_seconds'])
+    # Connections opened in the master must not be shared by the forked workers
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from gelmath_api.metrics import WORKER_CAPACITY
+
+    WORKER_CAPACITY.set(server.cfg.threads)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
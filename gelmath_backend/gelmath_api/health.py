@@ -0,0 +1,19 @@
+"""
+Readiness probe for load balancers and orchestrators.
+
+/readyz answers 200 once the ML artifacts are in memory (assessments.ml_models)
+and 503 while they are still loading, so traffic is only routed to workers that
+can serve predictions without a cold model load. Plain Django view: no
+authentication, throttling or database access.
+"""
+from django.http import JsonResponse
+from assessments import ml_models
+
+
+def readyz(request):
+    state = ml_models.status()
+    if state['status'] == 'cold':
+        # Not preloaded by gunicorn (runserver, uvicorn): load now, answer 503 meanwhile
+        ml_models.warm_up_in_background()
+        state = ml_models.status()
+    return JsonResponse(state, status=200 if state['status'] == 'ready' else 503)
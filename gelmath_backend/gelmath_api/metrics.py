@@ -0,0 +1,120 @@
+"""
+Prometheus metrics.
+
+MetricsMiddleware records every request's latency by route (the URL
+resolver's view_name, never the raw path) and status, the queries counted by
+QueryBudgetMiddleware and the requests in flight. Other modules record
+through the helpers here: model inference time (assessments.ml_models), cache
+hits and misses, and sync batch sizes.
+
+Under gunicorn, PROMETHEUS_MULTIPROC_DIR (set by gelmath_api/gunicorn_conf.py)
+makes every worker write its samples to memory-mapped files in that
+directory, and /metrics/ aggregates the files of all workers, so a scrape sees
+the whole server whichever worker answers it. Without it (runserver, tests)
+each process reports its own samples.
+
+/metrics/ needs `Authorization: Bearer <METRICS_TOKEN>` and is closed when
+METRICS_TOKEN is not set.
+"""
+import hmac
+import os
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    'gelmath_http_request_duration_seconds', 'Request latency by route, method and status',
+    ['route', 'method', 'status'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUEST_QUERIES = Histogram(
+    'gelmath_http_request_db_queries', 'SQL queries per API request by route', ['route'],
+    buckets=(0, 1, 2, 4, 8, 16, 32, 64, 128),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'gelmath_http_requests_in_progress', 'Requests being handled', multiprocess_mode='livesum',
+)
+WORKER_CAPACITY = Gauge(
+    'gelmath_worker_threads', 'Request threads of the live workers (saturation = in progress / threads)',
+    multiprocess_mode='livesum',
+)
+MODEL_INFERENCE = Histogram(
+    'gelmath_model_inference_seconds', 'Model inference latency by model and artifact version',
+    ['model', 'version'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+CACHE_REQUESTS = Counter(
+    'gelmath_cache_requests_total', 'Cache lookups by cache and result (hit/miss)', ['cache', 'result'],
+)
+SYNC_BATCH_RECORDS = Histogram(
+    'gelmath_sync_batch_records', 'Records per staged sync batch',
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+
+def record_cache(name, hit):
+    CACHE_REQUESTS.labels(cache=name, result='hit' if hit else 'miss').inc()
+
+
+class MetricsMiddleware:
+    """Outermost middleware: times the whole request, including the other middleware."""
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+        return self._observe(request, response, start)
+
+    async def __acall__(self, request):
+        REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+        return self._observe(request, response, start)
+
+    def _observe(self, request, response, start):
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match else 'unmatched'
+        REQUEST_LATENCY.labels(route=route, method=request.method, status=response.status_code).observe(
+            time.perf_counter() - start
+        )
+        stats = getattr(response, 'query_stats', None)
+        if stats is not None:
+            REQUEST_QUERIES.labels(route=route).observe(stats['queries'])
+        return response
+
+
+def _authorized(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    return bool(token) and hmac.compare_digest(header.encode(), f'Bearer {token}'.encode())
+
+
+def metrics_view(request):
+    """Prometheus text exposition of every worker's metrics."""
+    if not _authorized(request):
+        return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,187 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by the (ordering field, id) of the last row seen instead
+of an OFFSET, and no COUNT(*) is run, so page 10 000 of a national export
+costs the same as page 1. The composite (field, id) indexes on the paginated
+tables serve both directions.
+
+`count` is still returned, as a PostgreSQL planner estimate (pg_class.reltuples
+for unfiltered lists, EXPLAIN row estimate otherwise; an exact count on other
+databases) flagged by `count_is_estimate`. Clients that don't show totals can
+skip it with ?with_count=false, which the next/previous links carry over.
+?page=N and custom ?ordering= keep the old page-number behaviour for existing
+dashboard links, as do ranked ?search= results.
+"""
+import base64
+import json
+from collections import OrderedDict
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class LegacyPageNumberPagination(PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'with_count'
+    no_count_values = ('false', '0', 'no')
+    max_page_size = 500
+    # Views override with `keyset_ordering`; the last key must be unique
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.legacy = None
+        self.ordering = tuple(getattr(view, 'keyset_ordering', self.ordering))
+        if self._use_legacy(request):
+            self.legacy = LegacyPageNumberPagination()
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.count = None
+        if request.query_params.get(self.count_query_param, 'approx').lower() not in self.no_count_values:
+            self.count, self.count_is_estimate = self.estimate_count(queryset)
+
+        cursor = self.decode_cursor(request, queryset.model)
+        reverse = bool(cursor and cursor['reverse'])
+        rows = list(self.page_queryset(queryset, cursor))
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else cursor is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.legacy:
+            return self.legacy.get_paginated_response(data)
+        body = OrderedDict()
+        if self.count is not None:
+            body['count'] = self.count
+            body['count_is_estimate'] = self.count_is_estimate
+        body['next'] = self.get_next_link()
+        body['previous'] = self.get_previous_link()
+        body['results'] = data
+        return Response(body)
+
+    def page_queryset(self, queryset, cursor=None):
+        """One page of rows plus one (to tell whether there are more) after `cursor`."""
+        reverse = bool(cursor and cursor['reverse'])
+        ordering = [self._flip(key) for key in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self._after(ordering, cursor['position']))
+        return queryset[:self.page_size + 1]
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return api_settings.PAGE_SIZE
+
+    def _use_legacy(self, request):
+        # Ranked search results have no stable keyset position
+        if 'page' in request.query_params or request.query_params.get(api_settings.SEARCH_PARAM):
+            return True
+        ordering = request.query_params.get(api_settings.ORDERING_PARAM)
+        return bool(ordering) and ordering != self.ordering[0]
+
+    @staticmethod
+    def _flip(key):
+        return key[1:] if key.startswith('-') else f'-{key}'
+
+    @staticmethod
+    def _after(ordering, position):
+        """Rows strictly after `position` in `ordering`, written so the leading key is a plain range."""
+        (first, first_value), (second, second_value) = zip(ordering, position)
+        first_name, second_name = first.lstrip('-'), second.lstrip('-')
+        op = 'lt' if first.startswith('-') else 'gt'
+        second_op = 'lt' if second.startswith('-') else 'gt'
+        return Q(**{f'{first_name}__{op}e': first_value}) & (
+            Q(**{f'{first_name}__{op}': first_value}) | Q(**{f'{second_name}__{second_op}': second_value})
+        )
+
+    # Cursor encoding
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            position = [
+                model._meta.get_field(key.lstrip('-')).to_python(value)
+                for key, value in zip(self.ordering, payload['p'])
+            ]
+            if len(position) != len(self.ordering) or None in position:
+                raise ValueError
+            return {'position': position, 'reverse': bool(payload.get('r'))}
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        position = []
+        for key in self.ordering:
+            value = getattr(row, key.lstrip('-'))
+            position.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    # Approximate counts
+
+    def estimate_count(self, queryset):
+        """(row count, whether it is a planner estimate)"""
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return queryset.count(), False
+
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+                # -1 means the table has never been analyzed
+                if row and row[0] >= 0:
+                    return row[0], True
+
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows']), True
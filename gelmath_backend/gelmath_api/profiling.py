@@ -0,0 +1,258 @@
+"""
+On-demand request profiling.
+
+ProfilingMiddleware runs cProfile around a request when either
+  - the request carries `X-Profile: 1` and a bearer token that authenticates
+    (accounts.authentication.ClaimsJWTAuthentication) as a MoH admin; the
+    token is checked before the profiler starts, and the header is ignored
+    for anyone else, or
+  - its route (the URL resolver's view_name) is sampled, per
+    settings.PROFILE_SAMPLE_RATES:
+
+        PROFILE_SAMPLE_RATES = {'assessments.views.explain_prediction': 0.05}
+
+With no header and no sample rates the middleware only does a header lookup;
+with the header, the token check reads the cached user status snapshot.
+One request per worker process is profiled at a time; others run unprofiled.
+cProfile sees the thread the sync views run in (under ASGI, the request's
+thread-sensitive executor thread), so the async views under /api/async/ are
+not covered.
+
+Profiles go to a ring of at most PROFILE_MAX_FILES in PROFILE_DIR (shared by
+all workers on the host), as a pstats file plus a JSON sidecar. MoH admins
+list them at /api/ops/profiles/ and download them as pstats (snakeviz,
+`python -m pstats`) or as a speedscope profile.
+"""
+import cProfile
+import itertools
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.urls import Resolver404, resolve
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.response import Response
+from accounts.authentication import ClaimsJWTAuthentication
+from accounts.views import IsMoHAdmin
+
+HEADER = 'HTTP_X_PROFILE'
+PROFILE_ID = re.compile(r'^[0-9T]+-\d+-\d+$')
+# Bounds the speedscope conversion of very branchy call graphs
+MAX_SPEEDSCOPE_SAMPLES = 50000
+
+# cProfile can't nest: at most one active profiler per process
+_busy = threading.Lock()
+_sequence = itertools.count(1)
+
+
+def profile_dir():
+    return getattr(settings, 'PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'gelmath-profiles'))
+
+
+def _sample_rate(request):
+    rates = getattr(settings, 'PROFILE_SAMPLE_RATES', None)
+    if not rates:
+        return 0
+    try:
+        return rates.get(resolve(request.path_info).view_name, 0)
+    except Resolver404:
+        return 0
+
+
+def _is_admin(request):
+    """Whether the request's bearer token authenticates a MoH admin (DRF hasn't run yet)."""
+    try:
+        result = ClaimsJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return result is not None and result[0].role == 'MOH_ADMIN'
+
+
+class ProfilingMiddleware:
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _trigger(self, request):
+        if request.META.get(HEADER) == '1' and _is_admin(request):
+            return 'header'
+        if (rate := _sample_rate(request)) and random.random() < rate:
+            return 'sample'
+        return None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        trigger = self._trigger(request)
+        if trigger is None or not _busy.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            duration_ms = (time.perf_counter() - start) * 1000
+        finally:
+            _busy.release()
+        self._save(request, response, profiler, trigger, duration_ms)
+        return response
+
+    async def __acall__(self, request):
+        if request.META.get(HEADER) == '1':
+            # The token check reads the cache (and the database when the status snapshot is cold)
+            trigger = await sync_to_async(self._trigger)(request)
+        else:
+            trigger = self._trigger(request)
+        if trigger is None or not _busy.acquire(blocking=False):
+            return await self.get_response(request)
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            # Sync views run in the request's thread-sensitive thread: profile that one
+            await sync_to_async(profiler.enable)()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(profiler.disable)()
+            duration_ms = (time.perf_counter() - start) * 1000
+        finally:
+            _busy.release()
+        await sync_to_async(self._save)(request, response, profiler, trigger, duration_ms)
+        return response
+
+    def _save(self, request, response, profiler, trigger, duration_ms):
+        match = getattr(request, 'resolver_match', None)
+        profile_id = save_profile(profiler, {
+            'route': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 1),
+            'trigger': trigger,
+            'user_id': getattr(request.user, 'pk', None),
+            'request_id': getattr(request, 'request_id', None),
+        })
+        if trigger == 'header':
+            response['X-Profile-Id'] = profile_id
+
+
+def save_profile(profiler, meta):
+    """Write a profile and its metadata into the ring; returns the profile id."""
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    profile_id = f'{time.strftime("%Y%m%dT%H%M%S")}-{os.getpid()}-{next(_sequence)}'
+    profiler.dump_stats(os.path.join(directory, f'{profile_id}.pstats'))
+    with open(os.path.join(directory, f'{profile_id}.json'), 'w') as f:
+        json.dump({'id': profile_id, 'created': time.time(), **meta}, f)
+    _trim(directory)
+    return profile_id
+
+
+def _trim(directory):
+    limit = getattr(settings, 'PROFILE_MAX_FILES', 50)
+    entries = sorted(_list(directory), key=lambda meta: meta['created'], reverse=True)
+    for meta in entries[limit:]:
+        for suffix in ('.json', '.pstats'):
+            try:
+                os.remove(os.path.join(directory, meta['id'] + suffix))
+            except FileNotFoundError:
+                pass  # Another worker trimmed it first
+
+
+def _list(directory):
+    entries = []
+    for name in os.listdir(directory) if os.path.isdir(directory) else ():
+        if name.endswith('.json'):
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return entries
+
+
+def to_speedscope(path, name):
+    """
+    speedscope 'sampled' profile from a pstats file. cProfile keeps caller/callee
+    totals, not full stacks, so each callee's time is split across its callers
+    in proportion to the time spent on each edge (as flame graph tools for
+    cProfile do). Recursive calls are folded into the first occurrence.
+    """
+    import pstats
+
+    stats = pstats.Stats(path).stats
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    frames, frame_index, samples, weights = [], {}, [], []
+
+    def frame(func):
+        if func not in frame_index:
+            filename, line, function = func
+            frame_index[func] = len(frames)
+            frames.append({'name': function, 'file': filename, 'line': line})
+        return frame_index[func]
+
+    def visit(func, stack, share):
+        _, _, self_time, total_time, _ = stats[func]
+        fraction = share / total_time if total_time else 0
+        stack = stack + [frame(func)]
+        if self_time * fraction > 0:
+            samples.append(stack)
+            weights.append(self_time * fraction)
+        for callee, edge_time in callees.get(func, ()):
+            if len(samples) >= MAX_SPEEDSCOPE_SAMPLES:
+                return
+            if callee in stats and frame_index.get(callee) not in stack and edge_time * fraction > 1e-6:
+                visit(callee, stack, edge_time * fraction)
+
+    for func, (_, _, _, total_time, callers) in stats.items():
+        if not callers:
+            visit(func, [], total_time)
+
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'exporter': 'gelmath_api.profiling',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled', 'name': name, 'unit': 'seconds',
+            'startValue': 0, 'endValue': sum(weights), 'samples': samples, 'weights': weights,
+        }],
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsMoHAdmin])
+def profile_list(request):
+    """Stored profiles, newest first"""
+    return Response(sorted(_list(profile_dir()), key=lambda meta: meta['created'], reverse=True))
+
+
+@api_view(['GET'])
+@permission_classes([IsMoHAdmin])
+def profile_download(request, profile_id, kind):
+    """One stored profile as pstats or speedscope JSON"""
+    path = os.path.join(profile_dir(), f'{profile_id}.pstats')
+    if not PROFILE_ID.match(profile_id) or not os.path.exists(path):
+        return Response({'error': 'Profile not found'}, status=404)
+    if kind == 'pstats':
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=f'{profile_id}.pstats')
+    response = HttpResponse(json.dumps(to_speedscope(path, profile_id)), content_type='application/json')
+    response['Content-Disposition'] = f'attachment; filename="{profile_id}.speedscope.json"'
+    return response
@@ -0,0 +1,169 @@
+"""
+Per-request SQL query budgets.
+
+QueryBudgetMiddleware counts the queries and DB time of every API request
+through connection.execute_wrapper (all configured databases, so replica
+reads count too), reports them in a Server-Timing header and logs requests
+over their endpoint's budget to the `gelmath.query_budget` logger.
+
+Budgets live in settings.QUERY_BUDGETS, keyed by the URL resolver's
+view_name ('assessment-list' for router views, the dotted view path for
+unnamed ones), with a 'default' entry for everything else:
+
+    QUERY_BUDGETS = {
+        'default': {'queries': 20, 'db_ms': 250},
+        'assessments.analytics_views.chw_performance': {'queries': 6},
+    }
+
+Tests assert the same budgets with QueryBudgetTestMixin.assertWithinQueryBudget.
+"""
+import contextvars
+import logging
+import time
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('gelmath.query_budget')
+
+DEFAULT_BUDGET = {'queries': 20, 'db_ms': 250}
+
+_stats = contextvars.ContextVar('query_budget_stats', default=None)
+
+
+class _QueryCounter:
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats = _stats.get()
+            if stats is not None:
+                stats['queries'] += 1
+                stats['db_ms'] += (time.perf_counter() - start) * 1000
+
+
+def _wrap_connections():
+    """Install a _QueryCounter on this thread's connections; closing the returned stack removes them."""
+    stack = ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(_QueryCounter()))
+    return stack
+
+
+@contextmanager
+def count_queries():
+    """Count queries and DB milliseconds on every database for the enclosed block."""
+    stats = {'queries': 0, 'db_ms': 0.0}
+    token = _stats.set(stats)
+    try:
+        with _wrap_connections():
+            yield stats
+    finally:
+        _stats.reset(token)
+
+
+@asynccontextmanager
+async def acount_queries():
+    """
+    count_queries() for async code. Connections are per thread, and the ORM
+    (sync views and the async ORM alike) runs in the request's thread-sensitive
+    executor thread, so the counters are installed and removed there.
+    """
+    stats = {'queries': 0, 'db_ms': 0.0}
+    token = _stats.set(stats)
+    try:
+        wrappers = await sync_to_async(_wrap_connections)()
+        try:
+            yield stats
+        finally:
+            await sync_to_async(wrappers.close)()
+    finally:
+        _stats.reset(token)
+
+
+def budget_for(view_name):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return {**DEFAULT_BUDGET, **budgets.get('default', {}), **budgets.get(view_name, {})}
+
+
+def over_budget(stats, budget):
+    """Names of the limits `stats` exceeds ('queries', 'db_ms')."""
+    return [key for key in ('queries', 'db_ms') if budget.get(key) is not None and stats[key] > budget[key]]
+
+
+def server_timing(stats, total_ms):
+    return (f'db;dur={stats["db_ms"]:.1f};desc="{stats["queries"]} queries", '
+            f'app;dur={max(total_ms - stats["db_ms"], 0):.1f}')
+
+
+class QueryBudgetMiddleware:
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _enabled(self, request):
+        return getattr(settings, 'QUERY_BUDGET_ENABLED', True) and request.path.startswith('/api/')
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._enabled(request):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with count_queries() as stats:
+            response = self.get_response(request)
+        return self._report(request, response, stats, (time.perf_counter() - start) * 1000)
+
+    async def __acall__(self, request):
+        if not self._enabled(request):
+            return await self.get_response(request)
+
+        start = time.perf_counter()
+        async with acount_queries() as stats:
+            response = await self.get_response(request)
+        return self._report(request, response, stats, (time.perf_counter() - start) * 1000)
+
+    def _report(self, request, response, stats, total_ms):
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else request.path
+        stats = {**stats, 'view_name': view_name}
+        # Kept on the response for QueryBudgetTestMixin
+        response.query_stats = stats
+        if getattr(settings, 'QUERY_BUDGET_SERVER_TIMING', True):
+            response['Server-Timing'] = server_timing(stats, total_ms)
+
+        budget = budget_for(view_name)
+        exceeded = over_budget(stats, budget)
+        if exceeded:
+            logger.warning(
+                'Query budget exceeded: %s %s (%s) ran %d queries in %.1f ms DB time; budget %s',
+                request.method, request.path, view_name, stats['queries'], stats['db_ms'], budget,
+            )
+        return response
+
+
+class QueryBudgetTestMixin:
+    """TestCase mixin: fail when a response ran more queries than its endpoint's budget allows."""
+
+    def assertWithinQueryBudget(self, response, queries=None, db_ms=None):
+        """
+        Queries are checked against the configured budget unless `queries` is given.
+        DB time is only checked when `db_ms` is passed, since it is noisy on test databases.
+        """
+        stats = getattr(response, 'query_stats', None)
+        if stats is None:
+            self.fail('Response has no query_stats; is QueryBudgetMiddleware installed?')
+        budget = {'queries': budget_for(stats['view_name'])['queries'] if queries is None else queries,
+                  'db_ms': db_ms}
+        exceeded = over_budget(stats, budget)
+        if exceeded:
+            self.fail(
+                f'{stats["view_name"]} exceeded its query budget: {stats["queries"]} queries, '
+                f'{stats["db_ms"]:.1f} ms DB time (budget {budget})'
+            )
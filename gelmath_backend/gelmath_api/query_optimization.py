@@ -0,0 +1,193 @@
+"""
+Derive select_related/prefetch_related from serializer field sources.
+
+Serializers such as AssessmentSerializer read `facility.name` or
+`assigned_doctor.get_full_name` for every row; without joins a 50-row page
+issues one query per relation per row. SerializerRelationsMixin inspects the
+viewset's serializer once, works out which relations it touches and applies
+them in get_queryset via optimize_queryset().
+
+For sparse representations (gelmath_api.sparse_fields) it also restricts the
+loaded columns with .only() to what the remaining fields read.
+"""
+import functools
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+
+# Sparse field sets come from the client's ?fields= / ?omit=, so the cache is bounded
+RELATIONS_CACHE_SIZE = 256
+
+
+def _walk(model, source):
+    """Follow relation attributes in a dotted source. Returns (path, related_model, to_many)."""
+    path, current, to_many = [], model, False
+    for attr in source.split('.'):
+        try:
+            field = current._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation:
+            break
+        path.append(attr)
+        to_many = to_many or field.many_to_many or field.one_to_many
+        current = field.related_model
+    return path, current, to_many
+
+
+def serializer_relations(serializer, model, prefix='', in_prefetch=False):
+    """Return (select_related, prefetch_related) lookup sets for a serializer instance."""
+    select, prefetch = set(), set()
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            if isinstance(field, serializers.BaseSerializer):
+                nested_select, nested_prefetch = serializer_relations(field, model, prefix, in_prefetch)
+                select |= nested_select
+                prefetch |= nested_prefetch
+            continue
+
+        path, related_model, to_many = _walk(model, field.source)
+        if not path:
+            continue
+        # A bare FK rendered as its primary key reads the local *_id column
+        if isinstance(field, PrimaryKeyRelatedField) and field.source == path[0]:
+            continue
+        if isinstance(field, ManyRelatedField):
+            to_many = True
+
+        lookup = prefix + '__'.join(path)
+        many = in_prefetch or to_many
+        (prefetch if many else select).add(lookup)
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(nested, serializers.BaseSerializer):
+            nested_select, nested_prefetch = serializer_relations(
+                nested, related_model, lookup + '__', many
+            )
+            select |= nested_select
+            prefetch |= nested_prefetch
+
+    return select, prefetch
+
+
+def _columns(serializer, model, prefix=''):
+    """(columns, whole relations) read by a serializer; None if some field can't be resolved."""
+    columns, whole = set(), set()
+    method_sources = getattr(getattr(serializer, 'Meta', None), 'method_field_sources', {})
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        source = method_sources.get(name, field.source)
+        if source == '*':
+            if not isinstance(field, serializers.BaseSerializer):
+                return None
+            nested = _columns(field, model, prefix)
+            if nested is None:
+                return None
+            columns |= nested[0]
+            whole |= nested[1]
+            continue
+
+        lookup, current, resolved, relation = '', model, True, False
+        for attr in source.split('.'):
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # A method/property: on the row itself we can't tell what it reads,
+                # on a related object load that object in full
+                if not relation:
+                    return None
+                resolved = False
+                break
+            if model_field.many_to_many or model_field.one_to_many:
+                lookup = None
+                break
+            lookup = f'{lookup}__{attr}' if lookup else attr
+            relation = model_field.is_relation
+            if not relation:
+                break
+            current = model_field.related_model
+        if lookup is None:
+            continue
+        columns.add(prefix + lookup)
+        if not resolved or name in method_sources:
+            whole.add(prefix + lookup)
+            continue
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if relation and isinstance(nested, serializers.BaseSerializer):
+            sub = _columns(nested, current, f'{prefix}{lookup}__')
+            if sub is None:
+                whole.add(prefix + lookup)
+            else:
+                columns |= sub[0]
+                whole |= sub[1]
+    return columns, whole
+
+
+def serializer_columns(serializer, model):
+    """
+    .only() lookups covering every column a serializer instance reads, or None
+    when a field (SerializerMethodField, model property) can't be mapped. Method
+    fields can name the relation they read in Meta.method_field_sources.
+    """
+    found = _columns(serializer, model)
+    if found is None:
+        return None
+    columns, whole = found
+    # A bare relation lookup loads the whole related row; subfield lookups would narrow it
+    return sorted(c for c in columns if not any(c.startswith(w + '__') for w in whole))
+
+
+@functools.lru_cache(maxsize=RELATIONS_CACHE_SIZE)
+def relations_for(serializer_class, model, field_names=None):
+    """(select_related, prefetch_related) tuples for a serializer class, limited to `field_names` if given."""
+    serializer = serializer_class()
+    if field_names is not None:
+        for name in list(serializer.fields):
+            if name not in field_names:
+                serializer.fields.pop(name)
+    select, prefetch = serializer_relations(serializer, model)
+    # Deeper lookups imply their parents; keep the list minimal and stable
+    select = sorted(s for s in select if not any(o.startswith(s + '__') for o in select))
+    return tuple(select), tuple(sorted(prefetch))
+
+
+class SerializerRelationsMixin:
+    """
+    Viewset mixin: call optimize_queryset() in get_queryset.
+
+    Relations read only inside SerializerMethodFields can't be discovered and
+    are declared with `select_related_extra` / `prefetch_related_extra`.
+    """
+    select_related_extra = ()
+    prefetch_related_extra = ()
+
+    def _sparse_serializer(self):
+        if getattr(self, 'action', None) not in ('list', 'retrieve'):
+            return None
+        serializer = self.get_serializer()
+        return serializer if getattr(serializer, 'sparse', False) else None
+
+    def optimize_queryset(self, queryset):
+        serializer = self._sparse_serializer()
+        field_names = tuple(sorted(serializer.fields)) if serializer is not None else None
+        select, prefetch = relations_for(self.get_serializer_class(), queryset.model, field_names)
+        select = [*select, *self.select_related_extra]
+        prefetch = [*prefetch, *self.prefetch_related_extra]
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+
+        columns = serializer_columns(serializer, queryset.model) if serializer is not None else None
+        if columns is not None:
+            # Keyset pagination reads its ordering values off the page's rows
+            ordering = getattr(self, 'keyset_ordering', None) or getattr(self.paginator, 'ordering', None) or ()
+            # select_related_extra relations must stay loaded, or only() would defer them
+            queryset = queryset.only(*columns, *[key.lstrip('-') for key in ordering], *self.select_related_extra)
+        return queryset
@@ -0,0 +1,201 @@
+"""
+Ranked trigram search.
+
+TrigramSearchFilter replaces DRF's SearchFilter (ILIKE '%term%' sequential
+scans) on views with plain `search_fields`. On PostgreSQL it matches with
+pg_trgm's similarity operator and substring LIKE against UPPER(field), both
+served by the GIN gin_trgm_ops expression indexes from migration 0011, and
+ranks by similarity with a boost for prefix matches. Substring matches win:
+similar-but-different rows are only returned when nothing contains the term,
+so an exact ID stays exact while a mistyped one still finds the right child.
+Other databases (SQLite in development) use an in-memory trigram index kept
+current with model signals.
+
+Searches keep the rank order unless ?ordering= is given explicitly.
+"""
+import functools
+import operator
+import re
+import threading
+from django.db import connections
+from django.db.models import Case, Count, FloatField, Max, Value, When
+from django.db.models.functions import Greatest, Upper
+from django.db.models.lookups import Contains, StartsWith
+from django.db.models.signals import post_delete, post_save
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+SIMILARITY_THRESHOLD = 0.3  # pg_trgm.similarity_threshold default
+PREFIX_BOOST = 1.0
+MAX_FALLBACK_RESULTS = 500
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def trigrams(text):
+    """Trigrams the way pg_trgm extracts them: lower-cased words padded with two leading and one trailing space."""
+    grams = set()
+    for word in _WORD_RE.findall((text or '').lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a, b):
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def trigram_search(queryset, fields, term, fuzzy=True):
+    """PostgreSQL: filter by substring (and, if `fuzzy`, trigram similarity) on UPPER(field); annotate `search_rank`."""
+    # Imported lazily: django.contrib.postgres needs psycopg, which SQLite setups don't install
+    from django.contrib.postgres.lookups import TrigramSimilar
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    term = term.upper()
+    conditions, ranks = [], []
+    for field in fields:
+        column = Upper(field)
+        conditions.append(Contains(column, term))
+        if fuzzy:
+            conditions.append(TrigramSimilar(column, Value(term)))
+        ranks.append(TrigramSimilarity(column, Value(term)) + Case(
+            When(StartsWith(column, term), then=Value(PREFIX_BOOST)),
+            default=Value(0.0), output_field=FloatField(),
+        ))
+    rank = ranks[0] if len(ranks) == 1 else Greatest(*ranks)
+    return queryset.filter(functools.reduce(operator.or_, conditions)).annotate(search_rank=rank)
+
+
+class NgramIndex:
+    """
+    In-memory trigram postings for one model's fields, for databases without pg_trgm.
+    Signals keep edited rows current; a changed (count, max pk) - bulk inserts,
+    deletes, rolled-back transactions - triggers a rebuild on the next search.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = tuple(fields)
+        self.postings = {}
+        self.values = {}
+        self.lock = threading.Lock()
+        self.signature = None
+
+    def _signature(self):
+        stats = self.model._default_manager.aggregate(rows=Count('pk'), last=Max('pk'))
+        return stats['rows'], stats['last']
+
+    def build(self):
+        signature = self._signature()
+        with self.lock:
+            if signature == self.signature:
+                return
+            self.postings, self.values = {}, {}
+            for pk, *values in self.model._default_manager.values_list('pk', *self.fields).iterator():
+                self._add(pk, values)
+            self.signature = signature
+
+    def _add(self, pk, values):
+        self.values[pk] = tuple(value or '' for value in values)
+        for value in self.values[pk]:
+            for gram in trigrams(value):
+                self.postings.setdefault(gram, set()).add(pk)
+
+    def _remove(self, pk):
+        for value in self.values.pop(pk, ()):
+            for gram in trigrams(value):
+                self.postings.get(gram, set()).discard(pk)
+
+    def update(self, instance, deleted=False):
+        if self.signature is None:
+            return
+        with self.lock:
+            self._remove(instance.pk)
+            if not deleted:
+                self._add(instance.pk, [getattr(instance, field) for field in self.fields])
+
+    def search(self, term, limit=None):
+        """[(pk, rank, is_substring_match)] best first, using the same matching rules as the PostgreSQL path."""
+        self.build()
+        upper = term.upper()
+        candidates = set()
+        for gram in trigrams(term):
+            candidates |= self.postings.get(gram, set())
+
+        ranked = []
+        for pk in candidates:
+            best, contains = None, False
+            for value in self.values.get(pk, ()):
+                score = similarity(value, term)
+                if upper in value.upper():
+                    contains = True
+                elif score < SIMILARITY_THRESHOLD:
+                    continue
+                score += PREFIX_BOOST if value.upper().startswith(upper) else 0.0
+                best = score if best is None else max(best, score)
+            if best is not None:
+                ranked.append((pk, best, contains))
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_ngram_index(model, fields):
+    key = (model, tuple(fields))
+    with _indexes_lock:
+        if key not in _indexes:
+            index = _indexes[key] = NgramIndex(model, fields)
+            post_save.connect(lambda instance, **kwargs: index.update(instance), sender=model, weak=False)
+            post_delete.connect(lambda instance, **kwargs: index.update(instance, deleted=True),
+                                sender=model, weak=False)
+        return _indexes[key]
+
+
+def _visible_pks(queryset, pks, chunk_size=500):
+    """The subset of `pks` the (role-scoped) queryset can see; chunked to stay under SQLite's variable limit."""
+    visible = set()
+    queryset = queryset.order_by()
+    for start in range(0, len(pks), chunk_size):
+        visible.update(queryset.filter(pk__in=pks[start:start + chunk_size]).values_list('pk', flat=True))
+    return visible
+
+
+def ngram_search(queryset, fields, term):
+    """Fallback: rank with the in-memory index, keep the hits the (role-scoped) queryset can see, then truncate."""
+    ranked = get_ngram_index(queryset.model, fields).search(term)
+    visible = _visible_pks(queryset, [pk for pk, _, _ in ranked])
+    ranked = [hit for hit in ranked if hit[0] in visible]
+    exact = [hit for hit in ranked if hit[2]]
+    ranked = (exact or ranked)[:MAX_FALLBACK_RESULTS]
+    if not ranked:
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+    rank = Case(*[When(pk=pk, then=Value(score)) for pk, score, _ in ranked], output_field=FloatField())
+    return queryset.filter(pk__in=[pk for pk, _, _ in ranked]).annotate(search_rank=rank)
+
+
+class TrigramSearchFilter(BaseFilterBackend):
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        fields = getattr(view, 'search_fields', None)
+        term = request.query_params.get(self.search_param, '').strip()
+        if not fields or not term:
+            return queryset
+
+        if connections[queryset.db].vendor == 'postgresql':
+            matches = trigram_search(queryset, fields, term, fuzzy=False)
+            queryset = matches if matches.exists() else trigram_search(queryset, fields, term)
+        else:
+            queryset = ngram_search(queryset, fields, term)
+
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return queryset
+        # Rank first; the view's ordering breaks ties
+        tiebreak = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.order_by('-search_rank', *tiebreak)
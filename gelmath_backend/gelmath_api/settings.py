@@ -1,3 +1,5 @@
+import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 
@@ -19,6 +21,7 @@ INSTALLED_APPS = [
     # Third party
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_filters',
     
@@ -29,7 +32,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'gelmath_api.structured_logging.RequestIdMiddleware',
+    'gelmath_api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'gelmath_api.query_budget.QueryBudgetMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,6 +43,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'gelmath_api.db_routing.ReplicaPinningMiddleware',
+    'assessments.telemetry.SyncTelemetryMiddleware',
+    'gelmath_api.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'gelmath_api.urls'
@@ -103,7 +112,7 @@ CORS_ALLOW_CREDENTIALS = True
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -125,3 +134,130 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+
+# Sync ingestion: 'worker' stages batches for `manage.py process_sync_batches`,
+# 'eager' processes them in-process after the request commits (development/tests)
+SYNC_INGESTION_MODE = 'worker'
+SYNC_MAX_BATCH_RECORDS = 10000
+
+# Token-bucket throttling (gelmath_api.throttling). Per user bucket: capacity +
+# refill_rate (tokens/sec). Optional per-device bucket (device_capacity +
+# device_refill_rate, X-Device-ID) and global bucket shared by all clients.
+TOKEN_BUCKETS = {
+    'sync': {'capacity': 10, 'refill_rate': 10 / 60, 'global_capacity': 300, 'global_refill_rate': 20},
+    'predict': {'capacity': 30, 'refill_rate': 1},
+    'dashboard': {'capacity': 120, 'refill_rate': 4},
+}
+
+# Sync telemetry (assessments.telemetry): rows older than the retention window
+# are removed by `manage.py prune_sync_telemetry`
+SYNC_TELEMETRY_ENABLED = True
+SYNC_TELEMETRY_RETENTION_DAYS = 30
+
+# Read replica for analytics and forecast reads (gelmath_api.db_routing). Without a
+# 'replica' entry in DATABASES every read stays on default. Locally, DB_REPLICA_NAME
+# points a stand-in replica at a second database (a copy of gelmath_db).
+DATABASE_ROUTERS = ['gelmath_api.db_routing.ReplicaRouter']
+REPLICA_DATABASE_ALIAS = 'replica'
+REPLICA_MAX_LAG_SECONDS = 30  # fall back to the primary beyond this lag
+REPLICA_LAG_CHECK_SECONDS = 5
+REPLICA_PIN_SECONDS = 30  # read-your-writes window after a user's write
+if os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DB_REPLICA_NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Cold-storage archival (assessments.archive): closed cases with no activity for
+# ARCHIVE_HORIZON_DAYS move to archived_cases via `manage.py archive_closed_cases`
+ARCHIVE_HORIZON_DAYS = 730
+ARCHIVE_BATCH_SIZE = 200
+
+# Per-request query budgets (gelmath_api.query_budget), keyed by URL view_name.
+# Requests over budget are logged to `gelmath.query_budget`; tests assert the same
+# numbers with QueryBudgetTestMixin. Per-row query loops show up as growing counts.
+QUERY_BUDGET_ENABLED = True
+QUERY_BUDGET_SERVER_TIMING = True
+QUERY_BUDGETS = {
+    'default': {'queries': 20, 'db_ms': 250},
+    'assessment-list': {'queries': 6},
+    'treatmentrecord-list': {'queries': 6},
+    'referral-list': {'queries': 6},
+    'user-list': {'queries': 6},
+    'assessments.analytics_views.national_summary': {'queries': 4},
+    'assessments.analytics_views.chw_performance': {'queries': 4},
+    'assessments.analytics_views.doctor_performance': {'queries': 4},
+    'assessments.analytics_views.facility_stats': {'queries': 6},
+}
+
+# Stateless JWT auth (accounts.authentication): request.user is built from token
+# claims; deactivation, deletion and role/facility changes are picked up through a
+# per-user status snapshot cached this long (and dropped on every user save)
+JWT_USER_STATUS_SECONDS = 60
+
+# Refresh token blacklist (accounts.token_revocation): lookups go through a
+# per-worker Bloom filter sized for TOKEN_BLOOM_CAPACITY unexpired blacklisted
+# tokens, kept in step through the shared cache (without one, as here, every lookup
+# queries the blacklist); `manage.py prune_tokens` deletes expired tokens in batches (run daily)
+TOKEN_BLOOM_CAPACITY = 200000
+TOKEN_BLOOM_ERROR_RATE = 0.001
+TOKEN_BLOOM_REBUILD_SECONDS = 3600
+TOKEN_PRUNE_BATCH_SIZE = 5000
+
+# Password hashing policy (accounts.hashers). New passwords use PASSWORD_HASH_ALGORITHM;
+# hashes in another algorithm or with other parameters are upgraded on the next login.
+# Tune the parameters with `manage.py benchmark_login` on the production hardware.
+PASSWORD_HASH_ALGORITHM = os.environ.get('PASSWORD_HASH_ALGORITHM', 'pbkdf2_sha256')
+PASSWORD_HASHING = {
+    'pbkdf2_sha256': {'iterations': 600000},
+    'scrypt': {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 1, 'maxmem': 64 * 1024 * 1024},
+    'argon2': {'time_cost': 2, 'memory_cost': 19456, 'parallelism': 1},  # needs argon2-cffi
+}
+_TUNED_HASHERS = {
+    'pbkdf2_sha256': 'accounts.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'accounts.hashers.TunedScryptPasswordHasher',
+    'argon2': 'accounts.hashers.TunedArgon2PasswordHasher',
+}
+PASSWORD_HASHERS = [_TUNED_HASHERS[PASSWORD_HASH_ALGORITHM]] + [
+    path for algorithm, path in _TUNED_HASHERS.items() if algorithm != PASSWORD_HASH_ALGORITHM
+]
+# Concurrent hashes per worker (about one per core); logins queue this long for a slot, then 503
+LOGIN_HASH_CONCURRENCY = int(os.environ.get('LOGIN_HASH_CONCURRENCY', 2))
+LOGIN_HASH_QUEUE_SECONDS = 10
+# Post-login user payload cache (dropped when the user or their facility changes)
+LOGIN_PAYLOAD_SECONDS = 3600
+
+# Doctor directory (assessments.doctor_directory): changes drop it only in the worker
+# that made them when the cache is per-process, so other workers' copies expire after this
+DOCTOR_DIRECTORY_CACHE_SECONDS = 60
+
+# ML artifacts (assessments.ml_models), loaded once per process and warmed up in the
+# gunicorn master before forking (gelmath_api/gunicorn_conf.py); /readyz reports progress
+ML_MODELS_DIR = os.environ.get('ML_MODELS_DIR', str(BASE_DIR.parent / 'Models'))
+WHO_TABLES_DIR = os.environ.get('WHO_TABLES_DIR', str(BASE_DIR.parent / 'WHO_Table'))
+
+# Prometheus metrics (gelmath_api.metrics) at /metrics/, scraped with
+# `Authorization: Bearer <METRICS_TOKEN>`; the endpoint is closed while this is empty
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# On-demand cProfile profiles (gelmath_api.profiling): MoH admins send `X-Profile: 1`,
+# or routes (view_name) are sampled at these rates; the newest PROFILE_MAX_FILES are kept
+PROFILE_SAMPLE_RATES = {}
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'gelmath-profiles'))
+PROFILE_MAX_FILES = 50
+
+# Structured logging (gelmath_api.structured_logging): gelmath.* loggers write JSON lines
+# through a queue and a listener thread, tagged with the request's X-Request-ID. Records
+# below ERROR from the loggers in LOG_SAMPLE_RATES are kept at that rate.
+LOG_SAMPLE_RATES = {}
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'json': {'()': 'gelmath_api.structured_logging.queue_handler'},
+    },
+    'loggers': {
+        'gelmath': {'handlers': ['json'], 'level': os.environ.get('LOG_LEVEL', 'INFO'), 'propagate': False},
+    },
+}
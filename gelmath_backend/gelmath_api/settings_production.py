@@ -44,6 +44,23 @@ DATABASES = {
     }
 }
 
+# Streaming replica for analytics reads (see REPLICA_* in settings.py)
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Shared cache so throttle buckets are enforced across all gunicorn workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://localhost:6379/1'),
+    }
+}
+
 # CORS - Restrict to specific origins
 CORS_ALLOW_ALL_ORIGINS = False
 CORS_ALLOWED_ORIGINS = os.environ.get('CORS_ORIGINS', 'https://gelmath.org').split(',')
@@ -53,11 +70,20 @@ LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'handlers': {
+        'json': {
+            '()': 'gelmath_api.structured_logging.queue_handler',
+            'filename': '/var/log/gelmath/app.log',
+        },
         'file': {
             'level': 'ERROR',
             'class': 'logging.FileHandler',
             'filename': '/var/log/gelmath/django.log',
         },
+        'budget_file': {
+            'level': 'WARNING',
+            'class': 'logging.FileHandler',
+            'filename': '/var/log/gelmath/query_budget.log',
+        },
     },
     'loggers': {
         'django': {
@@ -65,5 +91,14 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': True,
         },
+        'gelmath': {
+            'handlers': ['json'],
+            'level': os.environ.get('LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+        'gelmath.query_budget': {
+            'handlers': ['budget_file'],
+            'level': 'WARNING',
+        },
     },
 }
@@ -0,0 +1,59 @@
+"""
+Sparse fieldsets for read endpoints.
+
+Serializers with SparseFieldsMixin honour, on GET requests:
+
+- ?fields=id,child_id     only these fields
+- ?omit=chw_notes,...     everything except these
+- ?view=summary           the serializer's Meta.summary_fields, for dashboard tables
+
+?fields= picks from all fields, summary or not; ?omit= applies on top of
+either. Unknown names are ignored. Only the top-level serializer is pruned;
+nested serializers keep their own fields. SerializerRelationsMixin narrows
+the queryset with .only() to the columns the remaining fields read.
+"""
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+VIEW_PARAM = 'view'
+SUMMARY_VIEW = 'summary'
+
+
+def _names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def selected_fields(request, serializer_class, available):
+    """The subset of `available` field names requested, or None for the full representation."""
+    params = request.query_params
+    if not any(params.get(param) for param in (FIELDS_PARAM, OMIT_PARAM, VIEW_PARAM)):
+        return None
+
+    selected = set(available)
+    if params.get(VIEW_PARAM) == SUMMARY_VIEW:
+        selected &= set(getattr(serializer_class.Meta, 'summary_fields', available))
+    if params.get(FIELDS_PARAM):
+        selected = set(available) & _names(params[FIELDS_PARAM])
+    if params.get(OMIT_PARAM):
+        selected -= _names(params[OMIT_PARAM])
+    return selected
+
+
+class SparseFieldsMixin:
+    """ModelSerializer mixin: prune fields from the request's ?fields= / ?omit= / ?view= on reads."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse = False
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        selected = selected_fields(request, type(self), self.fields)
+        if selected is None:
+            return
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+        self.sparse = True
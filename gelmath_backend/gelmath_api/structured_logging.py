@@ -0,0 +1,170 @@
+"""
+Structured, non-blocking logging.
+
+Records are written as one JSON object per line:
+
+    {"ts": "2026-10-19T08:15:02.114Z", "level": "WARNING", "logger": "gelmath.ml_models",
+     "message": "ML prediction failed", "request_id": "5c0e...", "child_id": "SS-001"}
+
+Extra fields come from `extra=` on the logging call. RequestIdMiddleware
+takes X-Request-ID from the client (or makes one), echoes it on the response
+and tags every record logged while handling the request, so the app log,
+the mobile client and upstream proxies can be correlated.
+
+queue_handler() is the only handler the loggers write to: it puts records on
+an in-memory queue and a listener thread formats and writes them, so request
+threads never wait on log I/O. The listener is restarted in forked gunicorn
+workers. Records below ERROR can be sampled per logger with
+settings.LOG_SAMPLE_RATES ({'gelmath.ml_models': 0.1}, longest prefix wins);
+kept records carry their sample_rate.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+REQUEST_ID_HEADER = 'HTTP_X_REQUEST_ID'
+# Client-supplied ids are echoed into logs and headers: keep them short and plain
+VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+_request_id = contextvars.ContextVar('request_id', default=None)
+
+# LogRecord attributes that are not `extra=` fields
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id', 'sample_rate'}
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+class RequestIdMiddleware:
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _start(self, request):
+        request_id = request.META.get(REQUEST_ID_HEADER, '')
+        if not VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+        return _request_id.set(request_id)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_id.reset(token)
+        response['X-Request-ID'] = request.request_id
+        return response
+
+    async def __acall__(self, request):
+        token = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_id.reset(token)
+        response['X-Request-ID'] = request.request_id
+        return response
+
+
+class RequestIdFilter(logging.Filter):
+    """Tag records with the current request id (runs in the calling thread, before the queue)."""
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of the records below ERROR, per settings.LOG_SAMPLE_RATES."""
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        rates = getattr(settings, 'LOG_SAMPLE_RATES', None) if settings.configured else None
+        if not rates:
+            return True
+        prefix = max((name for name in rates if record.name == name or record.name.startswith(name + '.')),
+                     key=len, default=None)
+        if prefix is None:
+            return True
+        record.sample_rate = rates[prefix]
+        return random.random() < rates[prefix]
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds')
+                  .replace('+00:00', 'Z'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key in ('request_id', 'sample_rate'):
+            if getattr(record, key, None) is not None:
+                entry[key] = getattr(record, key)
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Keep args resolved and the traceback as text, but leave formatting to the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def queue_handler(filename=None):
+    """
+    dictConfig handler factory ('()': 'gelmath_api.structured_logging.queue_handler'):
+    JSON lines to `filename` (stdout when omitted), written by a listener thread.
+    """
+    target = logging.FileHandler(filename) if filename else logging.StreamHandler(sys.stdout)
+    target.setFormatter(JSONFormatter())
+    handler = NonBlockingQueueHandler(queue.SimpleQueue())
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(SamplingFilter())
+    listener = QueueListener(handler.queue, target)
+    listener.start()
+    handler.listener = listener
+
+    @atexit.register
+    def flush():
+        if listener._thread is not None:
+            listener.stop()
+
+    def restart_in_child():
+        # The listener thread doesn't survive fork (gunicorn preload): new queue, new thread
+        handler.queue = listener.queue = queue.SimpleQueue()
+        listener._thread = None
+        listener.start()
+
+    os.register_at_fork(after_in_child=restart_in_child)
+    return handler
@@ -0,0 +1,137 @@
+"""
+Token-bucket throttling for sync, prediction and dashboard traffic.
+
+Each scope in settings.TOKEN_BUCKETS gets one bucket per authenticated user
+(per client IP for anonymous requests), optionally a narrower bucket per user
+and X-Device-ID (device_capacity), and optionally one global bucket shared by
+every client so a county-wide reconnect can't starve dashboard users. The
+device bucket only ever narrows the user's limit: switching X-Device-ID
+doesn't get a user a fresh allowance.
+
+A bucket holds `capacity` tokens and is refilled in full at the start of each
+window of capacity / refill_rate seconds, so the long-run rate is refill_rate
+and no window admits more than `capacity` requests. A token is taken with a
+single cache.incr() on the window's counter, which is atomic in the cache
+itself, so concurrent workers can't overspend a bucket when a shared cache
+(Redis) is configured. Rejected requests get 429 with Retry-After (the end of
+the exhausted window).
+"""
+import math
+import time
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
+from accounts.views import IsMoHAdmin
+
+KEY_PREFIX = 'tokenbucket'
+STATS_PREFIX = 'tokenbucket-stats'
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+    cache = cache
+
+    def get_config(self):
+        return getattr(settings, 'TOKEN_BUCKETS', {}).get(self.scope)
+
+    def get_client_ident(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user-{request.user.pk}'
+        return f'ip-{self.get_ident(request)}'
+
+    def get_buckets(self, request, config):
+        """[(key, capacity, refill_rate)] that must all have a token left."""
+        ident = self.get_client_ident(request)
+        buckets = [(f'{KEY_PREFIX}:{self.scope}:{ident}', config['capacity'], config['refill_rate'])]
+        device = request.META.get('HTTP_X_DEVICE_ID', '')[:64]
+        if device and config.get('device_capacity'):
+            buckets.append((f'{KEY_PREFIX}:{self.scope}:{ident}:device-{device}',
+                            config['device_capacity'], config['device_refill_rate']))
+        if config.get('global_capacity'):
+            buckets.append((f'{KEY_PREFIX}:{self.scope}:global',
+                            config['global_capacity'], config['global_refill_rate']))
+        return buckets
+
+    def _take(self, key, capacity, refill_rate, now):
+        """
+        Take a token from the bucket's current window. Returns (counter key,
+        seconds until the window is refilled, or 0 if a token was taken).
+        """
+        window = capacity / refill_rate
+        index = int(now // window)
+        counter = f'{key}:{index}'
+        self.cache.add(counter, 0, math.ceil(window) + 60)
+        try:
+            taken = self.cache.incr(counter)
+        except ValueError:  # evicted between add() and incr()
+            self.cache.set(counter, 1, math.ceil(window) + 60)
+            taken = 1
+        if taken <= capacity:
+            return counter, 0
+        return counter, (index + 1) * window - now
+
+    def allow_request(self, request, view):
+        config = self.get_config()
+        if not config:
+            return True
+
+        now = time.time()
+        taken = [self._take(key, capacity, rate, now) for key, capacity, rate in self.get_buckets(request, config)]
+        self._wait = max(wait for _, wait in taken)
+        if self._wait > 0:
+            # Give the tokens back so a rejected request doesn't spend the other buckets
+            for counter, _ in taken:
+                try:
+                    self.cache.decr(counter)
+                except ValueError:
+                    pass
+            record_bucket_event(self.scope, 'throttled')
+            return False
+
+        record_bucket_event(self.scope, 'allowed')
+        return True
+
+    def wait(self):
+        return getattr(self, '_wait', None)
+
+
+class SyncRateThrottle(TokenBucketThrottle):
+    scope = 'sync'
+
+
+class PredictRateThrottle(TokenBucketThrottle):
+    scope = 'predict'
+
+
+class DashboardRateThrottle(TokenBucketThrottle):
+    scope = 'dashboard'
+
+
+def record_bucket_event(scope, outcome):
+    key = f'{STATS_PREFIX}:{scope}:{outcome}'
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:  # evicted between add() and incr()
+            cache.set(key, 1, None)
+
+
+def bucket_stats():
+    """Allowed/throttled counters per scope, for capacity sizing."""
+    stats = {}
+    for scope, config in getattr(settings, 'TOKEN_BUCKETS', {}).items():
+        stats[scope] = {
+            'allowed': cache.get(f'{STATS_PREFIX}:{scope}:allowed', 0),
+            'throttled': cache.get(f'{STATS_PREFIX}:{scope}:throttled', 0),
+            'config': config,
+        }
+    return stats
+
+
+@api_view(['GET'])
+@permission_classes([IsMoHAdmin])
+def throttle_stats(request):
+    """Per-bucket admission counters"""
+    return Response(bucket_stats())
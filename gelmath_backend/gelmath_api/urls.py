@@ -1,12 +1,18 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView
 from accounts.views import UserViewSet, FacilityViewSet
-from accounts.auth_views import CustomTokenObtainPairView
-from assessments.views import AssessmentViewSet, TreatmentRecordViewSet, ReferralViewSet, explain_prediction, predict_pathway
+from accounts.auth_views import CustomTokenObtainPairView, CustomTokenRefreshView
+from accounts.token_revocation import token_stats
+from assessments.views import AssessmentViewSet, TreatmentRecordViewSet, ReferralViewSet, SyncBatchViewSet, explain_prediction, predict_pathway
 from assessments.analytics_views import national_summary, state_trends, time_series, chw_performance, doctor_performance, facility_stats
 from assessments.forecast_views import forecast_trends
+from assessments import async_views
+from assessments.telemetry_views import sync_telemetry
+from gelmath_api.throttling import throttle_stats
+from gelmath_api.health import readyz
+from gelmath_api.metrics import metrics_view
+from gelmath_api.profiling import profile_download, profile_list
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
@@ -14,11 +20,14 @@ router.register(r'facilities', FacilityViewSet)
 router.register(r'assessments', AssessmentViewSet)
 router.register(r'treatments', TreatmentRecordViewSet)
 router.register(r'referrals', ReferralViewSet)
+router.register(r'sync-jobs', SyncBatchViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('readyz/', readyz, name='readyz'),
+    path('metrics/', metrics_view, name='metrics'),
     path('api/auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/auth/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
     path('api/analytics/national-summary/', national_summary),
     path('api/analytics/state-trends/', state_trends),
     path('api/analytics/time-series/', time_series),
@@ -28,5 +37,21 @@ urlpatterns = [
     path('api/analytics/forecast/', forecast_trends),
     path('api/assessments/explain/', explain_prediction, name='explain_prediction'),
     path('api/predict/', predict_pathway, name='predict_pathway'),
+    path('api/ops/throttle-stats/', throttle_stats, name='throttle_stats'),
+    path('api/ops/sync-telemetry/', sync_telemetry, name='sync_telemetry'),
+    path('api/ops/token-stats/', token_stats, name='token_stats'),
+    path('api/ops/profiles/', profile_list, name='profile_list'),
+    path('api/ops/profiles/<str:profile_id>/pstats/', profile_download, {'kind': 'pstats'}, name='profile_pstats'),
+    path('api/ops/profiles/<str:profile_id>/speedscope/', profile_download, {'kind': 'speedscope'},
+         name='profile_speedscope'),
+    # Async variants of the dashboard reads, for the ASGI deployment (gelmath_api/asgi.py)
+    path('api/async/analytics/national-summary/', async_views.national_summary),
+    path('api/async/analytics/state-trends/', async_views.state_trends),
+    path('api/async/analytics/time-series/', async_views.time_series),
+    path('api/async/analytics/chw-performance/', async_views.chw_performance),
+    path('api/async/analytics/doctor-performance/', async_views.doctor_performance),
+    path('api/async/analytics/facility/<int:facility_id>/', async_views.facility_stats),
+    path('api/async/analytics/forecast/', async_views.forecast_trends),
+    path('api/async/referrals/active_doctors/', async_views.active_doctors),
     path('api/', include(router.urls)),
 ]
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Load test: dashboard reads on the WSGI (sync DRF) vs ASGI (async) deployments.
+
+Fires the analytics endpoints at increasing concurrency against each target and
+reports throughput, latency percentiles and errors, so the worker/connection
+limits of both deployments can be compared on the same data.
+
+    # WSGI: gunicorn gelmath_api.wsgi -w 2 --threads 4 -b :8000
+    # ASGI: uvicorn gelmath_api.asgi:application --workers 2 --port 8001
+    python loadtest_analytics.py --token <access token> \\
+        --target wsgi=http://localhost:8000/api/analytics/ \\
+        --target asgi=http://localhost:8001/api/async/analytics/ \\
+        --concurrency 10,50,100 --requests 500
+
+Throttled requests (429) are counted apart from errors; raise
+TOKEN_BUCKETS['dashboard'] on the servers under test to measure raw capacity.
+Standard library only; run it from a different machine than the server when
+measuring CPU-bound limits.
+"""
+import argparse
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ENDPOINTS = ['national-summary/', 'state-trends/', 'time-series/', 'chw-performance/', 'doctor-performance/']
+
+
+def fetch(url, token, timeout):
+    request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            code = response.status
+    except urllib.error.HTTPError as exc:
+        code = exc.code
+    except (urllib.error.URLError, TimeoutError, ConnectionError):
+        code = None
+    return code, (time.perf_counter() - start) * 1000
+
+
+def run(base_url, token, concurrency, total, timeout):
+    urls = [base_url + ENDPOINTS[i % len(ENDPOINTS)] for i in range(total)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda url: fetch(url, token, timeout), urls))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(ms for code, ms in results if code == 200)
+    throttled = sum(1 for code, _ in results if code == 429)
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else float('nan')
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': statistics.median(latencies) if latencies else float('nan'),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+        'throttled': throttled,
+        'errors': len(results) - len(latencies) - throttled,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--target', action='append', required=True,
+                        help='name=base URL of the analytics endpoints (repeatable)')
+    parser.add_argument('--token', required=True, help='JWT access token (MoH admin)')
+    parser.add_argument('--concurrency', default='10,50,100')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per target and concurrency level')
+    parser.add_argument('--timeout', type=float, default=30)
+    args = parser.parse_args()
+
+    targets = [target.split('=', 1) for target in args.target]
+    print(f'{"target":<8} {"conc":>5} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"429s":>6} {"errors":>7}')
+    for concurrency in (int(value) for value in args.concurrency.split(',')):
+        for name, base_url in targets:
+            stats = run(base_url.rstrip('/') + '/', args.token, concurrency, args.requests, args.timeout)
+            print(f'{name:<8} {concurrency:>5} {stats["rps"]:>8.1f} {stats["p50"]:>8.1f} '
+                  f'{stats["p95"]:>8.1f} {stats["p99"]:>8.1f} {stats["throttled"]:>6} {stats["errors"]:>7}')
+
+
+if __name__ == '__main__':
+    main()
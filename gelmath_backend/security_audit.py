@@ -29,19 +29,33 @@ def check_password_encryption():
     else:
         print("Passwords are hashed (not plaintext)")
     
-    # Check 2: Algorithm
+    # Check 2: Algorithm (PASSWORD_HASH_ALGORITHM, see accounts/hashers.py)
     algo = user.password.split('$')[0]
-    if algo != 'pbkdf2_sha256':
-        issues.append(f"  Weak algorithm: {algo} (should be pbkdf2_sha256)")
+    if algo not in ('pbkdf2_sha256', 'scrypt', 'argon2'):
+        issues.append(f"  Weak algorithm: {algo} (should be pbkdf2_sha256, scrypt or argon2)")
     else:
         print(f" Strong algorithm: {algo}")
     
-    # Check 3: Iterations
-    iterations = int(user.password.split('$')[1])
-    if iterations < 100000:
-        issues.append(f"WARNING  Low iterations: {iterations} (should be 100K+)")
-    else:
-        print(f" Strong iterations: {iterations:,}")
+    # Check 3: Cost parameters
+    params = user.password.split('$')
+    if algo == 'pbkdf2_sha256':
+        iterations = int(params[1])
+        if iterations < 100000:
+            issues.append(f"WARNING  Low iterations: {iterations} (should be 100K+)")
+        else:
+            print(f" Strong iterations: {iterations:,}")
+    elif algo == 'scrypt':
+        work_factor = int(params[1])
+        if work_factor < 2 ** 14:
+            issues.append(f"WARNING  Low scrypt work factor: {work_factor} (should be 16384+)")
+        else:
+            print(f" Strong scrypt work factor: {work_factor:,}")
+    elif algo == 'argon2':
+        memory_cost = int(params[3].split(',')[0].split('=')[1])
+        if memory_cost < 19456:
+            issues.append(f"WARNING  Low argon2 memory cost: {memory_cost} KiB (should be 19456+)")
+        else:
+            print(f" Strong argon2 memory cost: {memory_cost:,} KiB")
     
     # Check 4: Verification
     if not check_password('TestPass123!', user.password):